@@ -6,8 +6,8 @@ import asyncio
 from celery import shared_task
 from django.apps import AppConfig, apps
 from lex_app.settings import repo_name
+from generic_app.startup_tasks import startup_task_runner
 from asgiref.sync import sync_to_async
-import nest_asyncio
 
 
 @shared_task(name="initial_data_upload", max_retries=0)
@@ -45,13 +45,24 @@ class GenericAppConfig(AppConfig):
     name = 'generic_app'
 
     def ready(self):
+        from generic_app.rest_api.calculated_model_updates.recalculation_queue import \
+            is_async_recalculation_enabled, trigger_processing
+
         generic_app_models = {f"{model.__name__}": model for model in
                               set(list(apps.get_app_config(repo_name).models.values())
                                   + list(apps.get_app_config(repo_name).models.values()))}
-        nest_asyncio.apply()
-        asyncio.run(self.async_ready(generic_app_models))
 
-    async def async_ready(self, generic_app_models):
+        if running_in_uvicorn() and not os.getenv("CELERY_ACTIVE"):
+            startup_task_runner.register(lambda: self.initial_data_load(generic_app_models), "initial_data_load")
+            if is_async_recalculation_enabled():
+                # recalculations left in the queue by the previous run (e.g. interrupted by a deploy)
+                startup_task_runner.register(trigger_processing, "resume_recalculation_queue")
+        # The resets of aborted calculations (registered in models.py) are run before the server accepts requests,
+        #  such that they do not reset calculations started by these requests. The other registered tasks are run
+        #  in the background, such that the server does not wait for them
+        startup_task_runner.start()
+
+    def initial_data_load(self, generic_app_models):
         """
         Check conditions and decide whether to load data asynchronously.
         """
@@ -60,14 +71,12 @@ class GenericAppConfig(AppConfig):
 
         test = ProcessAdminTestCase()
 
-        if (not running_in_uvicorn()
-                or os.getenv("CELERY_ACTIVE")
-                or not auth_settings
+        if (not auth_settings
                 or not hasattr(auth_settings, 'initial_data_load')
                 or not auth_settings.initial_data_load):
             return
 
-        if await are_all_models_empty(test, auth_settings, generic_app_models):
+        if are_all_models_empty(test, auth_settings, generic_app_models):
             if (os.getenv("DEPLOYMENT_ENVIRONMENT")
                     and os.getenv("ARCHITECTURE") == "MQ/Worker"):
                 load_data.delay(test, generic_app_models)
@@ -76,17 +85,17 @@ class GenericAppConfig(AppConfig):
                 x.start()
         else:
             test.test_path = auth_settings.initial_data_load
-            non_empty_models = await sync_to_async(test.get_list_of_non_empty_models)(generic_app_models)
+            non_empty_models = test.get_list_of_non_empty_models(generic_app_models)
             print(f"Loading Initial Data not triggered due to existence of objects of Model: {non_empty_models}")
             print("Not all referenced Models are empty")
 
 
-async def are_all_models_empty(test, auth_settings, generic_app_models):
+def are_all_models_empty(test, auth_settings, generic_app_models):
     """
     Check if all models are empty.
     """
     test.test_path = auth_settings.initial_data_load
-    return await sync_to_async(test.check_if_all_models_are_empty)(generic_app_models)
+    return test.check_if_all_models_are_empty(generic_app_models)
 
 
 def running_in_uvicorn():
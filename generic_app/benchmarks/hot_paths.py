@@ -0,0 +1,149 @@
+import contextlib
+import io
+import json
+
+from django.core.files.storage import default_storage
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from generic_app.benchmarks.runner import benchmark
+from generic_app.benchmarks.synthetic_data import BenchmarkAggregate, BenchmarkCategory, BenchmarkItem, \
+    BenchmarkReport, generate_calculation_logs, generate_categories, generate_dataframes, generate_items
+from generic_app.generic_models.fields.XLSX_field import XLSXField
+from generic_app.generic_models.model_process_admin import ModelProcessAdmin
+from generic_app.rest_api.model_collection.model_collection import ModelCollection
+
+request_factory = APIRequestFactory()
+
+
+def create_model_collection():
+    return ModelCollection({model: ModelProcessAdmin() for model in [BenchmarkCategory, BenchmarkItem]},
+                           None, None, None)
+
+
+def create_items(context, count):
+    owners = [context.user.username, 'owner_a', 'owner_b', 'owner_c']
+    categories = generate_categories(context.rng, context.scaled(20))
+    return generate_items(context.rng, count, categories, owners)
+
+
+def render(response):
+    if hasattr(response, 'render'):
+        response.render()
+    elif getattr(response, 'streaming', False):
+        b''.join(response.streaming_content)
+    return response
+
+
+@benchmark('list_pagination_with_read_restriction')
+def list_pagination_with_read_restriction(context):
+    from generic_app.rest_api.views.model_entries.List import ListModelEntries
+
+    create_items(context, context.scaled(5000))
+    container = create_model_collection().get_container(BenchmarkItem)
+    view = ListModelEntries.as_view()
+
+    def run():
+        for page in range(1, 4):
+            request = request_factory.get('/', {'page': page, 'perPage': 100})
+            force_authenticate(request, user=context.user)
+            render(view(request, model_container=container))
+
+    return run
+
+
+@benchmark('calculated_model_create_fan_out')
+def calculated_model_create_fan_out(context):
+    create_items(context, context.scaled(2000))
+
+    def run():
+        BenchmarkAggregate.create()
+
+    return run
+
+
+@benchmark('calculation_log_create')
+def calculation_log_create(context):
+    from generic_app.submodels.CalculationLog import CalculationLog
+
+    number_of_messages = context.scaled(200)
+
+    def run():
+        # CalculationLog.save prints every message
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(number_of_messages):
+                CalculationLog.create(f'{CalculationLog.SUCCESS}benchmark message {i}')
+
+    return run
+
+
+@benchmark('log_report_generation')
+def log_report_generation(context):
+    from generic_app.submodels.CalculationIDs import CalculationIDs
+    from generic_app.submodels.Log import Log
+
+    category = generate_categories(context.rng, 1)[0]
+    calculation_id = 'benchmark_calculation'
+    CalculationIDs.objects.create(calculation_record=f'{category._meta.model_name}_{category.pk}',
+                                  calculation_id=calculation_id, context_id='benchmark')
+    generate_calculation_logs(context.rng, context.scaled(2000), calculation_id, category)
+    log = Log(group=category.get_log_filter()[1])
+
+    def remove_reports():
+        # otherwise, the reports of the previous round would be read and extended
+        for directory in ['full_logs', 'time_sheets', 'input_validation']:
+            _, files = default_storage.listdir(f'calculation_logs_download/{directory}') \
+                if default_storage.exists(f'calculation_logs_download/{directory}') else ([], [])
+            for file in files:
+                default_storage.delete(f'calculation_logs_download/{directory}/{file}')
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            log.calculate(category)
+
+    return run, remove_reports
+
+
+@benchmark('model_export')
+def model_export(context):
+    from generic_app.rest_api.views.file_operations.ModelExport import ModelExportView
+
+    create_items(context, context.scaled(5000))
+    model_collection = create_model_collection()
+    container = model_collection.get_container(BenchmarkItem)
+    view = ModelExportView.as_view(model_collection=model_collection)
+
+    def run():
+        request = request_factory.post('/', data=json.dumps({'filtered_export': None}),
+                                       content_type='application/json')
+        force_authenticate(request, user=context.user)
+        render(view(request, model_container=container))
+
+    return run
+
+
+# the global search is based on the full text search of PostgreSQL
+@benchmark('global_search', vendors=['postgresql'])
+def global_search(context):
+    from generic_app.rest_api.views.global_search_for_models.Search import Search
+
+    create_items(context, context.scaled(5000))
+    view = Search.as_view(model_collection=create_model_collection())
+
+    def run():
+        request = request_factory.get('/')
+        force_authenticate(request, user=context.user)
+        render(view(request, query='magna'))
+
+    return run
+
+
+@benchmark('xlsx_create_excel_file_from_dfs')
+def xlsx_create_excel_file_from_dfs(context):
+    dfs = generate_dataframes(context.rng, 3, context.scaled(5000), 10)
+    sheet_names = [f'Sheet {i}' for i in range(len(dfs))]
+    report = BenchmarkReport.objects.create()
+
+    def run():
+        XLSXField.create_excel_file_from_dfs(report.report, 'benchmark_reports/report.xlsx', dfs, sheet_names)
+
+    return run
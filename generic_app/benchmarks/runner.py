@@ -0,0 +1,165 @@
+import platform
+import statistics
+import subprocess
+import time
+import traceback
+from datetime import datetime
+
+import django
+from django.db import connection, transaction
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    def __init__(self, name, prepare, vendors=None) -> None:
+        super().__init__()
+        self.name = name
+        self.prepare = prepare
+        # database vendors the benchmark can run on; None means all
+        self.vendors = vendors
+
+    def supports(self, vendor):
+        return self.vendors is None or vendor in self.vendors
+
+
+def benchmark(name, vendors=None):
+    """
+    Registers a benchmark. The decorated function gets the BenchmarkContext, creates the data of the benchmark
+    and returns the function to be measured, optionally together with a function to be called before each round
+    (which is not measured), as tuple.
+    """
+
+    def register(prepare):
+        BENCHMARKS[name] = Benchmark(name, prepare, vendors)
+        return prepare
+
+    return register
+
+
+class BenchmarkContext:
+    def __init__(self, rng, scale, user, storage_directory) -> None:
+        super().__init__()
+        self.rng = rng
+        self.scale = scale
+        self.user = user
+        self.storage_directory = storage_directory
+
+    def scaled(self, count):
+        return max(int(count * self.scale), 1)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class BenchmarkRunner:
+    """
+    Runs the registered benchmarks, each in a transaction that is rolled back afterwards, such that every
+    benchmark starts on the same data. Per benchmark, the duration and the number of database queries of every
+    round are recorded.
+    """
+
+    def __init__(self, context, rounds=5, warmup_rounds=1) -> None:
+        super().__init__()
+        self.context = context
+        self.rounds = rounds
+        self.warmup_rounds = warmup_rounds
+
+    def run(self, names=None):
+        results = {}
+        for name, registered_benchmark in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            if not registered_benchmark.supports(connection.vendor):
+                results[name] = {'skipped': f'not supported on {connection.vendor}'}
+                continue
+            try:
+                results[name] = self.run_benchmark(registered_benchmark)
+            except Exception:
+                results[name] = {'error': traceback.format_exc()}
+        return results
+
+    def run_benchmark(self, registered_benchmark):
+        result = {}
+        try:
+            with transaction.atomic():
+                prepared = registered_benchmark.prepare(self.context)
+                function, before_each = prepared if isinstance(prepared, tuple) else (prepared, None)
+                durations = []
+                queries = []
+                for i in range(self.warmup_rounds + self.rounds):
+                    if before_each is not None:
+                        before_each()
+                    query_counter = QueryCounter()
+                    with connection.execute_wrapper(query_counter):
+                        start = time.perf_counter()
+                        function()
+                        duration = time.perf_counter() - start
+                    if i >= self.warmup_rounds:
+                        durations.append(duration)
+                        queries.append(query_counter.count)
+                result = summarize(durations, queries)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return result
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def summarize(durations, queries):
+    return {
+        'rounds': len(durations),
+        'min': min(durations),
+        'max': max(durations),
+        'mean': statistics.mean(durations),
+        'median': statistics.median(durations),
+        'stdev': statistics.stdev(durations) if len(durations) > 1 else 0,
+        'queries': statistics.median(queries),
+    }
+
+
+def get_git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def get_metadata(scale, rounds):
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': get_git_revision(),
+        'database_vendor': connection.vendor,
+        'database_version': connection.Database.sqlite_version
+        if connection.vendor == 'sqlite' else getattr(connection, 'pg_version', None),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'scale': scale,
+        'rounds': rounds,
+    }
+
+
+def find_regressions(results, baseline, max_regression):
+    """
+    :return: (name, baseline median, median) of all benchmarks whose median duration is more than
+    'max_regression' (relative) above the one of the baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline_result = baseline.get('benchmarks', {}).get(name, {})
+        if 'median' not in result or 'median' not in baseline_result:
+            continue
+        if result['median'] > baseline_result['median'] * (1 + max_regression):
+            regressions.append((name, baseline_result['median'], result['median']))
+    return regressions
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from django.db import connection
+
+from generic_app import models
+from generic_app.generic_models.ModelModificationRestriction import ModelModificationRestriction
+
+WORDS = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do', 'eiusmod',
+         'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore', 'magna', 'aliqua', 'revenue', 'cost', 'margin']
+
+
+class OwnerReadRestriction(ModelModificationRestriction):
+    """
+    Instance-wise read restriction: only the owner of an entry can read it
+    """
+
+    def can_be_read(self, instance, user, violations):
+        return instance.owner == user.username
+
+
+class BenchmarkCategory(models.Model):
+    id = models.AutoField(primary_key=True)
+    name = models.TextField()
+
+    class Meta:
+        app_label = 'generic_app'
+        managed = False
+
+    def __str__(self):
+        return self.name
+
+    def get_log_filter(self):
+        # see Log.log
+        return [[f'{get_log_trace_name(self)} | {self.name}'], f'benchmark_{self.pk}']
+
+
+class BenchmarkItem(models.Model):
+    modification_restriction = OwnerReadRestriction()
+    id = models.AutoField(primary_key=True)
+    name = models.TextField()
+    description = models.TextField()
+    owner = models.TextField()
+    amount = models.FloatField()
+    quantity = models.IntegerField()
+    created = models.DateTimeField()
+    category = models.ForeignKey(BenchmarkCategory, on_delete=models.CASCADE)
+
+    class Meta:
+        app_label = 'generic_app'
+        managed = False
+
+    def __str__(self):
+        return self.name
+
+
+class BenchmarkAggregate(models.CalculatedModelMixin, models.Model):
+    id = models.AutoField(primary_key=True)
+    category = models.ForeignKey(BenchmarkCategory, on_delete=models.CASCADE)
+    bucket = models.IntegerField()
+    total_amount = models.FloatField(default=0)
+
+    defining_fields = ['category', 'bucket']
+    number_of_buckets = 10
+
+    class Meta:
+        app_label = 'generic_app'
+        managed = False
+
+    def get_selected_key_list(self, key: str) -> list:
+        if key == 'category':
+            return list(BenchmarkCategory.objects.all())
+        if key == 'bucket':
+            return list(range(self.number_of_buckets))
+
+    def calculate(self):
+        amounts = BenchmarkItem.objects.filter(category=self.category,
+                                               quantity__gte=self.bucket * 10,
+                                               quantity__lt=(self.bucket + 1) * 10).values_list('amount', flat=True)
+        self.total_amount = sum(amounts)
+
+
+class BenchmarkReport(models.Model):
+    id = models.AutoField(primary_key=True)
+    report = models.XLSXField(default='', max_length=300)
+
+    class Meta:
+        app_label = 'generic_app'
+        managed = False
+
+
+SYNTHETIC_MODELS = [BenchmarkCategory, BenchmarkItem, BenchmarkAggregate, BenchmarkReport]
+
+
+def create_synthetic_tables():
+    with connection.schema_editor() as schema_editor:
+        for model in SYNTHETIC_MODELS:
+            schema_editor.create_model(model)
+
+
+def drop_synthetic_tables():
+    with connection.schema_editor() as schema_editor:
+        for model in reversed(SYNTHETIC_MODELS):
+            schema_editor.delete_model(model)
+
+
+def get_log_trace_name(category):
+    return f'BenchmarkCategory{category.pk}'
+
+
+def random_text(rng, number_of_words):
+    return ' '.join(rng.choice(WORDS) for _ in range(number_of_words))
+
+
+def generate_categories(rng, count):
+    BenchmarkCategory.objects.bulk_create([BenchmarkCategory(name=f'{random_text(rng, 2)} {i}') for i in range(count)])
+    # bulk_create does not set the primary keys on all databases
+    return list(reversed(BenchmarkCategory.objects.order_by('-id')[:count]))
+
+
+def generate_items(rng, count, categories, owners, batch_size=1000):
+    start = datetime(2020, 1, 1)
+    items = [BenchmarkItem(name=f'{random_text(rng, 3)} {i}', description=random_text(rng, 12),
+                           owner=rng.choice(owners), amount=rng.uniform(-1000, 1000), quantity=rng.randrange(100),
+                           created=start + timedelta(minutes=rng.randrange(500000)), category=rng.choice(categories))
+             for i in range(count)]
+    return BenchmarkItem.objects.bulk_create(items, batch_size=batch_size)
+
+
+def generate_calculation_logs(rng, count, calculation_id, category, batch_size=1000):
+    """
+    Creates the calculation logs of a calculation of the given category as CalculationLog.create would do,
+    consisting of Start/Finish-pairs and messages between them
+    """
+    from generic_app.submodels.CalculationLog import CalculationLog
+
+    trace = str([(get_log_trace_name(category), 'calculate', 10, category.name),
+                 ('BenchmarkItem', 'calculate', 20, 'item')])
+    severities = [CalculationLog.START, CalculationLog.SUCCESS, CalculationLog.WARNING, CalculationLog.FINISH]
+    start = datetime(2020, 1, 1)
+    logs = [CalculationLog(timestamp=start + timedelta(seconds=i), method=trace,
+                           calculation_record=f'{category._meta.model_name}_{category.pk}',
+                           message=f'{severities[i % 4]}{random_text(rng, 6)}', calculationId=calculation_id,
+                           message_type=CalculationLog.PROGRESS)
+            for i in range(count - count % 4)]
+    return CalculationLog.objects.bulk_create(logs, batch_size=batch_size)
+
+
+def generate_dataframes(rng, number_of_sheets, rows, columns):
+    np_rng = np.random.default_rng(rng.randrange(2 ** 32))
+    dfs = []
+    for _ in range(number_of_sheets):
+        df = pd.DataFrame(np_rng.uniform(-1000, 1000, size=(rows, columns)),
+                          columns=[f'value_{i}' for i in range(columns)])
+        df['label'] = [random_text(rng, 2) for _ in range(rows)]
+        dfs.append(df)
+    return dfs
@@ -6,15 +6,18 @@ from celery.result import ResultSet, allow_join_result
 from django.db.models import Model, TextField, UniqueConstraint
 from django.db.models.base import ModelBase
 
+from generic_app.rest_api.calculation_profiler import profile_stage
 from lex_app import settings
 def _flatten(list_2d):
     return list(itertools.chain.from_iterable(list_2d))
 
 def calc_and_save(models, *args):
     for model in models:
-        model.calculate(*args)
+        with profile_stage(f"{type(model).__name__}.calculate"):
+            model.calculate(*args)
         try:
-            model.save()
+            with profile_stage(f"{type(model).__name__}.save"):
+                model.save()
         except Exception as e:
             old_model = model.delete_models_with_same_defining_fields()
             model.pk = old_model.pk
@@ -54,6 +57,11 @@ class CalculatedModelMixin(Model, metaclass=CalculatedModelMixinMeta):
 
     @classmethod
     def create(cls, *args, **kwargs):
+        with profile_stage(f"{cls.__name__}.create"):
+            cls._create(*args, **kwargs)
+
+    @classmethod
+    def _create(cls, *args, **kwargs):
         # define cls as base model
         models = [cls()]
         deleted = False
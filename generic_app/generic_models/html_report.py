@@ -1,4 +1,31 @@
+import importlib
+
+
 class HTMLReport:
 
     def get_html(self, user):
         return ''
+
+
+def create_deferred_html_report(module_name, class_name):
+    """
+    Creates a placeholder for the HTMLReport 'class_name' of the module 'module_name', which can be registered
+    instead of the report itself. The module (and the libraries it uses) is only imported on the first call
+    of get_html.
+    """
+    resolved = {}
+
+    def resolve():
+        if 'class' not in resolved:
+            resolved['class'] = getattr(importlib.import_module(module_name), class_name)
+        return resolved['class']
+
+    def get_html(self, user):
+        return resolve()().get_html(user)
+
+    return type(class_name, (HTMLReport,), {
+        '__module__': module_name,
+        'get_html': get_html,
+        'resolve': staticmethod(resolve),
+        'is_deferred': True,
+    })
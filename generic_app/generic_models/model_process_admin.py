@@ -20,7 +20,7 @@ def get_displayed_fields(model):
 class ModelProcessAdmin:
 
     def __init__(self, to_display_string=None, fields_not_in_table_view=None, main_field=None,
-                 allow_quick_instance_creation=True) -> None:
+                 allow_quick_instance_creation=True, restrict_queries_to_table_view=False) -> None:
         """
         :param to_display_string: can be set to a function that is applied to each instance
         for getting the display string for it. If None, the str-method is used
@@ -30,6 +30,9 @@ class ModelProcessAdmin:
         The main field links to the update-/details-view of an instance. Default: the first field defined in the model.
         :param allow_quick_instance_creation: whether there should be an instance-add-button for a model
         in the tree-view that represents the model structure
+        :param restrict_queries_to_table_view: whether the entries of this model should be loaded with only the
+        fields of the table view (all other columns are deferred). Only set this, if the str-method of the model
+        does not access any field that is not shown in the table view. Default: False.
         """
         super().__init__()
 
@@ -46,6 +49,7 @@ class ModelProcessAdmin:
         self._models2fields_in_table_view = dict()
 
         self._allow_quick_instance_creation = allow_quick_instance_creation
+        self.restrict_queries_to_table_view = restrict_queries_to_table_view
 
     def _create_fields_in_table_view(self, model):
         fields = get_displayed_fields(model)
@@ -1,6 +1,10 @@
 from django.db.models import Model
 
 
+def _get_visit_key(entry):
+    return (type(entry)._meta.label_lower, entry.pk) if entry.pk is not None else id(entry)
+
+
 # Mixin to be added to every model, that may cause need to update any calculated models
 class DependencyAnalysisMixin(Model):
     # Set this field to true, if, upon updating this entry, not only the entries
@@ -18,14 +22,19 @@ class DependencyAnalysisMixin(Model):
         return {}
 
     # Returns all entries, that the user requires to be updated whenever this entry is, as keys of a dictionary
-    # TODO: Deal with circular dependencies
-    def get_dependent_entries(self):
+    # Circular dependencies are only followed once ('visited' contains the entries whose dependent entries
+    # are already collected); they are reported by the recalculation schedule
+    def get_dependent_entries(self, visited=None):
+        if visited is None:
+            visited = set()
+        visited.add(_get_visit_key(self))
+
         dependent_entries = dict.fromkeys(self.directly_dependent_entries())
         if self.do_cascading_updates:
             cascading_dependent_entries_list = list(map(
-                lambda entry: entry.get_dependent_entries(),
+                lambda entry: entry.get_dependent_entries(visited),
                 list(filter(
-                    lambda entry: issubclass(type(entry), DependencyAnalysisMixin),
+                    lambda entry: issubclass(type(entry), DependencyAnalysisMixin) and _get_visit_key(entry) not in visited,
                     dependent_entries
                 ))
             ))
@@ -9,9 +9,9 @@ from celery.signals import task_failure, task_success, task_postrun
 
 from django.db.models import Model, BooleanField
 
+from generic_app.rest_api.calculation_profiler import profile_stage
 from generic_app.rest_api.signals import update_calculation_status
-from generic_app.submodels.CalculationIDs import CalculationIDs
-from generic_app.rest_api.context import context_id
+from generic_app.rest_api.calculation_ids import get_calculation_id_of_context
 
 
 def custom_shared_task(function):
@@ -112,12 +112,13 @@ class ConditionalUpdateMixin(Model):
                 if (hasattr(function, 'delay') and
                     os.getenv("DEPLOYMENT_ENVIRONMENT")
                         and os.getenv("ARCHITECTURE") == "MQ/Worker"):
-                    obj = CalculationIDs.objects.filter(context_id=context_id.get()).first()
-                    calculation_id = getattr(obj, "calculation_id", "test_id")
+                    calculation_id = get_calculation_id_of_context()
                     return_value = function.apply_async(args=args, kwargs=kwargs, task_id=str(calculation_id))
                     self.celery_result = return_value
                 else:
-                    return_value = function(*args, **kwargs)
+                    with profile_stage(f"{type(self).__name__}.{function.__name__}",
+                                       calculation_record=f"{self._meta.model_name}_{self.pk}"):
+                        return_value = function(*args, **kwargs)
                     if (not hasattr(self, 'is_inner_calculation') or
                             not self.is_inner_calculation):
                         self.is_calculated = True
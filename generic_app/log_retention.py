@@ -0,0 +1,192 @@
+import logging
+import os
+import tempfile
+import time
+from array import array
+from datetime import timedelta
+
+from celery import shared_task
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Retention of the logs of calculation records without CalculationLogRetention; if not set, they are kept
+DEFAULT_RETENTION_DAYS = os.getenv('CALCULATION_LOG_RETENTION_DAYS')
+DEFAULT_ARCHIVE = os.getenv('CALCULATION_LOG_ARCHIVE', 'true') != 'false'
+CHUNK_SIZE = int(os.getenv('CALCULATION_LOG_DELETION_CHUNK_SIZE', 5000))
+# Pause between two chunks, giving room to other transactions and to autovacuum
+CHUNK_PAUSE_SECONDS = float(os.getenv('CALCULATION_LOG_DELETION_PAUSE_SECONDS', 0.1))
+
+LOG_FIELDS = ['id', 'timestamp', 'trigger_name', 'message_type', 'calculationId', 'calculation_record', 'message',
+              'method', 'is_notification']
+
+
+def delete_in_chunks(queryset, archive=False, chunk_size=CHUNK_SIZE, pause_seconds=CHUNK_PAUSE_SECONDS):
+    """
+    Deletes the entries of the queryset in chunks of 'chunk_size', each in its own short transaction, instead of
+    in one transaction holding locks on all entries. With 'archive', the CalculationLogs are copied to the
+    CalculationLogArchive in the same transaction as they are deleted.
+    :return: number of deleted entries
+    """
+    from generic_app.submodels.CalculationLogArchive import CalculationLogArchive
+
+    model = queryset.model
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                return deleted
+            chunk = model.objects.filter(pk__in=ids)
+            if archive:
+                archived_at = timezone.now()
+                CalculationLogArchive.objects.bulk_create(
+                    [CalculationLogArchive(archived_at=archived_at, **values) for values in chunk.values(*LOG_FIELDS)],
+                    ignore_conflicts=True
+                )
+            chunk.delete()
+        deleted += len(ids)
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+
+def get_expired_logs(retentions, now):
+    """
+    :return: list of (retention, queryset of the expired CalculationLogs, archive); every log belongs to the most
+    specific retention matching its calculation record (exact name before longest prefix before default)
+    """
+    from generic_app.submodels.CalculationLog import CalculationLog
+
+    exact = [r for r in retentions if not r.calculation_record.endswith('*')]
+    prefixes = sorted([r for r in retentions if r.calculation_record.endswith('*')],
+                      key=lambda r: len(r.calculation_record), reverse=True)
+    exact_records = [r.calculation_record for r in exact]
+
+    expired = []
+    for retention in exact:
+        expired.append((retention, CalculationLog.objects.filter(
+            calculation_record=retention.calculation_record,
+            timestamp__lt=now - timedelta(days=retention.retention_days)
+        ), retention.archive))
+
+    for index, retention in enumerate(prefixes):
+        prefix = retention.calculation_record[:-1]
+        queryset = CalculationLog.objects.filter(calculation_record__startswith=prefix,
+                                                 timestamp__lt=now - timedelta(days=retention.retention_days))
+        more_specific = Q(calculation_record__in=exact_records)
+        for other in prefixes[:index]:
+            more_specific |= Q(calculation_record__startswith=other.calculation_record[:-1])
+        expired.append((retention, queryset.exclude(more_specific), retention.archive))
+
+    if DEFAULT_RETENTION_DAYS:
+        queryset = CalculationLog.objects.filter(timestamp__lt=now - timedelta(days=int(DEFAULT_RETENTION_DAYS)))
+        covered = Q(calculation_record__in=exact_records)
+        for retention in prefixes:
+            covered |= Q(calculation_record__startswith=retention.calculation_record[:-1])
+        expired.append((None, queryset.exclude(covered), DEFAULT_ARCHIVE))
+    return expired
+
+
+def apply_retention(chunk_size=CHUNK_SIZE, pause_seconds=CHUNK_PAUSE_SECONDS, dry_run=False):
+    """
+    Archives or deletes all expired CalculationLogs (see CalculationLogRetention)
+    :return: dictionary retention -> number of archived or deleted logs
+    """
+    from generic_app.submodels.CalculationLogRetention import CalculationLogRetention
+
+    result = {}
+    for retention, queryset, archive in get_expired_logs(list(CalculationLogRetention.objects.all()), timezone.now()):
+        name = retention.calculation_record if retention is not None else 'default'
+        if dry_run:
+            result[name] = queryset.count()
+        else:
+            result[name] = delete_in_chunks(queryset, archive, chunk_size, pause_seconds)
+            logger.info(f"Log retention {name}: {result[name]} logs {'archived' if archive else 'deleted'}")
+    return result
+
+
+def export_archive_to_parquet(path=None, archived_before=None, delete=False, chunk_size=50000):
+    """
+    Writes the archived CalculationLogs (optionally only those archived before 'archived_before') as
+    zstd-compressed Parquet file to the default_storage. The logs are read in chunks and written as row groups
+    via a temporary file, so they are never held in memory completely. With 'delete', exactly the exported logs
+    (by their ids) are removed from the archive afterwards; logs archived during the export are kept, even if their
+    ids lie between those of exported logs (the ids are those of the CalculationLogs, not in the order of archiving).
+    The ids of the exported logs are spooled to a temporary file as well and read back in chunks for the deletion.
+    Requires pyarrow.
+    :return: the name of the file in the default_storage, or None if there was nothing to export
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from generic_app.submodels.CalculationLogArchive import CalculationLogArchive
+
+    archived_before = archived_before or timezone.now()
+    queryset = CalculationLogArchive.objects.filter(archived_at__lte=archived_before)
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('timestamp', pa.timestamp('us')),
+        ('trigger_name', pa.string()),
+        ('message_type', pa.string()),
+        ('calculationId', pa.string()),
+        ('calculation_record', pa.string()),
+        ('message', pa.string()),
+        ('method', pa.string()),
+        ('is_notification', pa.bool_()),
+        ('archived_at', pa.timestamp('us')),
+    ])
+
+    exported = 0
+    # ids of the written rows, as 64-bit integers
+    with tempfile.TemporaryFile() as file, tempfile.TemporaryFile() as id_file:
+        with pq.ParquetWriter(file, schema, compression='zstd') as writer:
+            last_id = None
+            while True:
+                chunk = queryset.order_by('pk')
+                if last_id is not None:
+                    chunk = chunk.filter(pk__gt=last_id)
+                rows = list(chunk.values(*schema.names)[:chunk_size])
+                if not rows:
+                    break
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                exported += len(rows)
+                last_id = rows[-1]['id']
+                if delete:
+                    array('q', [row['id'] for row in rows]).tofile(id_file)
+        if not exported:
+            return None
+        file.seek(0)
+        path = path or f"calculation_logs_archive/CalculationLogs_{archived_before.strftime('%Y-%m-%d_%H_%M_%S')}.parquet"
+        name = default_storage.save(path, File(file, name=os.path.basename(path)))
+        logger.info(f"{exported} archived logs exported to {name}")
+
+        if delete:
+            id_file.seek(0)
+            for ids in read_ids_in_chunks(id_file, chunk_size):
+                delete_in_chunks(CalculationLogArchive.objects.filter(pk__in=ids), chunk_size=chunk_size)
+    return name
+
+
+def read_ids_in_chunks(file, chunk_size):
+    """
+    Reads the ids written with array('q').tofile from the file, 'chunk_size' at a time
+    """
+    while True:
+        ids = array('q')
+        try:
+            ids.fromfile(file, chunk_size)
+        except EOFError:
+            # fewer than chunk_size ids were left; fromfile has read them nevertheless
+            pass
+        if ids:
+            yield ids.tolist()
+        if len(ids) < chunk_size:
+            return
+
+
+@shared_task(name="apply_calculation_log_retention")
+def apply_retention_task():
+    return apply_retention()
@@ -0,0 +1,122 @@
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, migrations
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+from generic_app.rest_api.filters.index_advisor import get_index_recommendations, TRIGRAM_INDEX
+
+MIGRATION_TEMPLATE = """# Generated by generic_app advise_filter_indexes on {timestamp}
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # the indexes are created concurrently, which is not possible inside a transaction
+    atomic = False
+
+    dependencies = [
+{dependencies}
+    ]
+
+    operations = [
+{operations}
+    ]
+"""
+
+RUN_SQL_TEMPLATE = """        migrations.RunSQL(
+            sql={create_sql!r},
+            reverse_sql={drop_sql!r},
+        ),"""
+
+
+class Command(BaseCommand):
+    help = ("Recommends indexes for the filterable fields of all registered models: trigram (pg_trgm) GIN indexes "
+            "for 'icontains'-filters on text fields and B-tree indexes for numeric and date fields. "
+            "Optionally writes a migration creating them.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--app-label', action='append', dest='app_labels',
+                            help='Only consider models of this app (can be given multiple times). '
+                                 'Default: the app of the project.')
+        parser.add_argument('--measure', action='store_true',
+                            help='Create each index inside a rolled-back transaction for estimating the gain via '
+                                 'EXPLAIN. This locks the tables for writes while the indexes are built.')
+        parser.add_argument('--write-migration', action='store_true',
+                            help='Write one migration per app that creates the recommended indexes concurrently.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The index advisor requires PostgreSQL, but found %s' % connection.vendor)
+
+        from lex_app.ProcessAdminSettings import processAdminSite
+        from lex_app.settings import repo_name
+
+        app_labels = set(options['app_labels'] or [repo_name])
+        model_collection = processAdminSite.get_model_collection()
+
+        recommendations_per_app = {}
+        for container in sorted(model_collection.all_containers, key=lambda c: c.id):
+            if not hasattr(container.model_class, '_meta') or container.model_class._meta.app_label not in app_labels:
+                continue
+            for recommendation in get_index_recommendations(container):
+                recommendation.estimate(measure=options['measure'])
+                self.report(container, recommendation)
+                recommendations_per_app.setdefault(container.model_class._meta.app_label, []).append(recommendation)
+
+        if not recommendations_per_app:
+            self.stdout.write(self.style.SUCCESS('All filterable fields are indexed.'))
+            return
+
+        if options['write_migration']:
+            for app_label, recommendations in recommendations_per_app.items():
+                path = self.write_migration(app_label, recommendations)
+                self.stdout.write(self.style.SUCCESS(f'Migration written to {path}'))
+            self.stdout.write("Add the fields with trigram indexes to 'indexed_filter_fields' of their models.")
+
+    def report(self, container, recommendation):
+        line = f'{container.id}.{recommendation.field.name}: {recommendation.index_type} index {recommendation.name}'
+        if recommendation.error is not None:
+            line += f' (estimation failed: {recommendation.error})'
+        elif recommendation.cost_without_index is not None:
+            line += (f' | sample query cost {recommendation.cost_without_index:.1f} '
+                     f'({", ".join(sorted(recommendation.scan_types_without_index))})')
+            if recommendation.cost_with_index is not None:
+                line += (f' -> {recommendation.cost_with_index:.1f} '
+                         f'({", ".join(sorted(recommendation.scan_types_with_index))})')
+            if recommendation.estimated_gain is not None:
+                line += f' | estimated gain x{recommendation.estimated_gain:.1f}'
+        self.stdout.write(line)
+
+    def write_migration(self, app_label, recommendations):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        leaf_nodes = loader.graph.leaf_nodes(app_label)
+        if leaf_nodes:
+            number = max(MigrationAutodetector.parse_number(name) or 0 for _, name in leaf_nodes) + 1
+        else:
+            number = 1
+        name = '%04i_filter_indexes' % number
+
+        operations = []
+        if any(r.index_type == TRIGRAM_INDEX for r in recommendations):
+            operations.append('        TrigramExtension(),')
+        for recommendation in recommendations:
+            operations.append(RUN_SQL_TEMPLATE.format(create_sql=recommendation.get_create_sql(),
+                                                      drop_sql=recommendation.get_drop_sql()))
+
+        content = MIGRATION_TEMPLATE.format(
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M'),
+            dependencies='\n'.join(f'        ({app_label!r}, {leaf!r}),' for _, leaf in leaf_nodes),
+            operations='\n'.join(operations)
+        )
+
+        directory = MigrationWriter(migrations.Migration(name, app_label)).basedir
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{name}.py')
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
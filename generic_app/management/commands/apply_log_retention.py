@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from generic_app.log_retention import apply_retention, export_archive_to_parquet, CHUNK_SIZE, CHUNK_PAUSE_SECONDS
+
+
+class Command(BaseCommand):
+    help = ("Archives or deletes the expired CalculationLogs according to the CalculationLogRetentions (and "
+            "CALCULATION_LOG_RETENTION_DAYS for all other calculation records) in small chunks, and optionally "
+            "exports the archive as compressed Parquet file to the default storage.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help=f'Number of logs deleted per transaction (default: {CHUNK_SIZE}).')
+        parser.add_argument('--pause', type=float, default=CHUNK_PAUSE_SECONDS,
+                            help=f'Seconds to wait between two chunks (default: {CHUNK_PAUSE_SECONDS}).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the expired logs per retention.')
+        parser.add_argument('--export-archive', action='store_true',
+                            help='Export the archived logs to a Parquet file afterwards (requires pyarrow).')
+        parser.add_argument('--path', help='Name of the Parquet file in the default storage '
+                                           '(default: calculation_logs_archive/CalculationLogs_<timestamp>.parquet).')
+        parser.add_argument('--delete-exported', action='store_true',
+                            help='Remove the exported logs from the archive.')
+
+    def handle(self, *args, **options):
+        result = apply_retention(options['chunk_size'], options['pause'], options['dry_run'])
+        for name, count in result.items():
+            self.stdout.write(f"{name}: {count} {'expired' if options['dry_run'] else 'archived or deleted'} logs")
+
+        if options['export_archive'] and not options['dry_run']:
+            name = export_archive_to_parquet(options['path'], delete=options['delete_exported'])
+            if name is None:
+                self.stdout.write('The archive is empty.')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Archive exported to {name}'))
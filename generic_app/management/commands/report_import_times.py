@@ -0,0 +1,59 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Format of the lines written by 'python -X importtime': 'import time: <self [us]> | <cumulative [us]> | <module>'
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\| (\s*)(\S+)$')
+STARTUP_SCRIPT = 'import django; django.setup()'
+
+
+def parse_import_times(output):
+    """
+    :return: list of (module, self time [us], cumulative time [us], nesting depth) in the order of the output
+    """
+    import_times = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_time, cumulative_time, indentation, module = match.groups()
+            import_times.append((module, int(self_time), int(cumulative_time), len(indentation) // 2))
+    return import_times
+
+
+class Command(BaseCommand):
+    help = ("Starts the application in a subprocess with 'python -X importtime' and lists the modules whose import "
+            "takes the most time, e.g. submodels importing heavy libraries at module level.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Number of listed modules (default: 20).')
+        parser.add_argument('--prefix', action='append', dest='prefixes',
+                            help='Only list modules starting with this prefix (can be given multiple times). '
+                                 'Default: generic_app and the app of the project.')
+        parser.add_argument('--sort', choices=['cumulative', 'self'], default='cumulative',
+                            help='Sort by the cumulative import time (including the imported modules) '
+                                 'or by the time of the module itself (default: cumulative).')
+
+    def handle(self, *args, **options):
+        from lex_app.settings import repo_name
+
+        prefixes = tuple(options['prefixes'] or ['generic_app', repo_name])
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+                                env=os.environ.copy(), capture_output=True, text=True)
+        import_times = parse_import_times(result.stderr)
+        if not import_times:
+            raise CommandError('The startup did not report any import times:\n%s' % result.stderr[-2000:])
+        if result.returncode != 0:
+            self.stderr.write('The startup failed, the import times might be incomplete')
+
+        total = sum(self_time for _, self_time, _, _ in import_times)
+        sort_index = 2 if options['sort'] == 'cumulative' else 1
+        offenders = sorted((t for t in import_times if t[0].startswith(prefixes)),
+                           key=lambda t: t[sort_index], reverse=True)[:options['top']]
+
+        self.stdout.write(f'Total import time: {total / 1e6:.2f}s')
+        self.stdout.write(f'{"cumulative [ms]":>16} {"self [ms]":>10}  module')
+        for module, self_time, cumulative_time, _ in offenders:
+            self.stdout.write(f'{cumulative_time / 1e3:>16.1f} {self_time / 1e3:>10.1f}  {module}')
@@ -0,0 +1,105 @@
+import json
+import random
+import tempfile
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+
+def get_storage_settings(storage_directory):
+    """
+    :return: the settings replacing the default_storage by a FileSystemStorage in 'storage_directory'; Django >= 4.2
+    configures it via STORAGES (DEFAULT_FILE_STORAGE is ignored since 5.1)
+    """
+    backend = 'django.core.files.storage.FileSystemStorage'
+    if django.VERSION < (4, 2):
+        return {'DEFAULT_FILE_STORAGE': backend}
+    return {'STORAGES': {**settings.STORAGES,
+                         'default': {'BACKEND': backend, 'OPTIONS': {'location': storage_directory}}}}
+
+
+class Command(BaseCommand):
+    help = ("Runs the benchmarks of the hot paths of generic_app (list view with read restrictions, fan-out of "
+            "CalculatedModelMixin.create, CalculationLog.create, Log report generation, model export, global search "
+            "and XLSXField.create_excel_file_from_dfs) on synthetic models and data in a test database of the "
+            "configured database (e.g. SQLite or PostgreSQL) and writes the results as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='benchmark_results.json',
+                            help='File the results are written to (default: benchmark_results.json).')
+        parser.add_argument('--benchmark', action='append', dest='names',
+                            help='Only run this benchmark (can be given multiple times). Default: all.')
+        parser.add_argument('--rounds', type=int, default=5, help='Measured rounds per benchmark (default: 5).')
+        parser.add_argument('--warmup-rounds', type=int, default=1,
+                            help='Unmeasured rounds before the measured ones (default: 1).')
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Factor for the amount of generated data (default: 1.0).')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the data generators (default: 0).')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs.')
+        parser.add_argument('--compare', help='JSON file with the results of a previous run; fails if a benchmark '
+                                              'got slower than allowed by --max-regression.')
+        parser.add_argument('--max-regression', type=float, default=0.2,
+                            help='Allowed relative increase of the median duration compared to --compare '
+                                 '(default: 0.2).')
+
+    def handle(self, *args, **options):
+        # registers the benchmarks
+        from generic_app.benchmarks import hot_paths  # noqa: F401
+        from generic_app.benchmarks.runner import BENCHMARKS, BenchmarkContext, BenchmarkRunner, \
+            find_regressions, get_metadata
+        from generic_app.benchmarks.synthetic_data import create_synthetic_tables, drop_synthetic_tables
+
+        unknown_names = set(options['names'] or []) - set(BENCHMARKS)
+        if unknown_names:
+            raise CommandError(f'Unknown benchmarks {", ".join(sorted(unknown_names))}; '
+                               f'available: {", ".join(BENCHMARKS)}')
+
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                                               keepdb=options['keepdb'])
+        try:
+            with tempfile.TemporaryDirectory() as storage_directory, \
+                    override_settings(MEDIA_ROOT=storage_directory, **get_storage_settings(storage_directory)):
+                create_synthetic_tables()
+                try:
+                    user, _ = get_user_model().objects.get_or_create(username='benchmark_user')
+                    context = BenchmarkContext(random.Random(options['seed']), options['scale'], user,
+                                               storage_directory)
+                    runner = BenchmarkRunner(context, rounds=options['rounds'],
+                                             warmup_rounds=options['warmup_rounds'])
+                    results = runner.run(options['names'])
+                finally:
+                    drop_synthetic_tables()
+            metadata = get_metadata(options['scale'], options['rounds'])
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=options['keepdb'])
+
+        for name, result in results.items():
+            self.report(name, result)
+        with open(options['output'], 'w') as f:
+            json.dump({'metadata': metadata, 'benchmarks': results}, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+        if any('error' in result for result in results.values()):
+            raise CommandError('Some benchmarks failed')
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = find_regressions(results, baseline, options['max_regression'])
+            if regressions:
+                raise CommandError('Regressions compared to %s:\n%s' % (options['compare'], '\n'.join(
+                    f'{name}: {baseline_median * 1000:.1f} ms -> {median * 1000:.1f} ms'
+                    for name, baseline_median, median in regressions)))
+            self.stdout.write(self.style.SUCCESS(f'No regressions compared to {options["compare"]}'))
+
+    def report(self, name, result):
+        if 'skipped' in result:
+            self.stdout.write(f'{name}: skipped ({result["skipped"]})')
+        elif 'error' in result:
+            self.stderr.write(f'{name}: failed\n{result["error"]}')
+        else:
+            self.stdout.write(f'{name}: median {result["median"] * 1000:.1f} ms, min {result["min"] * 1000:.1f} ms, '
+                              f'stdev {result["stdev"] * 1000:.1f} ms, {result["queries"]:g} queries')
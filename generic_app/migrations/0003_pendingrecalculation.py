@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generic_app', '0002_calculationids_modificationrestrictedmodelexample_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingRecalculation',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('model_label', models.TextField()),
+                ('coalesce_key', models.TextField()),
+                ('object_pk', models.TextField()),
+                ('first_enqueued_at', models.DateTimeField()),
+                ('due_at', models.DateTimeField(db_index=True)),
+                ('attempts', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='pendingrecalculation',
+            constraint=models.UniqueConstraint(fields=('model_label', 'coalesce_key'),
+                                               name='unique_pending_recalculation'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generic_app', '0003_pendingrecalculation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalculationProfile',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('calculation_id', models.TextField()),
+                ('calculation_record', models.TextField(default='legacy')),
+                ('stage', models.TextField()),
+                ('depth', models.IntegerField(default=0)),
+                ('timestamp', models.DateTimeField()),
+                ('executions', models.IntegerField(default=0)),
+                ('wall_time', models.FloatField(default=0)),
+                ('cpu_time', models.FloatField(default=0)),
+                ('query_count', models.IntegerField(default=0)),
+                ('query_time', models.FloatField(default=0)),
+                ('peak_memory', models.BigIntegerField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='calculationprofile',
+            index=models.Index(fields=['calculation_id'], name='calculation_profile_id_idx'),
+        ),
+    ]
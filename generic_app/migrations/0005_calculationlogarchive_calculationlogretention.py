@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generic_app', '0004_calculationprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalculationLogArchive',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField()),
+                ('trigger_name', models.TextField(null=True)),
+                ('message_type', models.TextField(default='')),
+                ('calculationId', models.TextField(default='test_id')),
+                ('calculation_record', models.TextField(default='legacy')),
+                ('message', models.TextField()),
+                ('method', models.TextField()),
+                ('is_notification', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='calculationlogarchive',
+            index=models.Index(fields=['timestamp'], name='calculation_log_archive_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calculationlogarchive',
+            index=models.Index(fields=['calculation_record'], name='calculation_log_archive_rec_idx'),
+        ),
+        migrations.CreateModel(
+            name='CalculationLogRetention',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('calculation_record', models.TextField(unique=True)),
+                ('retention_days', models.IntegerField()),
+                ('archive', models.BooleanField(default=True)),
+            ],
+        ),
+    ]
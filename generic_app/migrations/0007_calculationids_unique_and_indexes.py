@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Only the latest entry of a calculation record and context is kept, such that the unique constraint can be
+    created
+    """
+    CalculationIDs = apps.get_model('generic_app', 'CalculationIDs')
+    duplicates = (CalculationIDs.objects.values('calculation_record', 'context_id')
+                  .annotate(latest_id=Max('id'), count=Count('id')).filter(count__gt=1))
+    for duplicate in duplicates.iterator():
+        CalculationIDs.objects.filter(calculation_record=duplicate['calculation_record'],
+                                      context_id=duplicate['context_id']).exclude(id=duplicate['latest_id']).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('generic_app', '0006_calculationlog_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='calculationids',
+            constraint=models.UniqueConstraint(fields=('calculation_record', 'context_id'),
+                                               name='calculation_ids_record_context_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='calculationids',
+            index=models.Index(fields=['context_id'], name='calculation_ids_context_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calculationids',
+            index=models.Index(fields=['calculation_id'], name='calculation_ids_calc_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generic_app', '0007_calculationids_unique_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileUpload',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('upload_id', models.TextField(unique=True)),
+                ('model_name', models.TextField()),
+                ('record_id', models.TextField()),
+                ('field_name', models.TextField()),
+                ('file_name', models.TextField()),
+                ('size', models.BigIntegerField()),
+                ('checksum', models.TextField(null=True)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('status', models.TextField(default='in_progress')),
+                ('stored_file', models.TextField(null=True)),
+                ('user_name', models.TextField(null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='fileupload',
+            index=models.Index(fields=['status', 'updated_at'], name='file_upload_status_idx'),
+        ),
+    ]
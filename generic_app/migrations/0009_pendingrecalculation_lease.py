@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generic_app', '0008_fileupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingrecalculation',
+            name='claimed_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='pendingrecalculation',
+            name='claim_id',
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+# the manifest lies in its own directory, which is not traversed, such that writing it does not change the
+# modification times of the traversed directories
+MANIFEST_DIRECTORY = ".model_discovery"
+MANIFEST_FILE_NAME = "manifest.json"
+# besides these, all directories starting with '.' (e.g. .git, .venv, .tox, .mypy_cache) are excluded
+EXCLUDED_DIRECTORIES = {"venv", "build", "dist", "__pycache__", "node_modules", "site-packages", MANIFEST_DIRECTORY}
+
+# kinds of the files recorded in the manifest
+MODEL_STRUCTURE = "model_structure"
+HTML_REPORT = "html_report"
+PROCESS = "process"
+MODEL = "model"
+OTHER = "other"
+
+
+def is_excluded_directory(name):
+    return name.startswith(".") or name in EXCLUDED_DIRECTORIES
+
+
+def find_project_files(base_path):
+    """
+    Finds all .py files below base_path not starting with '_', excluding those in hidden directories (starting
+    with '.') and in the EXCLUDED_DIRECTORIES. In contrast to a glob over '**', the excluded directories are not
+    traversed at all.
+    :return: the files and the modification times of all traversed directories
+    """
+    files = []
+    directories = {}
+    for directory, sub_directories, file_names in os.walk(base_path):
+        sub_directories[:] = [d for d in sub_directories if not is_excluded_directory(d)]
+        directories[directory] = os.stat(directory).st_mtime_ns
+        files.extend(Path(directory) / f for f in file_names if fnmatch(f, "[!_]*.py"))
+    return files, directories
+
+
+def hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class StartupTimer:
+    """
+    Collects a timing breakdown of the startup, e.g. for finding the submodel files whose import is slow
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.import_timings = {}
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0) + time.perf_counter() - start
+
+    def add_import(self, name, seconds):
+        self.import_timings[name] = self.import_timings.get(name, 0) + seconds
+        self.timings["imports"] = self.timings.get("imports", 0) + seconds
+
+    def get_breakdown(self, top=10):
+        slowest_imports = sorted(self.import_timings.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {"timings": dict(self.timings), "slowest_imports": dict(slowest_imports)}
+
+    def log(self, top=10):
+        breakdown = self.get_breakdown(top)
+        logger.info("Startup timings: " + ", ".join(f"{k}: {v:.3f}s" for k, v in breakdown["timings"].items()))
+        logger.info("Slowest imports: " + ", ".join(f"{k}: {v:.3f}s" for k, v in breakdown["slowest_imports"].items()))
+
+
+class DiscoveryManifest:
+    """
+    Cached index of the files of the project, the classes they define and the order in which they could be
+    imported. On a warm start, i.e. if no directory and no file changed since the manifest was written,
+    the files are taken from the manifest instead of searching the whole project, and they are imported in the
+    recorded order, such that no import has to be retried because of unresolved dependencies.
+    Directories are compared via their modification time (which changes when a file is added or removed),
+    files via their modification time and size, falling back to a content hash if only the time changed.
+    The manifest is written to PROJECT_ROOT/.model_discovery/manifest.json (can be changed via the environment
+    variable MODEL_DISCOVERY_MANIFEST); setting DISABLE_MODEL_DISCOVERY_MANIFEST disables it.
+    """
+
+    def __init__(self, base_path, manifest_path=None):
+        self.base_path = Path(base_path)
+        self.manifest_path = Path(manifest_path or os.getenv("MODEL_DISCOVERY_MANIFEST",
+                                                             self.base_path / MANIFEST_DIRECTORY / MANIFEST_FILE_NAME))
+        self.enabled = not os.getenv("DISABLE_MODEL_DISCOVERY_MANIFEST")
+        self.is_warm = False
+        self.changed = True
+
+        # relative path -> {'mtime', 'size', 'hash', 'kind', 'name'}
+        self.files = {}
+        # relative paths of the successfully imported files in import order (of the last start and of this start)
+        self.import_order = []
+        self.recorded_order = []
+        # relative path -> modification time
+        self.directories = {}
+
+    def _relative(self, path):
+        return Path(path).relative_to(self.base_path).as_posix()
+
+    def _absolute(self, relative_path):
+        return self.base_path / relative_path
+
+    def _read(self):
+        try:
+            with open(self.manifest_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION or data.get("base_path") != str(self.base_path):
+            return None
+        return data
+
+    def _directories_unchanged(self, directories):
+        for relative_path, mtime in directories.items():
+            try:
+                if os.stat(self._absolute(relative_path)).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _file_unchanged(self, relative_path, entry):
+        try:
+            stat = os.stat(self._absolute(relative_path))
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime"]:
+            return True
+        if hash_file(self._absolute(relative_path)) == entry["hash"]:
+            # e.g. after a checkout, the file is touched without being changed
+            entry["mtime"] = stat.st_mtime_ns
+            self.changed = True
+            return True
+        return False
+
+    def load(self):
+        """
+        :return: whether a valid manifest exists, i.e. whether this is a warm start
+        """
+        if not self.enabled:
+            return False
+        data = self._read()
+        if data is None or not self._directories_unchanged(data["directories"]):
+            return False
+        self.changed = False
+        if not all(self._file_unchanged(path, entry) for path, entry in data["files"].items()):
+            return False
+
+        self.files = data["files"]
+        self.directories = data["directories"]
+        self.import_order = data["import_order"]
+        self.is_warm = True
+        return True
+
+    def get_files(self):
+        """
+        :return: all files of the project; on a warm start, they are ordered such that dependencies are
+        imported first
+        """
+        if self.load():
+            ordered = set(self.import_order)
+            return ([self._absolute(p) for p in self.import_order]
+                    + [self._absolute(p) for p in self.files if p not in ordered])
+
+        if self.enabled:
+            try:
+                os.makedirs(self.manifest_path.parent, exist_ok=True)
+            except OSError:
+                pass
+        files, directories = find_project_files(self.base_path)
+        self.directories = {self._relative(d): mtime for d, mtime in directories.items()}
+        self.files = {}
+        for file in files:
+            stat = os.stat(file)
+            self.files[self._relative(file)] = {"mtime": stat.st_mtime_ns, "size": stat.st_size,
+                                                "hash": hash_file(file), "kind": None, "name": file.stem}
+        self.import_order = []
+        self.changed = True
+        return files
+
+    def record_import(self, file, kind):
+        relative_path = self._relative(file)
+        if relative_path not in self.files:
+            return
+        if self.files[relative_path]["kind"] != kind:
+            self.files[relative_path]["kind"] = kind
+            self.changed = True
+        if relative_path not in self.recorded_order:
+            self.recorded_order.append(relative_path)
+
+    def get_kind(self, file):
+        """
+        :return: the kind of the class defined in the file as recorded on the last start, or None if unknown
+        """
+        if not self.is_warm:
+            return None
+        entry = self.files.get(self._relative(file))
+        return entry["kind"] if entry else None
+
+    def get_files_of_kind(self, kind):
+        return [self._absolute(p) for p, entry in self.files.items() if entry["kind"] == kind]
+
+    def save(self):
+        if self.recorded_order != self.import_order:
+            self.import_order = self.recorded_order
+            self.changed = True
+        if not self.enabled or not self.changed:
+            return
+        data = {
+            "version": MANIFEST_VERSION,
+            "base_path": str(self.base_path),
+            "directories": self.directories,
+            "files": self.files,
+            "import_order": self.import_order,
+        }
+        # write atomically, as several workers might start at the same time
+        temporary_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temporary_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temporary_path, self.manifest_path)
+        except OSError:
+            logger.warning(f"Model discovery manifest could not be written to {self.manifest_path}")
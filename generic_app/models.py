@@ -1,7 +1,7 @@
 from datetime import datetime
 
-import asyncio
 import os
+import time
 import traceback
 from glob import glob
 
@@ -9,6 +9,8 @@ from pathlib import Path
 
 from generic_app.generic_models.Created_by_model import CreatedByMixin
 from generic_app.generic_models.Process import Process
+from generic_app import model_discovery
+from generic_app.model_discovery import DiscoveryManifest, StartupTimer
 from generic_app.rest_api.signals import custom_post_save
 from generic_app.rest_api.views.model_entries import One
 from django.db.models import (
@@ -31,7 +33,7 @@ from generic_app.generic_models.fields.Bokeh_field import BokehField
 
 from lex_app import settings
 from generic_app.generic_models.calculated_model import CalculatedModelMixin
-from generic_app.generic_models.html_report import HTMLReport
+from generic_app.generic_models.html_report import HTMLReport, create_deferred_html_report
 from generic_app.generic_models.upload_model import (
     UploadModelMixin,
     ConditionalUpdateMixin,
@@ -41,8 +43,7 @@ from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 
 from lex_app.ProcessAdminSettings import processAdminSite, adminSite
-from asgiref.sync import sync_to_async
-import nest_asyncio
+from generic_app.startup_tasks import startup_task_runner
 
 print("Importing sys")
 import sys
@@ -117,19 +118,28 @@ processAdminSite.register([User, Group, Permission, ContentType])
 
 app_name = Path(__file__).resolve().parent.parts[-1]
 
+startup_timer = StartupTimer()
+
 # Find all files in submodels
 base_path = Path(os.getenv("PROJECT_ROOT")).resolve()
 # List all .py files, excluding those in 'venv' directory and starting with '_'
-files = [
-    f
-    for f in base_path.glob("./**/[!_]*.py")
-    if "venv" not in f.parts and ".venv" not in f.parts and "build" not in f.parts
-]
+# On a warm start, the files are taken from the discovery manifest in an order in which they can be imported
+discovery_manifest = DiscoveryManifest(base_path)
+with startup_timer.measure("discover_files"):
+    files = discovery_manifest.get_files()
+# If set, the modules of HTMLReports known from the discovery manifest are only imported on their first use,
+# while all models (including Processes, which are models as well) are still imported at startup
+defer_html_reports = os.getenv("DEFER_HTML_REPORT_IMPORTS") == "true"
 from generic_app.submodels.UserChangeLog import UserChangeLog
 from generic_app.submodels.CalculationLog import CalculationLog
 from generic_app.submodels.CalculationIDs import CalculationIDs
 from generic_app.submodels.Log import Log
 from generic_app.submodels.Streamlit import Streamlit
+from generic_app.submodels.PendingRecalculation import PendingRecalculation
+from generic_app.submodels.CalculationProfile import CalculationProfile
+from generic_app.submodels.CalculationLogArchive import CalculationLogArchive
+from generic_app.submodels.CalculationLogRetention import CalculationLogRetention
+from generic_app.submodels.FileUpload import FileUpload
 
 # migrations need to lie on the top level of the repository. Therefore, the
 repo_name = settings.repo_name
@@ -138,12 +148,14 @@ settings.MIGRATION_MODULES[repo_name] = f"{repo_name}.migrations"
 processAdminSite.register(
     [UserChangeLog, CalculationIDs, CalculationLog, Streamlit, Log]
 )
-adminSite.register([UserChangeLog, CalculationIDs, CalculationLog, Log])
+adminSite.register([UserChangeLog, CalculationIDs, CalculationLog, Log, CalculationProfile, CalculationLogArchive,
+                    CalculationLogRetention, FileUpload])
 processAdminSite.registerHTMLReport("streamlit", Streamlit)
 
 model_structure_defined = False
 auth_settings = None
 widget_structure = []
+imported_classes = {}
 i = 0
 while i < len(files):
     file = files[i]
@@ -151,6 +163,7 @@ while i < len(files):
     name = file.stem
     subfolders = ".".join(file.parts[file.parts.index(repo_name) + 1 : -1])
     if not is_special_file(file):
+        import_start = time.perf_counter()
         try:
             # TODO ensure that no wrong things can be imported here. #Security Issue
 
@@ -168,17 +181,32 @@ while i < len(files):
                     global_filter_structure = (
                         imported_file.get_global_filter_structure()
                     )
+                discovery_manifest.record_import(file, model_discovery.MODEL_STRUCTURE)
 
             else:
-                exec(f"from {subfolders}.{name} import {name}")
-                imported_class = eval(name)
+                if (
+                    defer_html_reports
+                    and discovery_manifest.get_kind(file) == model_discovery.HTML_REPORT
+                ):
+                    imported_class = create_deferred_html_report(f"{subfolders}.{name}", name)
+                else:
+                    exec(f"from {subfolders}.{name} import {name}")
+                    imported_class = eval(name)
+                imported_classes[file] = imported_class
                 if issubclass(imported_class, HTMLReport):
                     processAdminSite.registerHTMLReport(name.lower(), imported_class)
                     processAdminSite.register([imported_class])
+                    discovery_manifest.record_import(
+                        file,
+                        model_discovery.MODEL
+                        if issubclass(imported_class, Model)
+                        else model_discovery.HTML_REPORT,
+                    )
 
                 elif issubclass(imported_class, Process):
                     processAdminSite.registerProcess(name.lower(), imported_class)
                     processAdminSite.register([imported_class])
+                    discovery_manifest.record_import(file, model_discovery.PROCESS)
 
                 elif (
                     not issubclass(imported_class, type)
@@ -186,28 +214,23 @@ while i < len(files):
                 ):
                     processAdminSite.register([imported_class])
                     adminSite.register([imported_class])
+                    discovery_manifest.record_import(file, model_discovery.MODEL)
 
                     # Below part should be updated with the new use case dpag pip
 
                     if issubclass(imported_class, ConditionalUpdateMixin):
-                        if os.getenv("CALLED_FROM_START_COMMAND"):
-
-                            @sync_to_async
-                            def reset_instances_with_aborted_calculations():
-                                if not os.getenv("CELERY_ACTIVE"):
-                                    aborted_calc_instances = (
-                                        imported_class.objects.filter(calculate=True)
-                                    )
-                                    aborted_calc_instances.update(calculate=False)
-
-                            nest_asyncio.apply()
-                            loop = asyncio.get_event_loop()
-                            loop.run_until_complete(
-                                reset_instances_with_aborted_calculations()
+                        if os.getenv("CALLED_FROM_START_COMMAND") and not os.getenv(
+                            "CELERY_ACTIVE"
+                        ):
+                            # reset after the startup together with all other models, see apps.py
+                            startup_task_runner.register_aborted_calculation_reset(
+                                imported_class
                             )
                     #
                     # if not model_structure_defined:
                     #    insert_model_to_structure(model_structure, subfolders, imported_class._meta.model_name)
+                else:
+                    discovery_manifest.record_import(file, model_discovery.OTHER)
 
         except NameError as e:
             # If the current file can't be imported, put it in the end of the line hoping that we will clear the dependecies later
@@ -221,6 +244,10 @@ while i < len(files):
                 files.append(file)
             else:
                 traceback.print_exc()
+        finally:
+            startup_timer.add_import(f"{subfolders}.{name}", time.perf_counter() - import_start)
+
+discovery_manifest.save()
 
 try:
     mod_files = list(Path.cwd().glob("**/_authentication_settings.py"))
@@ -243,12 +270,13 @@ if len(auth_files) > 0:
     auth_settings = eval(name)
 
 if not model_structure_defined:
-    sorted_files = sorted(files)
+    # the classes imported above are reused instead of evaluating every name again
+    sorted_files = sorted(imported_classes)
     for file in sorted_files:
         name = file.stem
         subfolders = ".".join(file.parts[file.parts.index(repo_name) + 1 : -1])
         if is_included_in_model_structure(file):
-            imported_class = eval(name)
+            imported_class = imported_classes[file]
             if issubclass(imported_class, HTMLReport):
                 insert_model_to_structure(model_structure, subfolders, name.lower())
             elif issubclass(imported_class, Process):
@@ -275,6 +303,8 @@ processAdminSite.register_model_structure(model_structure)
 processAdminSite.register_model_styling(model_styling)
 processAdminSite.register_global_filter_structure(global_filter_structure)
 
+startup_timer.log()
+
 print(f"checking for runserver, {sys.argv}")
 if sys.argv[1:2] == ["runserver"]:
     # Something specific to running "test"
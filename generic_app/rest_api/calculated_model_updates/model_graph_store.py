@@ -0,0 +1,75 @@
+from collections import deque
+
+
+class CircularDependencyError(Exception):
+    def __init__(self, entries) -> None:
+        self.entries = entries
+        super().__init__('Circular dependency between the entries: %s' % ', '.join(map(str, entries)))
+
+
+def get_entry_key(entry):
+    """
+    Identifies an entry independently of the python object representing it; unsaved entries are identified
+    by their object
+    """
+    if entry.pk is None:
+        return 'unsaved', id(entry)
+    return type(entry)._meta.label_lower, entry.pk
+
+
+class ModelGraphStore:
+    """
+    Dependency graph between entries: an edge from entry a to entry b means that b has to be recalculated
+    after a has changed (i.e. b is one of the dependent entries of a).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # entry key -> entry
+        self.entries = {}
+        # entry key -> set of the keys of the dependent entries
+        self.dependents = {}
+
+    def __contains__(self, entry):
+        return get_entry_key(entry) in self.entries
+
+    def add_entry(self, entry):
+        """
+        :return: whether the entry was not contained in the graph before
+        """
+        key = get_entry_key(entry)
+        if key in self.entries:
+            return False
+        self.entries[key] = entry
+        self.dependents[key] = set()
+        return True
+
+    def add_dependency(self, entry, dependent_entry):
+        self.add_entry(entry)
+        self.add_entry(dependent_entry)
+        self.dependents[get_entry_key(entry)].add(get_entry_key(dependent_entry))
+
+    def get_topological_order(self):
+        """
+        :return: all entries such that every entry comes after all entries it depends on
+        :raises CircularDependencyError: if the graph contains a cycle
+        """
+        in_degrees = dict.fromkeys(self.entries, 0)
+        for dependents in self.dependents.values():
+            for key in dependents:
+                in_degrees[key] += 1
+
+        queue = deque(key for key, in_degree in in_degrees.items() if in_degree == 0)
+        ordered = []
+        while queue:
+            key = queue.popleft()
+            ordered.append(self.entries[key])
+            for dependent in self.dependents[key]:
+                in_degrees[dependent] -= 1
+                if in_degrees[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(ordered) != len(self.entries):
+            raise CircularDependencyError(
+                [self.entries[key] for key, in_degree in in_degrees.items() if in_degree > 0])
+        return ordered
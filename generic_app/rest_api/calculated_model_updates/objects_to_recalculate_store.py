@@ -1,32 +1,71 @@
+import contextvars
+
+from generic_app.rest_api.calculated_model_updates.recalculation_scheduler import RecalculationSchedule
+
+# Store of the innermost deferral scope (see deferred_recalculations) of the current context; as context variable,
+#  it is separate for every thread and asyncio task, i.e. for every request
+current_store = contextvars.ContextVar('objects_to_recalculate_store', default=None)
+
+
 class ObjectsToRecalculateStore:
-    instance = None
+    """
+    Objects to recalculate collected inside one deferral scope. Every object is contained once, identified by
+    its model and the values of its defining fields (or its primary key if the model has no defining fields).
+    """
 
-    def __init__(self):
+    def __init__(self, parent=None):
         # calculated_model_id --> (defining_field_tuple --> object_to_recalculate)
         self.objects_to_recalculate = {}
-        ObjectsToRecalculateStore.instance = self
+        # store of the enclosing scope, into which the objects are merged when this scope is left
+        self.parent = parent
 
     @staticmethod
-    def insert(obj):
-        model_id = obj._meta.model_name
-        defining_fields = tuple(map(lambda field: obj.__getattribute__(field.name), obj.defining_fields))
-        o2r = ObjectsToRecalculateStore.instance.objects_to_recalculate
+    def get_current():
+        return current_store.get()
+
+    @staticmethod
+    def get_key(obj):
+        if not obj.defining_fields:
+            return 'pk', obj.pk
+        # the defining fields are given by their names (or as fields); related entries are identified by their ids
+        return tuple(getattr(obj, obj._meta.get_field(getattr(field, 'name', field)).attname)
+                     for field in obj.defining_fields)
 
+    def add(self, obj):
+        model_id = obj._meta.model_name
+        o2r = self.objects_to_recalculate
         if model_id not in o2r:
             o2r[model_id] = {}
+        o2r[model_id].setdefault(self.get_key(obj), obj)
 
-        if defining_fields not in o2r[model_id]:
-            o2r[model_id][defining_fields] = obj
-
-        ObjectsToRecalculateStore.instance.objects_to_recalculate = o2r
+    def merge_into(self, other):
+        for model_id, objects in self.objects_to_recalculate.items():
+            for key, obj in objects.items():
+                other.objects_to_recalculate.setdefault(model_id, {}).setdefault(key, obj)
+        self.objects_to_recalculate = {}
 
-    @staticmethod
-    def do_recalculations():
-        o2r = ObjectsToRecalculateStore.instance.objects_to_recalculate
+    def recalculate(self):
+        # the objects and all entries depending on them are recalculated once each in dependency order
+        o2r = self.objects_to_recalculate
+        self.objects_to_recalculate = {}
+        schedule = RecalculationSchedule()
         for model_id in o2r.keys():
             for def_field_tuple in o2r[model_id].keys():
-                obj = o2r[model_id][def_field_tuple]
-                obj.calculate()
-                obj.save()
+                schedule.add_recalculation(o2r[model_id][def_field_tuple])
+        schedule.run()
 
-        ObjectsToRecalculateStore.instance.objects_to_recalculate = {}
+    @staticmethod
+    def insert(obj):
+        """
+        Inserts the object into the store of the current scope
+        """
+        store = current_store.get()
+        if store is None:
+            raise RuntimeError('Objects to recalculate can only be inserted inside deferred_recalculations')
+        store.add(obj)
+
+    @staticmethod
+    def do_recalculations():
+        store = current_store.get()
+        if store is not None:
+            store.recalculate()
@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from celery import shared_task
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction, connection
+from django.db.models import F, Q
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from generic_app.rest_api.calculated_model_updates.recalculation_scheduler import RecalculationSchedule
+
+logger = logging.getLogger(__name__)
+
+# 'sync': dependent entries are recalculated directly after the save (default)
+# 'async': dependent entries are put into the recalculation queue and recalculated in the background
+RECALCULATION_MODE = os.getenv('RECALCULATION_MODE', 'sync')
+# Recalculations of the same object requested within this time are done only once
+DEBOUNCE_SECONDS = float(os.getenv('RECALCULATION_DEBOUNCE_SECONDS', 2))
+# The recalculation of an object is not delayed longer than this by further requests
+MAX_DELAY_SECONDS = float(os.getenv('RECALCULATION_MAX_DELAY_SECONDS', 30))
+BATCH_SIZE = int(os.getenv('RECALCULATION_BATCH_SIZE', 100))
+MAX_ATTEMPTS = int(os.getenv('RECALCULATION_MAX_ATTEMPTS', 3))
+# A claimed entry whose recalculation has not finished within this time (e.g. as the worker was killed) is
+#   claimed again
+LEASE_SECONDS = float(os.getenv('RECALCULATION_LEASE_SECONDS', 600))
+
+TRIGGER_CACHE_KEY = 'recalculation_queue_trigger'
+
+
+def is_async_recalculation_enabled():
+    return RECALCULATION_MODE == 'async'
+
+
+def uses_celery():
+    return os.getenv("DEPLOYMENT_ENVIRONMENT") and os.getenv("ARCHITECTURE") == "MQ/Worker"
+
+
+def get_coalesce_key(obj):
+    """
+    :return: the values of the defining fields of the object (or its primary key, if the model has none) as string
+    """
+    if not obj.defining_fields:
+        return json.dumps(['pk', str(obj.pk)])
+    values = []
+    for field in obj.defining_fields:
+        name = getattr(field, 'name', str(field).split('.')[-1])
+        values.append(getattr(obj, obj._meta.get_field(name).attname))
+    return json.dumps(values, default=str)
+
+
+def enqueue(objects):
+    """
+    Puts the objects into the recalculation queue. An object already waiting in the queue is not added again,
+    but its recalculation is delayed by DEBOUNCE_SECONDS (at most MAX_DELAY_SECONDS after its first request),
+    such that a burst of changes leads to a single recalculation. An entry that is being recalculated is released
+    again, as the running recalculation may not see the new changes.
+    """
+    from generic_app.submodels.PendingRecalculation import PendingRecalculation
+
+    if not objects:
+        return
+    now = timezone.now()
+    due_at = now + timedelta(seconds=DEBOUNCE_SECONDS)
+    with transaction.atomic():
+        for obj in objects:
+            model_label = obj._meta.label_lower
+            coalesce_key = get_coalesce_key(obj)
+            updated = PendingRecalculation.objects.filter(model_label=model_label, coalesce_key=coalesce_key).update(
+                object_pk=str(obj.pk),
+                due_at=Least(due_at, F('first_enqueued_at') + timedelta(seconds=MAX_DELAY_SECONDS)),
+                claimed_at=None, claim_id=None, attempts=0
+            )
+            if not updated:
+                PendingRecalculation.objects.bulk_create([PendingRecalculation(
+                    model_label=model_label, coalesce_key=coalesce_key, object_pk=str(obj.pk),
+                    first_enqueued_at=now, due_at=due_at
+                )], ignore_conflicts=True)
+    transaction.on_commit(trigger_processing)
+
+
+def claim_due_recalculations(batch_size=BATCH_SIZE):
+    """
+    Leases up to 'batch_size' due entries in a short transaction: unclaimed entries and entries whose lease has
+    expired (their worker died). Entries locked by another worker are skipped. The entries stay in the queue until
+    their recalculation succeeded (see complete).
+    :return: the claimed entries
+    """
+    from generic_app.submodels.PendingRecalculation import PendingRecalculation
+
+    now = timezone.now()
+    claim_id = uuid.uuid4().hex
+    with transaction.atomic():
+        queryset = PendingRecalculation.objects.filter(
+            Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=LEASE_SECONDS)),
+            due_at__lte=now
+        ).order_by('due_at')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        pending = list(queryset[:batch_size])
+        PendingRecalculation.objects.filter(pk__in=[p.pk for p in pending]).update(
+            claimed_at=now, claim_id=claim_id, attempts=F('attempts') + 1)
+    for entry in pending:
+        entry.claimed_at, entry.claim_id, entry.attempts = now, claim_id, entry.attempts + 1
+    return pending
+
+
+def get_claimed_entry(entry):
+    """
+    :return: queryset of the entry, as long as it is claimed by this worker (i.e. neither requested again nor
+    claimed by another worker after the expiry of the lease)
+    """
+    from generic_app.submodels.PendingRecalculation import PendingRecalculation
+
+    return PendingRecalculation.objects.filter(pk=entry.pk, claim_id=entry.claim_id)
+
+
+def complete(entry):
+    get_claimed_entry(entry).delete()
+
+
+def retry_later(entry):
+    """
+    Releases a failed entry for another attempt after DEBOUNCE_SECONDS, unless it has been attempted MAX_ATTEMPTS
+    times. If the object has been requested again in the meantime, the entry is already released.
+    """
+    if entry.attempts >= MAX_ATTEMPTS:
+        logger.error(f"Recalculation of {entry.model_label} {entry.object_pk} given up after {entry.attempts} "
+                     f"attempts")
+        complete(entry)
+        return
+    get_claimed_entry(entry).update(claimed_at=None, claim_id=None,
+                                    due_at=timezone.now() + timedelta(seconds=DEBOUNCE_SECONDS))
+
+
+def process_due_recalculations(batch_size=BATCH_SIZE):
+    """
+    Recalculates up to 'batch_size' due objects of the queue (see RecalculationSchedule), each in its own
+    transaction, such that a failing object neither rolls back the others nor keeps their queue entries locked.
+    A failed object is retried later; objects are given up after MAX_ATTEMPTS attempts, including attempts of
+    workers that died during the recalculation.
+    :return: the number of processed queue entries
+    """
+    pending = claim_due_recalculations(batch_size)
+    for entry in pending:
+        if entry.attempts > MAX_ATTEMPTS:
+            logger.error(f"Recalculation of {entry.model_label} {entry.object_pk} given up: its worker did not "
+                         f"finish {MAX_ATTEMPTS} attempts")
+            complete(entry)
+            continue
+        try:
+            with transaction.atomic():
+                obj = apps.get_model(entry.model_label).objects.filter(pk=entry.object_pk).first()
+                # the object may have been deleted in the meantime
+                if obj is not None:
+                    schedule = RecalculationSchedule()
+                    schedule.add_recalculation(obj)
+                    schedule.run()
+        except Exception:
+            logger.error(f"Recalculation of {entry.model_label} {entry.object_pk} failed:\n{traceback.format_exc()}")
+            retry_later(entry)
+        else:
+            complete(entry)
+    return len(pending)
+
+
+def get_seconds_until_next_due():
+    """
+    :return: the seconds until the next entry can be claimed (it is due or its lease expires), or None if the
+    queue is empty
+    """
+    from generic_app.submodels.PendingRecalculation import PendingRecalculation
+
+    next_due = PendingRecalculation.objects.filter(claimed_at__isnull=True).order_by('due_at') \
+        .values_list('due_at', flat=True).first()
+    next_claimed_at = PendingRecalculation.objects.filter(claimed_at__isnull=False).order_by('claimed_at') \
+        .values_list('claimed_at', flat=True).first()
+    next_times = [next_due] if next_due is not None else []
+    if next_claimed_at is not None:
+        next_times.append(next_claimed_at + timedelta(seconds=LEASE_SECONDS))
+    if not next_times:
+        return None
+    return max((min(next_times) - timezone.now()).total_seconds(), 0)
+
+
+def process_claimable_recalculations():
+    """
+    Processes the queue until no entry can be claimed anymore
+    :return: the seconds until the next entry can be claimed, or None if the queue is empty
+    """
+    while process_due_recalculations():
+        pass
+    return get_seconds_until_next_due()
+
+
+def process_recalculation_queue():
+    """
+    Processes the queue until no entries are left, waiting for the entries that are not due yet
+    """
+    while True:
+        seconds = process_claimable_recalculations()
+        if seconds is None:
+            return
+        threading.Event().wait(seconds)
+
+
+@shared_task(name="process_recalculation_queue")
+def process_recalculation_queue_task():
+    cache.delete(TRIGGER_CACHE_KEY)
+    seconds = process_claimable_recalculations()
+    if seconds is not None:
+        # the worker is not blocked until the remaining entries are due
+        process_recalculation_queue_task.apply_async(countdown=seconds)
+
+
+class LocalRecalculationWorker:
+    """
+    Fallback without Celery: a background thread of this process, which processes the queue whenever triggered
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.triggered = threading.Event()
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def trigger(self):
+        with self._lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="recalculation-queue", daemon=True)
+                self.thread.start()
+        self.triggered.set()
+
+    def run(self):
+        while True:
+            self.triggered.wait()
+            self.triggered.clear()
+            try:
+                process_recalculation_queue()
+            except Exception:
+                logger.error(f"Processing the recalculation queue failed:\n{traceback.format_exc()}")
+            finally:
+                connection.close()
+
+
+local_recalculation_worker = LocalRecalculationWorker()
+
+
+def trigger_processing():
+    if uses_celery():
+        # one task per debounce window is enough, as the task processes the queue until it is empty
+        if cache.add(TRIGGER_CACHE_KEY, True, timeout=DEBOUNCE_SECONDS):
+            process_recalculation_queue_task.apply_async(countdown=DEBOUNCE_SECONDS)
+    else:
+        local_recalculation_worker.trigger()
@@ -0,0 +1,110 @@
+import contextvars
+import os
+
+from generic_app.generic_models.calculated_model import CalculatedModelMixin
+from generic_app.generic_models.process_admin_model import DependencyAnalysisMixin
+from generic_app.rest_api.calculated_model_updates.model_graph_store import ModelGraphStore, get_entry_key, \
+    CircularDependencyError
+from generic_app.rest_api.calculation_profiler import profile_stage
+
+# An entry recalculated in more rounds of a schedule than this is considered to be part of a dependency cycle
+#   across rounds (e.g. entries creating each other in calculate)
+MAX_ROUNDS_PER_ENTRY = int(os.getenv('RECALCULATION_MAX_ROUNDS_PER_ENTRY', 10))
+
+# schedule that is currently run in this thread or asyncio task
+running_schedule = contextvars.ContextVar('running_schedule', default=None)
+
+
+def calc_and_save(entry):
+    with profile_stage(f"{type(entry).__name__}.recalculate"):
+        entry.calculate()
+        entry.save()
+
+
+def get_dependent_calculated_entries(entry):
+    if not issubclass(type(entry), DependencyAnalysisMixin):
+        return []
+    return [dependent for dependent in entry.get_dependent_entries().keys()
+            if issubclass(type(dependent), CalculatedModelMixin)]
+
+
+def get_running_schedule():
+    return running_schedule.get()
+
+
+class RecalculationSchedule:
+    """
+    Collects changed entries and entries to recalculate, and recalculates every entry depending on them
+    exactly once: the dependency graph of all affected entries (see ModelGraphStore) is built first and the
+    entries are recalculated in topological order, i.e. every entry only after all entries it depends on.
+    Saves done by the recalculations themselves do not trigger further recalculations of entries that are
+    already part of the round; entries saved outside of it lead to a further round, in which entries of earlier
+    rounds are recalculated again if they depend on them.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # changed entries, whose dependent entries have to be recalculated
+        self.changed_entries = []
+        # entries that have to be recalculated themselves
+        self.entries_to_recalculate = []
+        # entry key -> number of rounds in which the entry was recalculated
+        self.recalculation_rounds = {}
+        self.graph = ModelGraphStore()
+
+    def mark_changed(self, entry):
+        self.changed_entries.append(entry)
+
+    def add_recalculation(self, entry):
+        self.entries_to_recalculate.append(entry)
+
+    def build_graph(self, changed_entries, entries_to_recalculate):
+        graph = ModelGraphStore()
+        to_recalculate = set()
+        queue = []
+        for entry in changed_entries:
+            if graph.add_entry(entry):
+                queue.append(entry)
+        for entry in entries_to_recalculate:
+            to_recalculate.add(get_entry_key(entry))
+            if graph.add_entry(entry):
+                queue.append(entry)
+
+        # Recalculating an entry saves it, which again requires its dependent entries to be recalculated
+        while queue:
+            entry = queue.pop()
+            for dependent in get_dependent_calculated_entries(entry):
+                is_new = graph.add_entry(dependent)
+                graph.add_dependency(entry, dependent)
+                to_recalculate.add(get_entry_key(dependent))
+                if is_new:
+                    queue.append(dependent)
+        return graph, to_recalculate
+
+    def run(self):
+        token = running_schedule.set(self)
+        try:
+            # Recalculations may save entries outside the graph (e.g. by creating new entries); their
+            # dependent entries are scheduled in a further round
+            while self.changed_entries or self.entries_to_recalculate:
+                changed_entries, self.changed_entries = self.changed_entries, []
+                entries_to_recalculate, self.entries_to_recalculate = self.entries_to_recalculate, []
+                self.graph, to_recalculate = self.build_graph(changed_entries, entries_to_recalculate)
+                for entry in self.graph.get_topological_order():
+                    key = get_entry_key(entry)
+                    if key in to_recalculate:
+                        self.count_round(entry, key)
+                        calc_and_save(entry)
+        finally:
+            running_schedule.reset(token)
+
+    def count_round(self, entry, key):
+        rounds = self.recalculation_rounds.get(key, 0) + 1
+        if rounds > MAX_ROUNDS_PER_ENTRY:
+            raise CircularDependencyError([entry])
+        self.recalculation_rounds[key] = rounds
+
+    def register_save(self, entry):
+        # called for saves during the run
+        if entry not in self.graph:
+            self.mark_changed(entry)
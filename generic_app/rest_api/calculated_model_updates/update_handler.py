@@ -1,17 +1,15 @@
-from generic_app.generic_models.calculated_model import CalculatedModelMixin
 from generic_app.generic_models.process_admin_model import DependencyAnalysisMixin
-
-
-def calc_and_save(entry):
-    entry.calculate()
-    entry.save()
+from generic_app.rest_api.calculated_model_updates.objects_to_recalculate_store import ObjectsToRecalculateStore
+from generic_app.rest_api.calculated_model_updates.recalculation_queue import enqueue, \
+    is_async_recalculation_enabled
+from generic_app.rest_api.calculated_model_updates.recalculation_scheduler import RecalculationSchedule, \
+    calc_and_save, get_dependent_calculated_entries, get_running_schedule
 
 
 class CalculatedModelUpdateHandler:
     instance = None
 
     def __init__(self):
-        # TODO: Change file to rely on 'model_graph_store.py' instead
         self.model_collection = None
         self.post_save_behaviour = calc_and_save
         CalculatedModelUpdateHandler.instance = self
@@ -19,6 +17,8 @@ class CalculatedModelUpdateHandler:
     def set_model_collection(self, model_collection):
         self.model_collection = model_collection
 
+    # Hint: the post save behaviour is shared by all threads; for deferring the recalculations of a single
+    #  request or transaction, use deferred_recalculations instead
     @staticmethod
     def set_post_save_behaviour(func):
         CalculatedModelUpdateHandler.instance.post_save_behaviour = func
@@ -33,15 +33,37 @@ class CalculatedModelUpdateHandler:
         if not issubclass(type(updated_entry), DependencyAnalysisMixin):
             return
 
-        # Get all entries in calculated models dependent on 'updated_entry'
-        dependent_entries = updated_entry.get_dependent_entries().keys()
-        dependent_calculated_entries = list(
-            filter(
-                lambda entry: issubclass(type(entry), CalculatedModelMixin),
-                dependent_entries
-            )
-        )
-
-        # Update each such entry
-        for entry in dependent_calculated_entries:
-            CalculatedModelUpdateHandler.instance.post_save_behaviour(entry)
+        # Saves done while recalculating are handled by the running schedule
+        running_schedule = get_running_schedule()
+        if running_schedule is not None:
+            running_schedule.register_save(updated_entry)
+            return
+
+        # Inside deferred_recalculations, the dependent entries are only collected
+        store = ObjectsToRecalculateStore.get_current()
+        if store is not None:
+            for entry in get_dependent_calculated_entries(updated_entry):
+                store.add(entry)
+            return
+
+        handler = CalculatedModelUpdateHandler.instance
+        post_save_behaviour = handler.post_save_behaviour if handler is not None else calc_and_save
+        if post_save_behaviour is calc_and_save and is_async_recalculation_enabled():
+            # The dependent entries are recalculated in the background (see recalculation_queue.py); unsaved
+            #  entries cannot be queued
+            dependent_entries = get_dependent_calculated_entries(updated_entry)
+            enqueue([entry for entry in dependent_entries if entry.pk is not None])
+            unsaved_entries = [entry for entry in dependent_entries if entry.pk is None]
+            if unsaved_entries:
+                schedule = RecalculationSchedule()
+                for entry in unsaved_entries:
+                    schedule.add_recalculation(entry)
+                schedule.run()
+        elif post_save_behaviour is calc_and_save:
+            # Update all entries in calculated models dependent on 'updated_entry' (also indirectly) once each
+            schedule = RecalculationSchedule()
+            schedule.mark_changed(updated_entry)
+            schedule.run()
+        else:
+            for entry in get_dependent_calculated_entries(updated_entry):
+                post_save_behaviour(entry)
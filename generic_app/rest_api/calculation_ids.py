@@ -0,0 +1,142 @@
+import contextvars
+import os
+
+from generic_app.rest_api.context import context_id
+
+# (scope, resolved values) of the current operation; see get_cache
+resolution_cache = contextvars.ContextVar('calculation_id_resolution_cache', default=None)
+
+
+def get_scope():
+    """
+    The resolved ids are valid for one operation: the context_id of the request or, inside a Celery task, the
+    task (whose context_id is not set)
+    """
+    from celery import current_task
+
+    task_id = str(current_task.request.id) if current_task and os.getenv("CELERY_ACTIVE") else None
+    return context_id.get(), task_id
+
+
+def get_cache():
+    scope = get_scope()
+    cache = resolution_cache.get()
+    if cache is None or cache[0] != scope:
+        cache = (scope, {})
+        resolution_cache.set(cache)
+    return cache[1]
+
+
+def clear_cache():
+    cache = resolution_cache.get()
+    if cache is not None:
+        cache[1].clear()
+
+
+def cached(key, resolve):
+    cache = get_cache()
+    if key not in cache:
+        cache[key] = resolve()
+    return cache[key]
+
+
+def get_calculation_id_of_context(default="test_id"):
+    """
+    :return: calculation id of the current context_id
+    """
+    from generic_app.submodels.CalculationIDs import CalculationIDs
+
+    current_context_id = context_id.get()
+    calculation_id = cached(('context', current_context_id), lambda: CalculationIDs.objects.filter(
+        context_id=current_context_id).order_by('pk').values_list('calculation_id', flat=True).first())
+    return calculation_id if calculation_id is not None else default
+
+
+def get_calculation_id_of_record(calculation_record, default="test_id"):
+    from generic_app.submodels.CalculationIDs import CalculationIDs
+
+    calculation_id = cached(('record', calculation_record), lambda: CalculationIDs.objects.filter(
+        calculation_record=calculation_record).order_by('pk').values_list('calculation_id', flat=True).first())
+    return calculation_id if calculation_id is not None else default
+
+
+def get_context_id_of_calculation(calculation_id, default="test_id"):
+    from generic_app.submodels.CalculationIDs import CalculationIDs
+
+    found = cached(('calculation', calculation_id), lambda: CalculationIDs.objects.filter(
+        calculation_id=calculation_id).order_by('pk').values_list('context_id', flat=True).first())
+    return found if found is not None else default
+
+
+def resolve_calculation_id():
+    """
+    Calculation id of the running calculation: the Celery task id or the calculation id of the context_id
+    """
+    task_id = get_scope()[1]
+    if task_id is not None:
+        return task_id
+    return get_calculation_id_of_context() if context_id.get() else "test_id"
+
+
+def get_or_create_calculation_id(calculation_record):
+    """
+    Makes sure that the calculation record is registered for the current operation and returns its calculation id.
+    After the first call of an operation for a record, no query is needed anymore.
+    """
+    from generic_app.submodels.CalculationIDs import CalculationIDs
+    from generic_app.rest_api.signals import publish_calculation_id
+
+    task_id = get_scope()[1]
+    if task_id is not None:
+        def resolve():
+            if not CalculationIDs.objects.filter(calculation_record=calculation_record,
+                                                 calculation_id=task_id).exists():
+                task_context_id = get_context_id_of_calculation(task_id)
+                # a conflicting registration of the record for the same context is kept
+                CalculationIDs.objects.bulk_create([CalculationIDs(
+                    calculation_record=calculation_record, calculation_id=task_id, context_id=task_context_id
+                )], ignore_conflicts=True)
+                stored_calculation_id = CalculationIDs.objects.filter(
+                    calculation_record=calculation_record, context_id=task_context_id
+                ).values_list('calculation_id', flat=True).get()
+                # only the registration of this task is published, not the kept one
+                if stored_calculation_id == task_id:
+                    publish_calculation_id(calculation_record, task_id, task_context_id)
+            return task_id
+    else:
+        current_context_id = context_id.get() or "test_id"
+
+        def resolve():
+            calculation_id = CalculationIDs.objects.filter(
+                calculation_record=calculation_record, context_id=current_context_id
+            ).values_list('calculation_id', flat=True).first()
+            if calculation_id is None:
+                # a concurrent insert of the same record and context wins (unique constraint)
+                CalculationIDs.objects.bulk_create([CalculationIDs(
+                    calculation_record=calculation_record, context_id=current_context_id,
+                    calculation_id=get_calculation_id_of_context()
+                )], ignore_conflicts=True)
+                calculation_id = CalculationIDs.objects.filter(
+                    calculation_record=calculation_record, context_id=current_context_id
+                ).values_list('calculation_id', flat=True).get()
+                publish_calculation_id(calculation_record, calculation_id, current_context_id)
+            return calculation_id
+
+    return cached(('registration', calculation_record), resolve)
+
+
+def set_calculation_id(calculation_record, context_id, calculation_id):
+    """
+    Registers the calculation id of the calculation record for the context with a single upsert
+    (INSERT ... ON CONFLICT (calculation_record, context_id) DO UPDATE)
+    """
+    from generic_app.submodels.CalculationIDs import CalculationIDs
+    from generic_app.rest_api.signals import publish_calculation_id
+
+    CalculationIDs.objects.bulk_create(
+        [CalculationIDs(calculation_record=calculation_record, context_id=context_id, calculation_id=calculation_id)],
+        update_conflicts=True, unique_fields=['calculation_record', 'context_id'], update_fields=['calculation_id']
+    )
+    clear_cache()
+    # bulk_create sends no post_save
+    publish_calculation_id(calculation_record, calculation_id, context_id)
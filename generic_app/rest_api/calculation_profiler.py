@@ -0,0 +1,162 @@
+import contextvars
+import os
+import time
+import tracemalloc
+import traceback
+from contextlib import ContextDecorator
+from datetime import datetime
+
+from django.db import connection
+
+from generic_app.rest_api.calculation_ids import resolve_calculation_id
+
+# Profiling is switched on via CALCULATION_PROFILING=true, as it costs a lookup of the calculation id and an
+#   insert per top-level calculation
+PROFILING_ENABLED = os.getenv('CALCULATION_PROFILING', 'false') == 'true'
+
+# innermost running stage of the current thread or asyncio task
+current_stage = contextvars.ContextVar('current_calculation_stage', default=None)
+
+
+def get_calculation_id():
+    """
+    Same resolution of the calculation id as in CalculationLog.create
+    """
+    return resolve_calculation_id()
+
+
+def get_peak_memory():
+    """
+    :return: the peak of the memory traced since the last reset, or None if tracemalloc is not active (there is no
+    other per-stage measurement; the peak resident set size only covers the whole lifetime of the process)
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]
+    return None
+
+
+def max_memory(*values):
+    values = [v for v in values if v is not None]
+    return max(values) if values else None
+
+
+class StageStatistics:
+    def __init__(self, depth) -> None:
+        super().__init__()
+        self.depth = depth
+        self.executions = 0
+        self.wall_time = 0
+        self.cpu_time = 0
+        self.query_count = 0
+        self.query_time = 0
+        self.peak_memory = None
+
+
+class ProfilingSession:
+    """
+    Measurements of all stages run inside the outermost stage, aggregated by the stage path
+    (e.g. 'Report.create/Report.calculate')
+    """
+
+    def __init__(self, calculation_record) -> None:
+        super().__init__()
+        self.calculation_record = calculation_record
+        self.stages = {}
+
+    def get_statistics(self, path, depth):
+        if path not in self.stages:
+            self.stages[path] = StageStatistics(depth)
+        return self.stages[path]
+
+    def save(self):
+        from generic_app.submodels.CalculationProfile import CalculationProfile
+
+        calculation_id = get_calculation_id()
+        timestamp = datetime.now()
+        CalculationProfile.objects.bulk_create([
+            CalculationProfile(calculation_id=calculation_id, calculation_record=self.calculation_record,
+                               stage=path, depth=s.depth, timestamp=timestamp, executions=s.executions,
+                               wall_time=s.wall_time, cpu_time=s.cpu_time, query_count=s.query_count,
+                               query_time=s.query_time, peak_memory=s.peak_memory)
+            for path, s in self.stages.items()
+        ])
+
+
+class profile_stage(ContextDecorator):
+    """
+    Context manager and decorator measuring wall time, CPU time (of the current thread), the number and duration
+    of the database queries and the peak memory of a stage of a calculation. Stages can be nested; the
+    measurements of a stage include those of its nested stages. When the outermost stage is left, the aggregated
+    measurements are stored as one CalculationProfile per stage for the current calculation id.
+    Peak memory is only measured if tracemalloc is active (e.g. via PYTHONTRACEMALLOC=1), otherwise it is None.
+    Profiling is only done if it is enabled via CALCULATION_PROFILING=true.
+    """
+
+    def __init__(self, name, calculation_record=None) -> None:
+        super().__init__()
+        self.name = name
+        self.calculation_record = calculation_record
+
+    def _recreate_cm(self):
+        # a new instance per call, such that the decorated function can be called recursively and concurrently
+        return type(self)(self.name, self.calculation_record)
+
+    def __enter__(self):
+        if not PROFILING_ENABLED:
+            return self
+        self.parent = current_stage.get()
+        if self.parent is None:
+            self.session = ProfilingSession(self.calculation_record or self.name)
+            self.path = self.name
+            self.depth = 0
+        else:
+            self.session = self.parent.session
+            self.path = f'{self.parent.path}/{self.name}'
+            self.depth = self.parent.depth + 1
+        self.token = current_stage.set(self)
+
+        self.query_count = 0
+        self.query_time = 0
+        self.child_peak_memory = None
+        self.query_wrapper = connection.execute_wrapper(self.measure_query)
+        self.query_wrapper.__enter__()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self.start_wall_time = time.perf_counter()
+        self.start_cpu_time = time.thread_time()
+        return self
+
+    def measure_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_time += time.perf_counter() - start
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not PROFILING_ENABLED:
+            return False
+        wall_time = time.perf_counter() - self.start_wall_time
+        cpu_time = time.thread_time() - self.start_cpu_time
+        peak_memory = max_memory(get_peak_memory(), self.child_peak_memory)
+        self.query_wrapper.__exit__(exc_type, exc_val, exc_tb)
+        current_stage.reset(self.token)
+
+        statistics = self.session.get_statistics(self.path, self.depth)
+        statistics.executions += 1
+        statistics.wall_time += wall_time
+        statistics.cpu_time += cpu_time
+        statistics.query_count += self.query_count
+        statistics.query_time += self.query_time
+        statistics.peak_memory = max_memory(statistics.peak_memory, peak_memory)
+
+        if self.parent is not None:
+            # the peak of tracemalloc was reset for this stage, so the parent has to consider it separately
+            self.parent.child_peak_memory = max_memory(self.parent.child_peak_memory, peak_memory)
+        else:
+            try:
+                self.session.save()
+            except Exception:
+                traceback.print_exc()
+        return False
@@ -0,0 +1,125 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import traceback
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# Events published within this time are sent together
+BATCH_SECONDS = float(os.getenv('EVENT_BUS_BATCH_SECONDS', 0.05))
+
+
+class OutboundEvent:
+    def __init__(self, group, message, key=None) -> None:
+        super().__init__()
+        self.group = group
+        # the message or a function creating it, which is called right before sending
+        self.message = message
+        self.key = key
+
+    def get_message(self):
+        return self.message() if callable(self.message) else self.message
+
+
+class EventBus:
+    """
+    Sends the websocket events (via the channel layer) of the application in the background:
+    - events published inside a transaction are only sent after it is committed and dropped on a rollback
+      (see transaction.on_commit)
+    - the events are buffered and sent in batches by a background thread, such that saves never wait for the
+      channel layer
+    - an event with a key supersedes the buffered event with the same key that has not been sent yet, e.g. a
+      status update of a record makes the previous, not yet sent status update of the record obsolete
+    """
+
+    def __init__(self, batch_seconds=BATCH_SECONDS) -> None:
+        super().__init__()
+        self.batch_seconds = batch_seconds
+        # key (or a unique object for events without key) -> event, in the order of publishing
+        self.buffer = {}
+        self.published = threading.Event()
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, group, message, key=None):
+        event = OutboundEvent(group, message, key)
+        # outside of a transaction, the event is buffered directly
+        transaction.on_commit(partial(self.buffer_event, event))
+
+    def buffer_event(self, event):
+        with self._lock:
+            key = (event.group, event.key) if event.key is not None else object()
+            # the superseded event is removed, such that the new one is sent in publishing order
+            self.buffer.pop(key, None)
+            self.buffer[key] = event
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="event-bus", daemon=True)
+                self.thread.start()
+        self.published.set()
+
+    def reset_after_fork(self):
+        # the child of a fork (e.g. a Celery prefork worker) inherits the buffer and the lock, but not the
+        #   background thread; the events of the parent are sent by the parent
+        self.buffer = {}
+        self.published = threading.Event()
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def take_buffered_events(self):
+        with self._lock:
+            events = list(self.buffer.values())
+            self.buffer = {}
+        return events
+
+    def run(self):
+        while True:
+            self.published.wait()
+            # collect the events of the batch window
+            threading.Event().wait(self.batch_seconds)
+            self.published.clear()
+            self.flush()
+
+    def flush(self):
+        events = self.take_buffered_events()
+        if not events:
+            return
+        try:
+            messages = []
+            for event in events:
+                try:
+                    messages.append((event.group, event.get_message()))
+                except Exception:
+                    logger.error(f"Creating the event for {event.group} failed:\n{traceback.format_exc()}")
+            async_to_sync(self.send)(messages)
+        except Exception:
+            logger.error(f"Sending {len(events)} events failed:\n{traceback.format_exc()}")
+        finally:
+            # the messages may have been created with a database connection of this thread
+            if threading.current_thread() is self.thread:
+                connection.close()
+
+    @staticmethod
+    async def send(messages):
+        # all group sends of the batch in one event loop run
+        channel_layer = get_channel_layer()
+        results = await asyncio.gather(*[channel_layer.group_send(group, message) for group, message in messages],
+                                       return_exceptions=True)
+        for (group, _), result in zip(messages, results):
+            if isinstance(result, Exception):
+                logger.error(f"Sending the event to {group} failed: {result!r}")
+
+
+event_bus = EventBus()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=event_bus.reset_after_fork)
+
+# the events buffered when the process ends (e.g. a Celery worker being shut down) are still sent
+atexit.register(event_bus.flush)
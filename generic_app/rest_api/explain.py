@@ -0,0 +1,30 @@
+import json
+
+from django.db import connection
+
+
+def explain_queryset(queryset):
+    """
+    Runs 'EXPLAIN (FORMAT JSON)' for the given queryset on PostgreSQL and returns the top node of the plan,
+    e.g. {'Node Type': 'Seq Scan', 'Total Cost': 1234.5, 'Plan Rows': 100, ...}.
+    QuerySet.explain is not used, as it does not return valid JSON on all Django versions.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def get_scan_types(plan):
+    """
+    :return: the node types of all scans in the given plan, e.g. {'Seq Scan', 'Bitmap Index Scan'}
+    """
+    scan_types = set()
+    if plan['Node Type'].endswith('Scan'):
+        scan_types.add(plan['Node Type'])
+    for sub_plan in plan.get('Plans', []):
+        scan_types.update(get_scan_types(sub_plan))
+    return scan_types
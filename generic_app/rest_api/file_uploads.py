@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+import tempfile
+import traceback
+from datetime import timedelta
+
+from celery import shared_task
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Directory in the default_storage in which the chunks are kept until the upload is complete
+UPLOAD_DIRECTORY = 'file_uploads'
+MAX_CHUNK_SIZE = int(os.getenv('FILE_UPLOAD_MAX_CHUNK_SIZE', 16 * 1024 * 1024))
+# Uploads that have not received a chunk (or not finished assembling) within this time are deleted
+#   (see delete_expired_uploads)
+UPLOAD_EXPIRY_HOURS = float(os.getenv('FILE_UPLOAD_EXPIRY_HOURS', 24))
+READ_SIZE = 64 * 1024
+
+
+class ChunkTooLarge(Exception):
+    pass
+
+
+class PartConflict(Exception):
+    pass
+
+
+def get_part_name(upload, offset):
+    # the name is given by the offset, such that a repeated chunk replaces its previous attempt and the parts
+    #   can be found again without listing the directory
+    return f"{UPLOAD_DIRECTORY}/{upload.upload_id}/{offset:015d}.part"
+
+
+def read_chunk(stream, max_size=MAX_CHUNK_SIZE):
+    """
+    Reads the chunk from the request stream into a temporary file, which is only kept in memory if it is small
+    :return: (temporary file, size, sha256 of the chunk)
+    """
+    chunk = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    sha256 = hashlib.sha256()
+    size = 0
+    while stream is not None and (data := stream.read(READ_SIZE)):
+        size += len(data)
+        if size > max_size:
+            chunk.close()
+            raise ChunkTooLarge(f"Chunks may not be larger than {max_size} bytes")
+        sha256.update(data)
+        chunk.write(data)
+    chunk.seek(0)
+    return chunk, size, sha256.hexdigest()
+
+
+def save_part(upload, offset, chunk):
+    """
+    Stores the chunk as the part at 'offset', replacing a previous attempt. The parts are only found by their
+    names (see iter_parts), so the chunk is rejected with PartConflict if the storage chose another name, i.e.
+    a concurrent request for the same offset stored its part in between.
+    """
+    name = get_part_name(upload, offset)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    stored_name = default_storage.save(name, File(chunk, name=os.path.basename(name)))
+    if stored_name != name:
+        default_storage.delete(stored_name)
+        raise PartConflict(f"The part at offset {offset} was stored concurrently by another request")
+
+
+def iter_parts(upload, end=None):
+    """
+    :return: the names of the parts of the upload in the order of their offsets, up to 'end' (default: the
+    received bytes)
+    """
+    end = upload.offset if end is None else end
+    offset = 0
+    while offset < end:
+        name = get_part_name(upload, offset)
+        yield name
+        offset += default_storage.size(name)
+
+
+def assemble(upload):
+    """
+    Concatenates the parts of the upload into a temporary file
+    :return: (temporary file, sha256 of the file)
+    """
+    file = tempfile.TemporaryFile()
+    sha256 = hashlib.sha256()
+    for name in iter_parts(upload):
+        with default_storage.open(name, 'rb') as part:
+            while data := part.read(READ_SIZE):
+                sha256.update(data)
+                file.write(data)
+    file.seek(0)
+    return file, sha256.hexdigest()
+
+
+def delete_parts(upload):
+    for name in list(iter_parts(upload)):
+        default_storage.delete(name)
+    # a part whose chunk was stored, but not registered (e.g. a broken connection)
+    pending = get_part_name(upload, upload.offset)
+    if default_storage.exists(pending):
+        default_storage.delete(pending)
+
+
+def delete_expired_uploads(expiry_hours=UPLOAD_EXPIRY_HOURS):
+    """
+    Deletes the uploads in progress that have not received a chunk within 'expiry_hours', including their parts.
+    Uploads left in ASSEMBLING for that long (e.g. by a worker killed during the completion) are deleted as well.
+    :return: number of deleted uploads
+    """
+    from generic_app.submodels.FileUpload import FileUpload
+
+    expired = FileUpload.objects.filter(status__in=[FileUpload.IN_PROGRESS, FileUpload.ASSEMBLING],
+                                        updated_at__lt=timezone.now() - timedelta(hours=expiry_hours))
+    deleted = 0
+    for upload in expired.iterator():
+        try:
+            delete_parts(upload)
+        except Exception:
+            logger.error(f"Deleting the parts of the upload {upload.upload_id} failed:\n{traceback.format_exc()}")
+            continue
+        upload.delete()
+        deleted += 1
+    return deleted
+
+
+@shared_task(name="delete_expired_file_uploads")
+def delete_expired_uploads_task():
+    return delete_expired_uploads()
@@ -0,0 +1,135 @@
+import os
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+
+from generic_app.rest_api.explain import explain_queryset
+
+ALLOWED_LOOKUPS = {'exact', 'iexact', 'in', 'contains', 'icontains', 'startswith', 'istartswith', 'endswith',
+                   'iendswith', 'gt', 'gte', 'lt', 'lte', 'range', 'isnull', 'year', 'month', 'day'}
+CONTAINS_LOOKUPS_DOWNGRADE = {'contains': 'startswith', 'icontains': 'istartswith'}
+
+# Limits for filters sent by the client; they can be overwritten via environment variables
+MAX_JOIN_DEPTH = int(os.getenv('FILTER_MAX_JOIN_DEPTH', 3))
+MAX_IN_LIST_SIZE = int(os.getenv('FILTER_MAX_IN_LIST_SIZE', 1000))
+# Maximal total cost of the filtered query as estimated by the PostgreSQL planner; no limit if not set
+MAX_QUERY_COST = float(os.getenv('FILTER_MAX_QUERY_COST')) if os.getenv('FILTER_MAX_QUERY_COST') else None
+# 'reject': filters exceeding the cost limit are rejected;
+# 'downgrade': contains-lookups are replaced by startswith-lookups first, and the filter is only rejected
+#   if it still exceeds the limit
+COST_LIMIT_MODE = os.getenv('FILTER_COST_LIMIT_MODE', 'reject')
+
+
+def reject(message):
+    raise ValidationError({"error": f"Filter rejected: {message}"})
+
+
+def _get_model_field(model, name):
+    if name == 'pk':
+        return model._meta.pk
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _is_forward_relation(field):
+    # reverse relations are created automatically by Django
+    return field.concrete or not field.auto_created
+
+
+def validate_filter_path(model, path, models2containers=None):
+    """
+    Validates the lookup path of a filter, e.g. 'foreign_key__other_foreign_key__name__icontains':
+    every traversed relation has to be a forward relation (see get_relation_fields) to a registered model,
+    the number of traversed relations is limited by MAX_JOIN_DEPTH and the lookup has to be one of ALLOWED_LOOKUPS.
+    :return: the lookup of the path (default: 'exact')
+    """
+    parts = path.split('__')
+    joins = 0
+    i = 0
+    while True:
+        field = _get_model_field(model, parts[i])
+        if field is None:
+            reject(f"'{path}' is not a valid filter path for model {model._meta.model_name}")
+        rest = parts[i + 1:]
+        if not rest:
+            return 'exact'
+
+        if field.is_relation and _get_model_field(field.related_model, rest[0]) is not None:
+            if not _is_forward_relation(field):
+                reject(f"'{path}' traverses the reverse relation {parts[i]}")
+            if models2containers is not None and field.related_model not in models2containers:
+                reject(f"'{path}' traverses a relation to the unregistered model {field.related_model._meta.model_name}")
+            joins += 1
+            if joins > MAX_JOIN_DEPTH:
+                reject(f"'{path}' exceeds the maximal number of {MAX_JOIN_DEPTH} joined relations")
+            model = field.related_model
+            i += 1
+            continue
+
+        if len(rest) == 1 and rest[0] in ALLOWED_LOOKUPS:
+            return rest[0]
+        reject(f"'{path}' is not a valid filter path for model {model._meta.model_name}")
+
+
+def validate_filter_value(path, lookup, value):
+    if lookup == 'in':
+        if not isinstance(value, (list, tuple)):
+            reject(f"the value of '{path}' has to be a list")
+        if len(value) > MAX_IN_LIST_SIZE:
+            reject(f"the value of '{path}' contains {len(value)} entries, but at most {MAX_IN_LIST_SIZE} are allowed")
+    elif isinstance(value, (dict, list, tuple)) and lookup != 'range':
+        reject(f"the value of '{path}' has to be a single value")
+
+
+def compile_filter(model, filter_arguments, models2containers=None):
+    """
+    Validates the filter arguments sent by the client (see validate_filter_path and validate_filter_value)
+    :return: the validated filter arguments, which can be passed to QuerySet.filter
+    """
+    if not isinstance(filter_arguments, dict):
+        reject("the filter has to be a JSON object")
+    for path, value in filter_arguments.items():
+        lookup = validate_filter_path(model, path, models2containers)
+        validate_filter_value(path, lookup, value)
+    return filter_arguments
+
+
+def downgrade_filter(filter_arguments):
+    downgraded = {}
+    for path, value in filter_arguments.items():
+        parts = path.split('__')
+        if parts[-1] in CONTAINS_LOOKUPS_DOWNGRADE:
+            parts[-1] = CONTAINS_LOOKUPS_DOWNGRADE[parts[-1]]
+        downgraded['__'.join(parts)] = value
+    return downgraded
+
+
+def exceeds_cost_limit(queryset):
+    if MAX_QUERY_COST is None or connection.vendor != 'postgresql':
+        return False
+    return explain_queryset(queryset)['Total Cost'] > MAX_QUERY_COST
+
+
+def apply_filter(queryset, filter_arguments, model_container=None):
+    """
+    Applies the validated filter arguments to the queryset while respecting the cost limit MAX_QUERY_COST.
+    If the model container is given, only relations to models of its model collection can be traversed.
+    """
+    if not filter_arguments:
+        return queryset
+    models2containers = getattr(model_container, '_models2containers', None)
+    filter_arguments = compile_filter(queryset.model, filter_arguments, models2containers)
+    filtered_queryset = queryset.filter(**filter_arguments)
+    if not exceeds_cost_limit(filtered_queryset):
+        return filtered_queryset
+
+    if COST_LIMIT_MODE == 'downgrade':
+        downgraded_arguments = downgrade_filter(filter_arguments)
+        if downgraded_arguments != filter_arguments:
+            filtered_queryset = queryset.filter(**downgraded_arguments)
+            if not exceeds_cost_limit(filtered_queryset):
+                return filtered_queryset
+    reject("the estimated cost of the filtered query exceeds the limit, please narrow down the filter")
@@ -0,0 +1,110 @@
+from django.db.models import FloatField, IntegerField, DateField, DateTimeField, TextField, AutoField
+from django_filters import FilterSet
+from django_filters.rest_framework import FilterSet as RestFrameworkFilterSet
+
+from generic_app.generic_models.upload_model import IsCalculatedField, CalculateField
+
+INTERVAL_REQUIRING_FIELDS = {FloatField, IntegerField, DateField, DateTimeField}
+CALCULATION_FIELDS = {IsCalculatedField, CalculateField}
+CONTAINS_LOOKUP_FIELDS = {TextField, AutoField}
+
+
+def get_lookup_expressions(field_type):
+    if field_type in INTERVAL_REQUIRING_FIELDS:
+        if field_type in [DateField, DateTimeField]:
+            return ['exact', 'lte', 'gte', 'year', 'month', 'day']
+        return ['exact', 'lte', 'gte']
+    if field_type in CONTAINS_LOOKUP_FIELDS:
+        return ['exact', 'icontains']
+    return ['exact']
+
+
+def is_filterable(field):
+    # we need to only take those fields where a django-filter exists
+    return type(field) in FilterSet.FILTER_DEFAULTS or type(field) in CALCULATION_FIELDS
+
+
+def get_filter_fields(model):
+    """
+    :return: the fields of the model that can be filtered in the list view. A model can restrict these by
+    defining the class attribute 'filter_fields' (list of field names); by default, all fields are filterable
+    for which a django-filter exists
+    """
+    declared_filter_fields = getattr(model, 'filter_fields', None)
+    fields = [f for f in model._meta.fields if is_filterable(f)]
+    if declared_filter_fields is not None:
+        declared_filter_fields = set(declared_filter_fields)
+        fields = [f for f in fields if f.name in declared_filter_fields]
+    return fields
+
+
+def create_filterset_fields(model):
+    return {f.name: get_lookup_expressions(type(f)) for f in get_filter_fields(model)}
+
+
+def create_filterset_class(model, filterset_fields):
+    """
+    Creates the FilterSet class that DjangoFilterBackend would otherwise create for every request
+    from the filterset_fields of the view
+    """
+    return type(
+        model._meta.model_name + 'FilterSet',
+        (RestFrameworkFilterSet,),
+        {
+            'Meta': type(
+                'Meta',
+                (),
+                {
+                    'model': model,
+                    'fields': filterset_fields
+                }
+            )
+        }
+    )
+
+
+def get_indexed_field_names(model):
+    """
+    :return: the names of all fields that are the leading column of some index of the model, as far as
+    known to Django; in addition, a model can declare fields that are indexed by other means (e.g. a
+    trigram index created in a migration) via the class attribute 'indexed_filter_fields'
+    """
+    indexed = set(getattr(model, 'indexed_filter_fields', []))
+    for field in model._meta.fields:
+        if field.primary_key or field.unique or field.db_index:
+            indexed.add(field.name)
+    for index in model._meta.indexes:
+        if index.fields:
+            indexed.add(index.fields[0].lstrip('-'))
+    for constraint in model._meta.constraints:
+        constraint_fields = getattr(constraint, 'fields', None)
+        if constraint_fields:
+            indexed.add(constraint_fields[0])
+    for fields in list(model._meta.unique_together) + list(getattr(model._meta, 'index_together', [])):
+        if fields:
+            indexed.add(fields[0])
+    return indexed
+
+
+def get_unindexed_filter_fields(model, filterset_fields):
+    indexed = get_indexed_field_names(model)
+    return [name for name in filterset_fields if name not in indexed]
+
+
+def report_unindexed_filter_fields(model_collection):
+    """
+    Prints all filterable fields without a database index. Filtering on these, in particular with 'icontains'
+    on text fields, results in sequential scans of the whole table.
+    """
+    unindexed_fields = {}
+    for container in model_collection.all_containers:
+        if container.filterset_fields:
+            fields = get_unindexed_filter_fields(container.model_class, container.filterset_fields)
+            if fields:
+                unindexed_fields[container.id] = fields
+
+    if unindexed_fields:
+        print("Filterable fields without database index:")
+        for model_id, fields in sorted(unindexed_fields.items()):
+            print(f"  {model_id}: {', '.join(fields)}")
+    return unindexed_fields
@@ -1,3 +1,9 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Exists, OuterRef
+
+NO_SELECTION = 'noSelection'
+
+
 class FilterTreeNode:
     def __init__(self, node_id, model_container, parent_to_self_fk_name, selection, children):
         self.node_id = node_id
@@ -9,40 +15,63 @@ class FilterTreeNode:
         # QuerySet of objects filtered at this node
         self.filtered_objects = {}
 
+    # Identifies the filter of this node including its subtree, such that equal subtrees are compiled
+    # and evaluated only once
+    def get_signature(self):
+        selection = self.selection if self.selection == NO_SELECTION else tuple(sorted(map(str, self.selection)))
+        return (self.model_container.id, self.parent_to_self_fk_name, selection,
+                tuple(child.get_signature() for child in self.children))
+
+    def _can_use_exists(self, fk_name):
+        # EXISTS is used for direct foreign keys; for many-to-many relations and paths via several relations,
+        #  we fall back to an '__in' subquery
+        if '__' in fk_name:
+            return False
+        try:
+            field = self.model_container.model_class._meta.get_field(fk_name)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete and (field.many_to_one or field.one_to_one)
+
+    # Returns the (lazy) QuerySet of the objects filtered at this node; the filters of the whole subtree
+    #  are compiled into this single query
+    def compile(self, memo):
+        signature = self.get_signature()
+        if signature in memo:
+            return memo[signature]
+
+        queryset = self.model_container.model_class.objects.all()
+        for child in self.children:
+            child_queryset = child.compile(memo)
+            # Intersect the objects filtered at the child with the child's selection
+            if child.selection != NO_SELECTION:
+                child_queryset = child_queryset.filter(**{child.model_container.pk_name + '__in': child.selection})
+
+            if self._can_use_exists(child.parent_to_self_fk_name):
+                queryset = queryset.filter(Exists(child_queryset.filter(pk=OuterRef(child.parent_to_self_fk_name))))
+            else:
+                queryset = queryset.filter(**{child.parent_to_self_fk_name + '__in': child_queryset.values('pk')})
+
+        memo[signature] = queryset
+        return queryset
+
     # Finds all currently filtered objects at this node and writes them into 'self.filtered_objects'
-    def evaluate(self):
-        # In case the current node has no more children, set 'self.filtered_objects' to
-        #  'model.objects.all()'
-        if not self.children:
-            self.filtered_objects = self.model_container.model_class.objects.all()
-            return
-
-        child_to_selected_filtered_objects_dict = {}
+    def evaluate(self, memo=None):
+        if memo is None:
+            memo = {}
+        self.filtered_objects = self.compile(memo)
         for child in self.children:
-            child.evaluate()
-            # Fill 'child_to_selected_filtered_objects_dict[child]' with
-            #  'child.filtered_objects' intersected with the child's selection
-            child_to_selected_filtered_objects_dict[
-                child] = child.filtered_objects if child.selection == 'noSelection' else child.filtered_objects.filter(
-                **{
-                    self.model_container.pk_name + '__in': child.selection
-                })
-
-        # Aggregate all selected filtered objects for each child and filter accordingly
-        filters = {
-            child.parent_to_self_fk_name + '__in': child_to_selected_filtered_objects_dict[child]
-            for child
-            in self.children
-        }
-        self.filtered_objects = self.model_container.model_class.objects.filter(**filters)
+            child.evaluate(memo)
 
     # Writes for this node an entry of type 'self.node_id -> list(pk) at that id filtered at that node'
-    # into the passed dictionary
-    def write_self_to_dict(self, d):
-        d[self.node_id] = list(map(
-            lambda obj: obj.pk,
-            list(set(self.filtered_objects))
-        ))
+    # into the passed dictionary; only the primary keys are fetched, and equal subtrees are only queried once
+    def write_self_to_dict(self, d, memo=None):
+        if memo is None:
+            memo = {}
+        signature = self.get_signature()
+        if signature not in memo:
+            memo[signature] = list(self.filtered_objects.order_by().values_list('pk', flat=True).distinct())
+        d[self.node_id] = memo[signature]
 
         for child in self.children:
-            child.write_self_to_dict(d)
+            child.write_self_to_dict(d, memo)
@@ -0,0 +1,160 @@
+import hashlib
+
+from django.db import connection, transaction
+from django.db.models import CharField, TextField
+
+from generic_app.rest_api.explain import explain_queryset, get_scan_types
+from generic_app.rest_api.filters.filter_sets import INTERVAL_REQUIRING_FIELDS, get_indexed_field_names
+
+TRIGRAM_INDEX = 'trigram'
+BTREE_INDEX = 'btree'
+
+# PostgreSQL truncates identifiers longer than 63 characters
+MAX_INDEX_NAME_LENGTH = 63
+
+
+def get_index_name(table, column, suffix):
+    name = f'{table}_{column}_{suffix}'
+    if len(name) <= MAX_INDEX_NAME_LENGTH:
+        return name
+    digest = hashlib.md5(name.encode('utf-8')).hexdigest()[:8]
+    return f'{name[:MAX_INDEX_NAME_LENGTH - len(suffix) - len(digest) - 2]}_{digest}_{suffix}'
+
+
+class IndexRecommendation:
+    """
+    A missing index for a filterable field of a model:
+    - 'trigram': GIN index with gin_trgm_ops on UPPER(column::text), which is exactly the expression Django
+      uses for 'icontains' on PostgreSQL. Therefore, 'ILIKE %x%'-like filters do not need a sequential scan.
+    - 'btree': plain index for the exact- and interval-lookups of numeric and date fields
+    """
+
+    def __init__(self, model, field, index_type) -> None:
+        super().__init__()
+        self.model = model
+        self.field = field
+        self.index_type = index_type
+        self.table = model._meta.db_table
+        self.name = get_index_name(self.table, field.column, 'trgm' if index_type == TRIGRAM_INDEX else 'idx')
+
+        self.cost_without_index = None
+        self.cost_with_index = None
+        self.scan_types_without_index = None
+        self.scan_types_with_index = None
+        self.error = None
+
+    def get_create_sql(self, concurrently=True):
+        quote = connection.ops.quote_name
+        concurrently_sql = 'CONCURRENTLY ' if concurrently else ''
+        if self.index_type == TRIGRAM_INDEX:
+            indexed = f'USING gin ((UPPER({quote(self.field.column)}::text)) gin_trgm_ops)'
+        else:
+            indexed = f'({quote(self.field.column)})'
+        return f'CREATE INDEX {concurrently_sql}IF NOT EXISTS {quote(self.name)} ON {quote(self.table)} {indexed}'
+
+    def get_drop_sql(self, concurrently=True):
+        concurrently_sql = 'CONCURRENTLY ' if concurrently else ''
+        return f'DROP INDEX {concurrently_sql}IF EXISTS {connection.ops.quote_name(self.name)}'
+
+    def get_sample_queryset(self):
+        """
+        :return: a typical filter query on the field, built from a value that exists in the table,
+        or None if the table contains no such value
+        """
+        field_name = self.field.name
+        value = (self.model.objects.exclude(**{f'{field_name}__isnull': True})
+                 .values_list(field_name, flat=True).order_by().first())
+        if value is None:
+            return None
+        if self.index_type == TRIGRAM_INDEX:
+            value = str(value)
+            if len(value) > 6:
+                value = value[len(value) // 2 - 3:len(value) // 2 + 3]
+            return self.model.objects.filter(**{f'{field_name}__icontains': value})
+        return self.model.objects.filter(**{field_name: value})
+
+    def estimate(self, measure=False):
+        """
+        Writes the planner costs of the sample query into this recommendation. If 'measure' is set, the index
+        is created inside a transaction that is rolled back afterwards, in order to get the costs with the index.
+        Hint: creating the index locks the table for writes and takes as long as the real index creation.
+        """
+        try:
+            queryset = self.get_sample_queryset()
+            if queryset is None:
+                return
+            plan = explain_queryset(queryset)
+            self.cost_without_index = plan['Total Cost']
+            self.scan_types_without_index = get_scan_types(plan)
+
+            if measure:
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        if self.index_type == TRIGRAM_INDEX:
+                            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+                        cursor.execute(self.get_create_sql(concurrently=False))
+                        cursor.execute(f'ANALYZE {connection.ops.quote_name(self.table)}')
+                    plan = explain_queryset(queryset)
+                    self.cost_with_index = plan['Total Cost']
+                    self.scan_types_with_index = get_scan_types(plan)
+                    transaction.set_rollback(True)
+        except Exception as e:
+            self.error = str(e)
+
+    @property
+    def estimated_gain(self):
+        if self.cost_without_index is None or self.cost_with_index is None or not self.cost_with_index:
+            return None
+        return self.cost_without_index / self.cost_with_index
+
+
+def get_index_type(field, lookups):
+    if 'icontains' in lookups and isinstance(field, (CharField, TextField)):
+        return TRIGRAM_INDEX
+    if type(field) in INTERVAL_REQUIRING_FIELDS:
+        return BTREE_INDEX
+    return None
+
+
+def get_existing_index_names(model):
+    """
+    :return: the names of all indexes of the model's table in the database and the names of all columns
+    that are the leading column of one of these indexes
+    """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    index_names = set()
+    leading_columns = set()
+    for name, constraint in constraints.items():
+        if constraint['index'] or constraint['primary_key'] or constraint['unique']:
+            index_names.add(name)
+            columns = constraint['columns'] or []
+            if columns and columns[0] is not None and constraint.get('type') != 'gin':
+                leading_columns.add(columns[0])
+    return index_names, leading_columns
+
+
+def get_index_recommendations(model_container):
+    if not model_container.filterset_fields:
+        return []
+
+    model = model_container.model_class
+    declared_indexed = get_indexed_field_names(model)
+    declared_indexed_filter_fields = set(getattr(model, 'indexed_filter_fields', []))
+    existing_index_names, indexed_columns = get_existing_index_names(model)
+
+    recommendations = []
+    for field_name, lookups in model_container.filterset_fields.items():
+        if field_name in declared_indexed_filter_fields:
+            continue
+        field = model._meta.get_field(field_name)
+        index_type = get_index_type(field, lookups)
+        if index_type is None:
+            continue
+        recommendation = IndexRecommendation(model, field, index_type)
+        if recommendation.name in existing_index_names:
+            continue
+        if index_type == BTREE_INDEX and (field_name in declared_indexed or field.column in indexed_columns):
+            continue
+        recommendations.append(recommendation)
+    return recommendations
@@ -1,6 +1,9 @@
 import json
 
 from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from generic_app.rest_api.filters.filter_compiler import apply_filter
 
 
 # TODO: test this
@@ -26,14 +29,28 @@ def create_filter_queries_from_tree_paths(all_filter_queries, filter_node, query
             create_filter_queries_from_tree_paths(all_filter_queries, value, new_query_string)
 
 
+def load_filter_json(request, param, default):
+    try:
+        return json.loads(request.GET.get(param, default))
+    except (TypeError, ValueError):
+        raise ValidationError({"error": f"Filter rejected: {param} is not valid JSON"})
+
+
+def get_filter_model_container(view):
+    # the filter paths are validated against the relation graph of the model collection, if it is available
+    return getattr(view, 'kwargs', {}).get('model_container')
+
+
 class ForeignKeyFilterBackend(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
-        active_filter_tree = request.GET.get('activeFilterTree', None)
+        active_filter_tree = load_filter_json(request, 'activeFilterTree', 'null')
         all_filter_queries = {}
         if active_filter_tree is not None:
-            active_filter_tree = json.loads(active_filter_tree)
-            create_filter_queries_from_tree_paths(all_filter_queries, active_filter_tree, '')
-        return queryset.filter(**all_filter_queries)
+            try:
+                create_filter_queries_from_tree_paths(all_filter_queries, active_filter_tree, '')
+            except (KeyError, TypeError, AttributeError):
+                raise ValidationError({"error": "Filter rejected: activeFilterTree is malformed"})
+        return apply_filter(queryset, all_filter_queries, get_filter_model_container(view))
 
 
 class PrimaryKeyListFilterBackend(filters.BaseFilterBackend):
@@ -48,5 +65,5 @@ class PrimaryKeyListFilterBackend(filters.BaseFilterBackend):
 
 class StringFilterBackend(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
-        filter_arguments = request.GET.get('searchParams', '{}')
-        return queryset.filter(**json.loads(filter_arguments))
\ No newline at end of file
+        filter_arguments = load_filter_json(request, 'searchParams', '{}')
+        return apply_filter(queryset, filter_arguments, get_filter_model_container(view))
\ No newline at end of file
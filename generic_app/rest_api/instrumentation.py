@@ -0,0 +1,181 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+PHASE_SECONDS = 'generic_app_phase_seconds'
+REQUEST_SECONDS = 'generic_app_request_seconds'
+REQUEST_QUERIES = 'generic_app_request_queries'
+REQUEST_ROWS = 'generic_app_request_rows'
+
+METRIC_DESCRIPTIONS = {
+    PHASE_SECONDS: 'Time spent in a phase of a request (permissions, filtering, queryset_evaluation, '
+                   'serialization, post_save, ...)',
+    REQUEST_SECONDS: 'Time spent in the view of a request',
+    REQUEST_QUERIES: 'Number of database queries per request',
+    REQUEST_ROWS: 'Number of rows returned or affected by the database queries of a request',
+}
+
+
+class MetricsRegistry:
+    """
+    Collects summaries (count and sum of the observed values) per metric name and label set. Exporters can be
+    added via add_exporter; they are called with (name, labels, value) for every observation, e.g. for
+    forwarding the values to StatsD.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # (name, sorted label items) -> [count, sum]
+        self.summaries = {}
+        self.exporters = []
+        self._lock = threading.Lock()
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self.summaries.setdefault(key, [0, 0])
+            summary[0] += 1
+            summary[1] += value
+        for exporter in self.exporters:
+            exporter(name, labels, value)
+
+    def render_prometheus(self):
+        """
+        :return: all metrics in the text format of Prometheus
+        """
+        with self._lock:
+            summaries = sorted(self.summaries.items())
+        lines = []
+        current_name = None
+        for (name, labels), (count, total) in summaries:
+            if name != current_name:
+                current_name = name
+                lines.append(f'# HELP {name} {METRIC_DESCRIPTIONS.get(name, name)}')
+                lines.append(f'# TYPE {name} summary')
+            label_string = ','.join(f'{k}="{_escape_label_value(v)}"' for k, v in labels)
+            lines.append(f'{name}_count{{{label_string}}} {count}')
+            lines.append(f'{name}_sum{{{label_string}}} {total}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetrics:
+    def __init__(self, endpoint, model) -> None:
+        super().__init__()
+        self.endpoint = endpoint
+        self.model = model
+        self.queries = 0
+        self.rows = 0
+
+
+# metrics of the request handled in the current thread or asyncio task
+current_request_metrics = contextvars.ContextVar('current_request_metrics', default=None)
+
+
+@contextmanager
+def measure(phase, model=None):
+    """
+    Records the time spent inside the block as the given phase of the current request; does nothing
+    outside of instrumented views
+    """
+    request_metrics = current_request_metrics.get()
+    if request_metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(PHASE_SECONDS, {'endpoint': request_metrics.endpoint,
+                                         'model': model if model is not None else request_metrics.model,
+                                         'phase': phase}, time.perf_counter() - start)
+
+
+def count_queries(execute, sql, params, many, context):
+    result = execute(sql, params, many, context)
+    request_metrics = current_request_metrics.get()
+    if request_metrics is not None:
+        request_metrics.queries += 1
+        row_count = getattr(context['cursor'], 'rowcount', -1)
+        if row_count and row_count > 0:
+            request_metrics.rows += row_count
+    return result
+
+
+@contextmanager
+def instrument_request(view, request, kwargs):
+    model_container = kwargs.get('model_container')
+    request_metrics = RequestMetrics(type(view).__name__, getattr(model_container, 'id', ''))
+    labels = {'endpoint': request_metrics.endpoint, 'model': request_metrics.model, 'method': request.method}
+    token = current_request_metrics.set(request_metrics)
+    start = time.perf_counter()
+    try:
+        yield request_metrics
+    finally:
+        registry.observe(REQUEST_SECONDS, labels, time.perf_counter() - start)
+        registry.observe(REQUEST_QUERIES, labels, request_metrics.queries)
+        registry.observe(REQUEST_ROWS, labels, request_metrics.rows)
+        current_request_metrics.reset(token)
+
+
+class InstrumentedViewMixin:
+    """
+    Mixin for DRF views recording the duration, the number of queries and rows, and the time spent in the
+    phases permissions, filtering, queryset_evaluation (pagination) and serialization per endpoint and model
+    (see /metrics)
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with instrument_request(self, request, kwargs), connection.execute_wrapper(count_queries):
+            return super().dispatch(request, *args, **kwargs)
+
+    def check_permissions(self, request):
+        with measure('permissions'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with measure('permissions'):
+            super().check_object_permissions(request, obj)
+
+    def filter_queryset(self, queryset):
+        with measure('filtering'):
+            return super().filter_queryset(queryset)
+
+    def paginate_queryset(self, queryset):
+        with measure('queryset_evaluation'):
+            return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        to_representation = serializer.to_representation
+
+        def measured_to_representation(instance):
+            with measure('serialization'):
+                return to_representation(instance)
+
+        serializer.to_representation = measured_to_representation
+        return serializer
+
+
+class AsyncInstrumentedViewMixin(InstrumentedViewMixin):
+    """
+    InstrumentedViewMixin for the async views, to be put before the AsyncViewMixin (see
+    generic_app.rest_api.views.async_views). Only the queries of the synchronous parts (run_sync) are counted,
+    not those of the async ORM.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        with instrument_request(self, request, kwargs):
+            return await super().dispatch(request, *args, **kwargs)
@@ -1,3 +1,4 @@
+import traceback
 import typing
 
 from django.db.models import Model
@@ -5,6 +6,9 @@ from django.db.models import Model
 from generic_app.generic_models.ModelModificationRestriction import ModelModificationRestriction
 from generic_app.generic_models.Process import Process
 from generic_app.generic_models.html_report import HTMLReport
+from generic_app.rest_api.filters.filter_sets import create_filterset_fields, create_filterset_class, \
+    report_unindexed_filter_fields
+from generic_app.rest_api.model_collection.query_plan import create_query_plan
 from generic_app.rest_api.serializers import model2serializer
 
 foreign_key_name = 'ForeignKey'
@@ -38,8 +42,10 @@ class ModelContainer:
 
             self.dependent_model_containers: typing.Set[ModelContainer] = set()
 
+            self.query_plan = create_query_plan(self.model_class, self.process_admin)
             self.obj_serializer = model2serializer(self.model_class,
                                                    self.process_admin.get_fields_in_table_view(self.model_class))
+            self.create_filterset()
         else:
             super().__init__()
             self.model_class = model_class
@@ -51,7 +57,23 @@ class ModelContainer:
 
             self.dependent_model_containers: typing.Set[ModelContainer] = set()
 
+            self.query_plan = None
             self.obj_serializer = None
+            self.filterset_fields = None
+            self.filterset_class = None
+            self.filterset_error = None
+
+    def create_filterset(self):
+        # The filters of the list view are created once here instead of for every request; if this fails,
+        #   the error is kept and raised when the list view is requested
+        self.filterset_fields = None
+        self.filterset_class = None
+        self.filterset_error = None
+        try:
+            self.filterset_fields = create_filterset_fields(self.model_class)
+            self.filterset_class = create_filterset_class(self.model_class, self.filterset_fields)
+        except Exception:
+            self.filterset_error = traceback.format_exc()
 
     def get_modification_restriction(self):
         return getattr(self.model_class, 'modification_restriction', ModelModificationRestriction())
@@ -65,6 +87,17 @@ class ModelContainer:
             'can_delete_in_general': modification_restriction.can_delete_in_general(user, None)
         }
 
+    def get_planned_queryset(self, queryset=None):
+        """
+        :return: the given queryset (default: all entries of the model) with the query plan of this model applied,
+        i.e. with all relations of the table view joined or prefetched
+        """
+        if queryset is None:
+            queryset = self.model_class.objects.all()
+        if self.query_plan is None:
+            return queryset
+        return self.query_plan.apply(queryset)
+
     @property
     def pk_name(self):
         if hasattr(self.model_class, '_meta'):
@@ -149,6 +182,8 @@ class ModelCollection:
         for c in self.all_containers:
             c.read_dependencies()
 
+        report_unindexed_filter_fields(self)
+
         if model_structure:
             check_model_structure(model_structure, self.all_model_ids)
         else:
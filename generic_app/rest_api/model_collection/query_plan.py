@@ -0,0 +1,64 @@
+from django.core.exceptions import FieldDoesNotExist
+
+
+class QueryPlan:
+    """
+    Describes how the entries of a model should be loaded for the generic list- and detail-views,
+    such that rendering a page of entries costs a constant number of queries:
+    - foreign keys and one-to-one relations in the table view are joined via 'select_related', as the
+      short_description (i.e. str(obj)) of an entry typically touches them
+    - many-to-many relations in the table view are loaded via 'prefetch_related', as the serializer
+      renders them as lists of primary keys
+    - if 'only_fields' is set, all other columns are deferred
+    """
+
+    def __init__(self, select_related=(), prefetch_related=(), only_fields=None) -> None:
+        super().__init__()
+        self.select_related = list(select_related)
+        self.prefetch_related = list(prefetch_related)
+        self.only_fields = list(only_fields) if only_fields is not None else None
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only_fields is not None:
+            queryset = queryset.only(*self.only_fields)
+        return queryset
+
+
+def get_table_view_model_fields(model, process_admin):
+    """
+    :return: the model fields that are shown in the table view; names that do not refer to a model field
+    (e.g. the serializer-only fields 'id_field' and 'short_description') are skipped
+    """
+    fields = []
+    for field_name in process_admin.get_fields_in_table_view(model):
+        try:
+            fields.append(model._meta.get_field(field_name))
+        except FieldDoesNotExist:
+            continue
+    return fields
+
+
+def create_query_plan(model, process_admin):
+    select_related = []
+    prefetch_related = []
+    only_fields = {model._meta.pk.name}
+
+    for field in get_table_view_model_fields(model, process_admin):
+        if field.many_to_many:
+            prefetch_related.append(field.name)
+        elif field.many_to_one or field.one_to_one:
+            select_related.append(field.name)
+            only_fields.add(field.name)
+        elif field.concrete:
+            only_fields.add(field.name)
+
+    if not process_admin.restrict_queries_to_table_view:
+        only_fields = None
+    else:
+        only_fields = sorted(only_fields)
+
+    return QueryPlan(select_related, prefetch_related, only_fields)
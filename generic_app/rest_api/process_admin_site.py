@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.db.models.base import ModelBase
 from django.db.models.signals import post_save
 from django.http import HttpResponse
@@ -9,27 +10,32 @@ from generic_app.rest_api.model_collection.model_collection import ModelCollecti
 from generic_app.generic_models.calculated_model import CalculatedModelMixin
 from generic_app.generic_models.model_process_admin import ModelProcessAdmin
 from generic_app.rest_api.views.calculations.CleanCalculations import CleanCalculations
+from generic_app.rest_api.views.calculations.CalculationProfile import CalculationProfileView
 from generic_app.rest_api.views.file_operations.FileDownload import FileDownloadView
 from generic_app.rest_api.views.file_operations.ModelExport import ModelExportView
+from generic_app.rest_api.views.file_operations.ChunkedFileUpload import FileUploadView, FileUploadChunkView, \
+    FileUploadCompleteView
 from generic_app.rest_api.views.sharepoint.SharePointFileDownload import SharePointFileDownload
 from generic_app.rest_api.views.sharepoint.SharePointPreview import SharePointPreview
 from generic_app.rest_api.views.sharepoint.SharePointShareLink import SharePointShareLink
 from generic_app.rest_api.views.sharepoint.DeleteUnusedFiles import DeleteUnusedFiles
 from generic_app.rest_api.signals import do_post_save
 
-from generic_app.rest_api.views.model_info.Fields import Fields
+from generic_app.rest_api.views.async_views import select_view
+from generic_app.rest_api.views.model_info.Fields import Fields, AsyncFields
 from generic_app.rest_api.views.model_info.Widgets import Widgets
-from generic_app.rest_api.views.model_relation_views import ModelStructureObtainView, Overview, ProcessStructure
-from generic_app.rest_api.views.model_entries.List import ListModelEntries
+from generic_app.rest_api.views.model_relation_views import ModelStructureObtainView, Overview, ProcessStructure, \
+    AsyncModelStructureObtainView
+from generic_app.rest_api.views.model_entries.List import ListModelEntries, AsyncListModelEntries
 from generic_app.rest_api.views.model_entries.Many import ManyModelEntries
 from generic_app.rest_api.views.model_entries.One import OneModelEntry
-from generic_app.rest_api.views.permissions.ModelPermissions import ModelPermissions
+from generic_app.rest_api.views.permissions.ModelPermissions import ModelPermissions, AsyncModelPermissions
 from generic_app.rest_api.views.process_flow.CreateOrUpdate import CreateOrUpdate
 from generic_app.rest_api.views.project_info.ProjectInfo import ProjectInfo
-from generic_app.rest_api.views.calculations.InitCalculationLogs import InitCalculationLogs
+from generic_app.rest_api.views.calculations.InitCalculationLogs import InitCalculationLogs, AsyncInitCalculationLogs
 
 from generic_app.rest_api import converters
-from generic_app.rest_api.views.global_search_for_models.Search import Search
+from generic_app.rest_api.views.global_search_for_models.Search import Search, AsyncSearch
 
 class ProcessAdminSite:
     """
@@ -124,7 +130,8 @@ class ProcessAdminSite:
         register_converter(converters.create_model_converter(self.model_collection), 'model')
 
         urlpatterns = [
-            path('api/model-structure', ModelStructureObtainView.as_view(model_collection=self.model_collection),
+            path('api/model-structure', select_view(ModelStructureObtainView, AsyncModelStructureObtainView).as_view(
+                model_collection=self.model_collection),
                  name='model-structure'),
             path('api/auth/token/', TokenObtainPairWithUserView.as_view(), name='token'),
             path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='refresh_token'),
@@ -132,6 +139,14 @@ class ProcessAdminSite:
                  FileDownloadView.as_view(model_collection=self.model_collection), name='file-download'),
             path('api/<model:model_container>/export',
                  ModelExportView.as_view(model_collection=self.model_collection), name='model-export'),
+            # the chunks of uploads are written to the storage outside of any transaction
+            path('api/<model:model_container>/file-upload',
+                 transaction.non_atomic_requests(FileUploadView.as_view()), name='file-upload'),
+            path('api/file-upload/<str:upload_id>',
+                 transaction.non_atomic_requests(FileUploadChunkView.as_view()), name='file-upload-chunk'),
+            path('api/file-upload/<str:upload_id>/complete',
+                 transaction.non_atomic_requests(FileUploadCompleteView.as_view(model_collection=self.model_collection)),
+                 name='file-upload-complete'),
             path('api/htmlreport/<str:report_name>',
                  Overview.as_view(HTML_reports=self.html_reports), name='htmlreports'),
             path('api/process/<str:process_name>',
@@ -139,7 +154,8 @@ class ProcessAdminSite:
         ]
 
         url_patterns_for_react_admin = [
-            path('api/model_entries/<model:model_container>/list', ListModelEntries.as_view(),
+            path('api/model_entries/<model:model_container>/list',
+                 select_view(ListModelEntries, AsyncListModelEntries).as_view(),
                  name='model-entries-list'),
             path('api/model_entries/<model:model_container>/<str:calculationId>/one/<int:pk>', OneModelEntry.as_view(),
                  name='model-one-entry-read-update-delete'),
@@ -148,20 +164,24 @@ class ProcessAdminSite:
                  name='run_step'),
             path('api/model_entries/<model:model_container>/many', ManyModelEntries.as_view(),
                  name='model-many-entries'),
-            path('api/global-search/<str:query>', Search.as_view(model_collection=self.model_collection),
+            path('api/global-search/<str:query>', select_view(Search, AsyncSearch).as_view(model_collection=self.model_collection),
                  name='global-search'),
-            path('api/<model:model_container>/model-permissions', ModelPermissions.as_view(), name='model-restrictions'),
+            path('api/<model:model_container>/model-permissions',
+                 select_view(ModelPermissions, AsyncModelPermissions).as_view(), name='model-restrictions'),
             path('api/project-info', ProjectInfo.as_view(),
                  name='project-info'),
             path('api/widget_structure', Widgets.as_view(), name='widget-structure'),
-            path('api/init-calculation-logs', InitCalculationLogs.as_view(),
+            path('api/init-calculation-logs', select_view(InitCalculationLogs, AsyncInitCalculationLogs).as_view(),
                  name='init-calculation-logs'),
             path('api/clean-calculations', CleanCalculations.as_view(),
                  name='clean-calculations'),
+            path('api/calculation-profile', CalculationProfileView.as_view(),
+                 name='calculation-profile'),
         ]
 
         url_patterns_for_model_info = [
-            path('api/model_info/<model:model_container>/fields', Fields.as_view(), name='model-info-fields'),
+            path('api/model_info/<model:model_container>/fields', select_view(Fields, AsyncFields).as_view(),
+                 name='model-info-fields'),
         ]
 
         url_patterns_for_sharepoint = [
@@ -176,13 +196,16 @@ class ProcessAdminSite:
 
         return urlpatterns + url_patterns_for_react_admin + url_patterns_for_model_info + url_patterns_for_sharepoint
 
-    @property
-    def urls(self):
+    def get_model_collection(self):
         # TODO: Move this to a logically more appropriate place
         # TODO: remove tree induction
         if not self.initialized:
             self.model_collection = ModelCollection(self.registered_models, self.model_structure,
                                                     self.model_styling, self.global_filter_structure)
             self.initialized = True
+        return self.model_collection
 
+    @property
+    def urls(self):
+        self.get_model_collection()
         return self._get_urls(), 'process_admin', self.name  # TODO: what is the name exactly for??
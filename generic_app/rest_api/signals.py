@@ -2,50 +2,55 @@ import os
 
 from generic_app.rest_api.calculated_model_updates.update_handler import CalculatedModelUpdateHandler
 from django.dispatch import receiver
+from generic_app.rest_api.instrumentation import measure
 
 from django.db.models.signals import post_save
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from generic_app.rest_api.event_bus import event_bus
 
 
 @receiver(post_save)
 def calculation_ids(sender, instance, created, **kwargs):
     from generic_app.submodels.CalculationIDs import CalculationIDs
-
-    if sender == CalculationIDs and instance.calculation_record != "init_upload":
-        channel_layer = get_channel_layer()
-
-        calculation_record = instance.calculation_record
-        calculation_id = instance.calculation_id
-        context_id = instance.context_id
-
-        message = {
-            'type': 'calculation_id',
-            'payload': {
-                'calculation_record': calculation_record,
-                'calculation_id': calculation_id,
-                'context_id': context_id
-            }
+    from generic_app.rest_api.calculation_ids import clear_cache
+
+    if sender == CalculationIDs:
+        # the ids resolved in this operation may be outdated
+        clear_cache()
+        publish_calculation_id(instance.calculation_record, instance.calculation_id, instance.context_id)
+
+
+def publish_calculation_id(calculation_record, calculation_id, context_id):
+    if calculation_record == "init_upload":
+        return
+    message = {
+        'type': 'calculation_id',
+        'payload': {
+            'calculation_record': calculation_record,
+            'calculation_id': calculation_id,
+            'context_id': context_id
         }
-        async_to_sync(channel_layer.group_send)("calculations", message)
+    }
+    event_bus.publish("calculations", message, key=('calculation_id', calculation_record, context_id))
 @receiver(post_save)
 def calculation_logs(sender, instance, created, **kwargs):
     from generic_app.submodels.CalculationLog import CalculationLog
     from generic_app.submodels.UserChangeLog import UserChangeLog
 
     if created and (sender == CalculationLog or sender == UserChangeLog):
-        channel_layer = get_channel_layer()
-        message = {
+        calculation_record = instance.calculation_record
+        calculation_id = instance.calculationId
+        # The payload contains all logs of the calculation, so it is only created right before sending, and only
+        #  the last of the logs created in the meantime leads to an event
+        message = lambda: {
             'type': 'calculation_log_real_time', # This is the correct naming convention
-            'payload': get_model_data(instance.calculation_record, instance.calculationId)
+            'payload': get_model_data(calculation_record, calculation_id)
         }
-        async_to_sync(channel_layer.group_send)(f'{instance.calculation_record}', message)
+        event_bus.publish(f'{calculation_record}', message, key=('calculation_log', calculation_id))
 @receiver(post_save)
 def send_calculation_notification(sender, instance, created, **kwargs):
     from generic_app.submodels.CalculationLog import CalculationLog
 
     if created and sender == CalculationLog and instance.is_notification:
-        channel_layer = get_channel_layer()
         message = {
             'type': 'calculation_notification', # This is the correct naming convention
             'payload': {
@@ -55,13 +60,12 @@ def send_calculation_notification(sender, instance, created, **kwargs):
         }
         # notification = Notifications(message=instance.message, timestamp=datetime.now())
         # notification.save()
-        async_to_sync(channel_layer.group_send)(f'calculation_notification', message)
+        event_bus.publish(f'calculation_notification', message)
 
 def update_calculation_status(instance):
     from generic_app.generic_models.upload_model import ConditionalUpdateMixin
 
     if issubclass(instance.__class__, ConditionalUpdateMixin):
-        channel_layer = get_channel_layer()
         message = {
             'type': 'calculation_is_completed', # This is the correct naming convention
             'payload': {
@@ -71,7 +75,8 @@ def update_calculation_status(instance):
         }
         # notification = Notifications(message="Calculation is finished", timestamp=datetime.now())
         # notification.save()
-        async_to_sync(channel_layer.group_send)(f'update_calculation_status', message)
+        # only the last status of the record is sent, if its status changes several times within a batch
+        event_bus.publish(f'update_calculation_status', message, key=('calculation_status', message['payload']['record_id']))
 
 def get_model_data(calculation_record, calculationId):
     from generic_app.submodels.CalculationLog import CalculationLog
@@ -92,7 +97,8 @@ def get_model_data(calculation_record, calculationId):
     return "\n".join(messages)
 
 def do_post_save(sender, **kwargs):
-    CalculatedModelUpdateHandler.register_save(kwargs['instance'])
+    with measure('post_save', model=sender._meta.model_name):
+        CalculatedModelUpdateHandler.register_save(kwargs['instance'])
 
 from django.dispatch import Signal
 
@@ -1,7 +1,31 @@
+from contextlib import contextmanager
+
 from django.db import transaction
 
-from generic_app.rest_api.calculated_model_updates.objects_to_recalculate_store import ObjectsToRecalculateStore
-from generic_app.rest_api.calculated_model_updates.update_handler import CalculatedModelUpdateHandler
+from generic_app.rest_api.calculated_model_updates.objects_to_recalculate_store import ObjectsToRecalculateStore, \
+    current_store
+
+
+# Collects the entries dependent on the entries saved inside the block and updates each of them once
+# when the block is left without an exception. The collected entries are separate for every thread and
+# asyncio task. Nested blocks hand their entries over to the enclosing block; the outermost block recalculates
+# them directly or, if 'on_commit' is set, when the current transaction is committed.
+@contextmanager
+def deferred_recalculations(on_commit=False):
+    parent = current_store.get()
+    store = ObjectsToRecalculateStore(parent)
+    token = current_store.set(store)
+    try:
+        yield store
+    finally:
+        current_store.reset(token)
+
+    if parent is not None:
+        store.merge_into(parent)
+    elif on_commit:
+        transaction.on_commit(store.recalculate)
+    else:
+        store.recalculate()
 
 
 # Executes 'func' as an atomic transaction while only updating the entries dependent on the
@@ -9,11 +33,7 @@ from generic_app.rest_api.calculated_model_updates.update_handler import Calcula
 def as_transaction(func):
     def entire_transaction():
         with transaction.atomic():
-            CalculatedModelUpdateHandler.set_post_save_behaviour(
-                lambda entry: ObjectsToRecalculateStore.insert(entry)
-            )
-            transaction.on_commit(ObjectsToRecalculateStore.do_recalculations)
-            func()
-            CalculatedModelUpdateHandler.reset_post_save_behaviour()
+            with deferred_recalculations(on_commit=True):
+                func()
 
     return entire_transaction
@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+from generic_app.rest_api.instrumentation import current_request_metrics, count_queries
+
+# Endpoints served by the async variants of the read-only views, given by the names of the synchronous views,
+#   e.g. ASYNC_VIEWS=ListModelEntries,Search or ASYNC_VIEWS=all
+ASYNC_VIEWS = {name.strip() for name in os.getenv('ASYNC_VIEWS', '').split(',') if name.strip()}
+
+
+def select_view(view_class, async_view_class):
+    """
+    :return: the async variant of the view, if it is enabled for the endpoint via ASYNC_VIEWS
+    """
+    if 'all' in ASYNC_VIEWS or view_class.__name__ in ASYNC_VIEWS:
+        return async_view_class
+    return view_class
+
+
+async def run_sync(function, *args, **kwargs):
+    """
+    Runs synchronous code (e.g. the modification restrictions of the models, or str() of an instance, which may
+    query related entries) from an async view, with its queries counted for the instrumentation
+    """
+    def run():
+        if current_request_metrics.get() is None:
+            return function(*args, **kwargs)
+        with connection.execute_wrapper(count_queries):
+            return function(*args, **kwargs)
+
+    return await sync_to_async(run)()
+
+
+class AsyncViewMixin:
+    """
+    Mixin for read-only DRF views whose handlers are coroutines, such that the view does not hold a thread of
+    the ASGI server while its queries are running (see the async ORM: acount, aiterator, async for).
+    Authentication, permission and throttling checks stay synchronous (the authentication backends and the
+    modification restrictions are), but are run together in one call of run_sync.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if not asyncio.iscoroutinefunction(view):
+            # csrf_exempt of Django < 5.0 wraps the view into a synchronous function; the attribute set by it
+            #   is sufficient for the CsrfViewMiddleware
+            view = view.__wrapped__
+            view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        # same as APIView.dispatch, but awaiting the handler
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await run_sync(self.initial, request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
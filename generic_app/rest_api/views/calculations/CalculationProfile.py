@@ -0,0 +1,23 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework_api_key.permissions import HasAPIKey
+from django.http import JsonResponse
+
+from generic_app.submodels.CalculationProfile import CalculationProfile
+
+
+class CalculationProfileView(APIView):
+    http_method_names = ['get']
+    permission_classes = [HasAPIKey | IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        calculation_id = request.query_params.get('calculation_id')
+        if not calculation_id:
+            raise ValidationError({"error": "The parameter calculation_id is missing"})
+
+        queryset = CalculationProfile.objects.filter(calculation_id=calculation_id).order_by('-wall_time')
+        stages = list(queryset.values('calculation_record', 'stage', 'depth', 'timestamp', 'executions', 'wall_time',
+                                      'cpu_time', 'query_count', 'query_time', 'peak_memory'))
+
+        return JsonResponse({"calculation_id": calculation_id, "stages": stages})
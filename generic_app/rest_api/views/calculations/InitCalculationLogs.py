@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 from rest_framework_api_key.permissions import HasAPIKey
 from django.http import JsonResponse
 
+from generic_app.rest_api.views.async_views import AsyncViewMixin
 from generic_app.submodels.CalculationLog import CalculationLog
 from generic_app.submodels.UserChangeLog import UserChangeLog
 
@@ -15,19 +16,35 @@ class InitCalculationLogs(APIView):
     http_method_names = ['get']
     permission_classes = [HasAPIKey | IsAuthenticated]
     def get(self, request, *args, **kwargs):
+        messages = []
+        for queryset in self.get_querysets(request):
+            messages.extend(f"{message.timestamp} {message.message}" for message in queryset)
+
+        return JsonResponse({"logs": "\n".join(messages)})
+
+    @staticmethod
+    def get_querysets(request):
         calculation_record = request.query_params['calculation_record']
         calculation_id = request.query_params['calculation_id']
 
-        messages = []
-
         # Fetch messages from UserChangeLog
         queryset_ucl = UserChangeLog.objects.filter(calculation_record=calculation_record,
                                                     calculationId=calculation_id).only('timestamp', 'message')
-        messages.extend(f"{message.timestamp} {message.message}" for message in queryset_ucl)
 
         # Fetch messages from CalculationLog
         queryset_calc = CalculationLog.objects.filter(calculation_record=calculation_record,
                                                       calculationId=calculation_id).only('timestamp', 'message')
-        messages.extend(f"{message.timestamp} {message.message}" for message in queryset_calc)
+        return [queryset_ucl, queryset_calc]
+
+
+class AsyncInitCalculationLogs(AsyncViewMixin, InitCalculationLogs):
+    """
+    InitCalculationLogs with the logs streamed via the async ORM (see ASYNC_VIEWS)
+    """
+
+    async def get(self, request, *args, **kwargs):
+        messages = []
+        for queryset in self.get_querysets(request):
+            messages.extend([f"{message.timestamp} {message.message}" async for message in queryset.aiterator()])
 
-        return JsonResponse({"logs": "\n".join(messages)})
\ No newline at end of file
+        return JsonResponse({"logs": "\n".join(messages)})
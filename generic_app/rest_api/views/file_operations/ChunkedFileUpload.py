@@ -0,0 +1,246 @@
+import inspect
+import re
+import traceback
+import uuid
+from datetime import datetime
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import FileField
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError, APIException
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_api_key.permissions import HasAPIKey
+
+from generic_app.rest_api.file_uploads import MAX_CHUNK_SIZE, ChunkTooLarge, PartConflict, read_chunk, save_part, \
+    assemble, delete_parts
+from generic_app.rest_api.transactions.transactions import deferred_recalculations
+from generic_app.rest_api.views.permissions.UserPermission import get_permission_denied_message
+from generic_app.rest_api.views.utils import get_user_name
+
+# Protocol:
+#   POST   api/<model>/file-upload                {"pk", "field", "file_name", "size", "checksum"}
+#   PUT    api/file-upload/<upload_id>?offset=n   raw bytes of the chunk starting at n, optionally with the header
+#                                                 'X-Chunk-SHA256'
+#   GET    api/file-upload/<upload_id>            offset at which the upload is resumed
+#   POST   api/file-upload/<upload_id>/complete   attaches the file to the field
+#   DELETE api/file-upload/<upload_id>            aborts the upload
+# The chunks are written to the storage without any open transaction; only attaching the file to the record
+#   happens in a (short) transaction. The checksum (sha256) of the whole file is required, as it is the only
+#   protection against parts replaced by concurrent or repeated requests.
+
+
+def get_upload_info(upload):
+    return {
+        'upload_id': upload.upload_id,
+        'status': upload.status,
+        'offset': upload.offset,
+        'size': upload.size,
+        'max_chunk_size': MAX_CHUNK_SIZE,
+        'file': upload.stored_file,
+    }
+
+
+def check_modification_permission(request, model_container, instance, field_name, file_name):
+    modification_restriction = model_container.get_modification_restriction()
+    user = request.user
+    violations = []
+    if not modification_restriction.can_modify_in_general(user, violations):
+        raise PermissionDenied(get_permission_denied_message('modify', 'model', violations))
+    violations = []
+    if 'request_data' in inspect.signature(modification_restriction.can_be_modified).parameters:
+        permitted = modification_restriction.can_be_modified(instance, user, violations, {field_name: file_name})
+    else:
+        permitted = modification_restriction.can_be_modified(instance, user, violations)
+    if not permitted:
+        raise PermissionDenied(get_permission_denied_message('modify', 'instance', violations))
+
+
+class FileUploadView(APIView):
+    """
+    Starts a resumable upload of a file into a file field (e.g. XLSXField, PDFField) of a record
+    """
+    http_method_names = ['post']
+    permission_classes = [HasAPIKey | IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        from generic_app.submodels.FileUpload import FileUpload
+
+        model_container = kwargs['model_container']
+        model = model_container.model_class
+        try:
+            pk = request.data['pk']
+            field_name = request.data['field']
+            file_name = request.data['file_name']
+            size = int(request.data['size'])
+            checksum = str(request.data['checksum']).lower()
+        except (KeyError, ValueError) as e:
+            raise ValidationError({"error": f"Missing or invalid parameter {e}"})
+        if not re.fullmatch('[0-9a-f]{64}', checksum):
+            raise ValidationError({"error": "The checksum has to be the sha256 of the file in hexadecimal"})
+        if size < 0:
+            raise ValidationError({"error": "The size must not be negative"})
+
+        field = next((f for f in model._meta.fields if f.name == field_name), None)
+        if not isinstance(field, FileField):
+            raise ValidationError({"error": f"{field_name} is not a file field of {model_container.id}"})
+        instance = model.objects.filter(pk=pk).first()
+        if instance is None:
+            raise NotFound(f"There is no {model_container.id} with id {pk}")
+        check_modification_permission(request, model_container, instance, field_name, file_name)
+
+        now = timezone.now()
+        upload = FileUpload.objects.create(upload_id=uuid.uuid4().hex, model_name=model_container.id,
+                                           record_id=str(instance.pk), field_name=field_name, file_name=file_name,
+                                           size=size, checksum=checksum,
+                                           user_name=get_user_name(request), created_at=now, updated_at=now)
+        return Response(get_upload_info(upload), status=status.HTTP_201_CREATED)
+
+
+class FileUploadChunkView(APIView):
+    """
+    Receives the chunks of an upload; a chunk has to start at the offset of the upload (which is returned by
+    GET), otherwise the request is answered with 409 and the expected offset
+    """
+    http_method_names = ['get', 'put', 'delete']
+    permission_classes = [HasAPIKey | IsAuthenticated]
+
+    @staticmethod
+    def get_upload(request, upload_id):
+        from generic_app.submodels.FileUpload import FileUpload
+
+        upload = FileUpload.objects.filter(upload_id=upload_id).first()
+        # uploads are only visible to the user who started them
+        if upload is None or upload.user_name != get_user_name(request):
+            raise NotFound(f"There is no upload with id {upload_id}")
+        return upload
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_upload_info(self.get_upload(request, kwargs['upload_id'])))
+
+    def put(self, request, *args, **kwargs):
+        from generic_app.submodels.FileUpload import FileUpload
+
+        upload = self.get_upload(request, kwargs['upload_id'])
+        try:
+            offset = int(request.query_params['offset'])
+        except (KeyError, ValueError):
+            raise ValidationError({"error": "The parameter offset is missing or invalid"})
+        if upload.status != FileUpload.IN_PROGRESS or offset != upload.offset:
+            return Response(get_upload_info(upload), status=status.HTTP_409_CONFLICT)
+
+        # the body is read from the stream, as request.body would hold the whole chunk in memory
+        try:
+            chunk, size, checksum = read_chunk(request.stream)
+        except ChunkTooLarge as e:
+            return Response({"error": str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        with chunk:
+            expected_checksum = request.headers.get('X-Chunk-SHA256')
+            if expected_checksum and expected_checksum.lower() != checksum:
+                raise ValidationError({"error": "Checksum mismatch: the chunk is corrupted"})
+            if size == 0 or offset + size > upload.size:
+                raise ValidationError({"error": f"The chunk does not fit into the file of {upload.size} bytes"})
+            try:
+                save_part(upload, offset, chunk)
+            except PartConflict:
+                upload.refresh_from_db()
+                return Response(get_upload_info(upload), status=status.HTTP_409_CONFLICT)
+
+        # a concurrent request for the same offset may have won; its part is the one kept, and the checksum
+        #   of the whole file is verified on completion anyway
+        updated = FileUpload.objects.filter(pk=upload.pk, status=FileUpload.IN_PROGRESS, offset=offset).update(
+            offset=offset + size, updated_at=timezone.now())
+        upload.refresh_from_db()
+        return Response(get_upload_info(upload), status=status.HTTP_200_OK if updated else status.HTTP_409_CONFLICT)
+
+    def delete(self, request, *args, **kwargs):
+        from generic_app.submodels.FileUpload import FileUpload
+
+        upload = self.get_upload(request, kwargs['upload_id'])
+        if upload.status != FileUpload.COMPLETE:
+            delete_parts(upload)
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FileUploadCompleteView(APIView):
+    """
+    Assembles the received chunks, verifies the checksum and attaches the file to the field of the record
+    """
+    model_collection = None
+    http_method_names = ['post']
+    permission_classes = [HasAPIKey | IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        from generic_app.submodels.FileUpload import FileUpload
+        from generic_app.submodels.UserChangeLog import UserChangeLog
+
+        upload = FileUploadChunkView.get_upload(request, kwargs['upload_id'])
+        if upload.status == FileUpload.COMPLETE:
+            return Response(get_upload_info(upload))
+        if upload.offset != upload.size:
+            return Response(get_upload_info(upload), status=status.HTTP_409_CONFLICT)
+        # only one request assembles the file
+        if not FileUpload.objects.filter(pk=upload.pk, status=FileUpload.IN_PROGRESS).update(
+                status=FileUpload.ASSEMBLING, updated_at=timezone.now()):
+            upload.refresh_from_db()
+            return Response(get_upload_info(upload), status=status.HTTP_409_CONFLICT)
+
+        model_container = self.model_collection.get_container(upload.model_name)
+        model = model_container.model_class
+        field = model._meta.get_field(upload.field_name)
+        stored_file = None
+        committed = False
+        try:
+            instance = model.objects.filter(pk=upload.record_id).first()
+            if instance is None:
+                raise NotFound(f"There is no {model_container.id} with id {upload.record_id}")
+            check_modification_permission(request, model_container, instance, upload.field_name, upload.file_name)
+
+            # assembling and storing the file happen outside of any transaction
+            file, checksum = assemble(upload)
+            with file:
+                if upload.checksum != checksum:
+                    delete_parts(upload)
+                    FileUpload.objects.filter(pk=upload.pk).update(offset=0, updated_at=timezone.now())
+                    raise ValidationError({"error": "Checksum mismatch: the upload has to be repeated"})
+                stored_file = field.storage.save(field.generate_filename(instance, upload.file_name),
+                                                 File(file, name=upload.file_name), max_length=field.max_length)
+
+            # the entries dependent on the record are only recalculated when the block is left, i.e. after the
+            #   commit; once committed, the record references the stored file, which must be kept even if the
+            #   recalculation fails
+            with deferred_recalculations():
+                with transaction.atomic():
+                    instance = model.objects.select_for_update().get(pk=upload.record_id)
+                    setattr(instance, upload.field_name, stored_file)
+                    instance.save()
+                    FileUpload.objects.filter(pk=upload.pk).update(status=FileUpload.COMPLETE,
+                                                                   stored_file=stored_file, checksum=checksum,
+                                                                   updated_at=timezone.now())
+                committed = True
+        except Exception as e:
+            if committed:
+                delete_parts(upload)
+            else:
+                FileUpload.objects.filter(pk=upload.pk).update(status=FileUpload.IN_PROGRESS,
+                                                               updated_at=timezone.now())
+                if stored_file is not None:
+                    field.storage.delete(stored_file)
+            if isinstance(e, APIException):
+                raise
+            UserChangeLog(calculation_record=f"{model_container.id}_{upload.record_id}", message=f"{e}",
+                          timestamp=datetime.now(), user_name=get_user_name(request),
+                          traceback=traceback.format_exc()).save()
+            raise APIException({"error": f"{e} ", "traceback": traceback.format_exc()})
+
+        delete_parts(upload)
+        UserChangeLog(calculation_record=f"{model_container.id}_{upload.record_id}",
+                      message=f"Upload of {upload.file_name} into {upload.field_name} of {model_container.id} "
+                              f"with id {upload.record_id} successful",
+                      timestamp=datetime.now(), user_name=get_user_name(request)).save()
+        upload.refresh_from_db()
+        return Response(get_upload_info(upload))
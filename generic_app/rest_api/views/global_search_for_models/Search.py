@@ -4,7 +4,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_api_key.permissions import HasAPIKey
 
+from generic_app.rest_api.instrumentation import InstrumentedViewMixin, AsyncInstrumentedViewMixin, measure
 from generic_app.rest_api.model_collection.model_collection import ModelCollection
+from generic_app.rest_api.views.async_views import AsyncViewMixin, run_sync
 from generic_app.rest_api.views.permissions.UserPermission import UserPermission
 
 EXCLUDED_MODELS = {'calculationdashboard', 'user', 'group', 'permission', 'contenttype', 'userchangelog',
@@ -12,7 +14,7 @@ EXCLUDED_MODELS = {'calculationdashboard', 'user', 'group', 'permission', 'conte
 EXCLUDED_TYPES = {'FloatField', 'BooleanField', 'IntegerField', "FileField", "ForeignKey", "XLSXField", "PDFField", "ImageField"}
 
 
-class Search(APIView):
+class Search(InstrumentedViewMixin, APIView):
     permission_classes = [HasAPIKey | IsAuthenticated]
     model_collection: ModelCollection = None
 
@@ -21,22 +23,60 @@ class Search(APIView):
         allMatches = []
         for model in self.model_collection.all_containers:
             temp_view = APIView(kwargs={'model_container': model})
-            if model.id not in EXCLUDED_MODELS and UserPermission().has_permission(request=request, view=temp_view):
-                fields = model.model_class._meta.get_fields(include_parents=False)
-                tempMatch = model.model_class.objects.annotate(search=SearchVector(*[f.name for f in fields if
-                                                                                     f.get_internal_type() not in EXCLUDED_TYPES])).filter(
-                    search=query)
-                for match in tempMatch:
-                    if UserPermission().has_object_permission(request=request, view=temp_view, obj=match):
-                        matchObj = {"id": str(match.pk), "type": model.title, "model": model.id,
-                                    "url": f'/{model.id}/{match.pk}/show', "content": {
-                                "id": str(match.pk),
-                                "label": 'Model: ' + model.title ,
-                                "description": str(match)}}
-                        allMatches.append(matchObj)
+            if self.is_searchable(request, model, temp_view):
+                tempMatch = self.get_search_queryset(model, query)
+                with measure('queryset_evaluation', model=model.id):
+                    allMatches.extend(self.get_match_objects(request, model, temp_view, tempMatch))
 
+        return self.get_search_response(allMatches)
+
+    @staticmethod
+    def is_searchable(request, model, temp_view):
+        return model.id not in EXCLUDED_MODELS and UserPermission().has_permission(request=request, view=temp_view)
+
+    @staticmethod
+    def get_search_queryset(model, query):
+        fields = model.model_class._meta.get_fields(include_parents=False)
+        return model.model_class.objects.annotate(search=SearchVector(*[f.name for f in fields if
+                                                                        f.get_internal_type() not in EXCLUDED_TYPES])).filter(
+            search=query)
+
+    @staticmethod
+    def get_match_objects(request, model, temp_view, matches):
+        matchObjects = []
+        for match in matches:
+            if UserPermission().has_object_permission(request=request, view=temp_view, obj=match):
+                matchObj = {"id": str(match.pk), "type": model.title, "model": model.id,
+                            "url": f'/{model.id}/{match.pk}/show', "content": {
+                        "id": str(match.pk),
+                        "label": 'Model: ' + model.title ,
+                        "description": str(match)}}
+                matchObjects.append(matchObj)
+        return matchObjects
+
+    @staticmethod
+    def get_search_response(allMatches):
         if allMatches:
             result = {"data": allMatches, "total": len(allMatches)}
             return Response(result)
         else:
             return Response("No match found")
+
+
+class AsyncSearch(AsyncInstrumentedViewMixin, AsyncViewMixin, Search):
+    """
+    Search with the matches queried via the async ORM (see ASYNC_VIEWS); the permission checks and the
+    descriptions of the matches are created in one run_sync per model
+    """
+
+    async def get(self, request, *args, **kwargs):
+        query = self.kwargs['query']
+        allMatches = []
+        for model in self.model_collection.all_containers:
+            temp_view = APIView(kwargs={'model_container': model})
+            if await run_sync(self.is_searchable, request, model, temp_view):
+                with measure('queryset_evaluation', model=model.id):
+                    matches = [match async for match in self.get_search_queryset(model, query).aiterator()]
+                    allMatches.extend(await run_sync(self.get_match_objects, request, model, temp_view, matches))
+
+        return self.get_search_response(allMatches)
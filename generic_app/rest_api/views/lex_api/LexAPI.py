@@ -1,11 +1,69 @@
 import os
+import json
+import threading
+import time
 import requests
 import base64
 import mimetypes
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect timeout, read timeout) in seconds
+TIMEOUT = (float(os.getenv("LEX_API_CONNECT_TIMEOUT", 5)), float(os.getenv("LEX_API_READ_TIMEOUT", 20)))
+# Client roles are cached for this time
+ROLE_CACHE_SECONDS = float(os.getenv("LEX_API_ROLE_CACHE_SECONDS", 300))
+# Size of the chunks the attachments are read and encoded in (multiple of 3, so that the base64 chunks can be
+#  concatenated)
+ATTACHMENT_CHUNK_SIZE = 3 * 64 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Session shared by all requests to the LexAPI, such that connections are kept alive and reused.
+    Failed connections and (for GET requests) server errors are retried with exponential backoff; POST requests
+    are not repeated once they reached the server, so that e.g. no email is sent twice.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, connect=3, read=2, status=2, backoff_factor=0.5,
+                          status_forcelist=(502, 503, 504), allowed_methods=frozenset({'GET'}),
+                          raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=int(os.getenv("LEX_API_POOL_SIZE", 10)),
+                                  max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_headers():
+    return {
+        "Authorization": f"Api-Key {os.getenv('LEX_API_KEY')}",
+        "Content-Type": "application/json",
+    }
+
+
+def get_content_type(path):
+    guessed_type, _ = mimetypes.guess_type(path)
+    return guessed_type or "application/octet-stream"
+
+
+def iter_base64_file(path):
+    with open(path, "rb") as f:
+        while chunk := f.read(ATTACHMENT_CHUNK_SIZE):
+            yield base64.b64encode(chunk)
+
+
 def build_attachments_from_paths(paths):
     """
     Convert local file paths into the JSON format expected by /api/send_email/.
+    Hint: for large files, rather pass the paths to send_email directly, which streams them.
 
     Returns:
       [
@@ -15,36 +73,65 @@ def build_attachments_from_paths(paths):
     """
     out = []
     for p in paths:
-        guessed_type, _ = mimetypes.guess_type(p)
-        content_type = guessed_type or "application/octet-stream"
-        with open(p, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("ascii")
+        b64 = b"".join(iter_base64_file(p)).decode("ascii")
         out.append(
-            {"name": os.path.basename(p), "content_base64": b64, "content_type": content_type}
+            {"name": os.path.basename(p), "content_base64": b64, "content_type": get_content_type(p)}
         )
     return out
 
+
+class StreamedEmailBody:
+    """
+    JSON body of /api/send_email/, in which the attachments given as file paths are read and base64-encoded
+    chunk by chunk while sending, instead of holding them in memory. The length is known in advance, so the
+    body is sent with a Content-Length; it can be iterated multiple times (for retries).
+    """
+
+    def __init__(self, data, attachments) -> None:
+        super().__init__()
+        # list of bytes and file paths
+        self.segments = [json.dumps(data)[:-1].encode() + b', "attachments": [']
+        for index, attachment in enumerate(attachments):
+            separator = b', ' if index > 0 else b''
+            if isinstance(attachment, dict):
+                self.segments.append(separator + json.dumps(attachment).encode())
+            else:
+                path = os.fspath(attachment)
+                metadata = {"name": os.path.basename(path), "content_type": get_content_type(path)}
+                self.segments.append(separator + json.dumps(metadata)[:-1].encode() + b', "content_base64": "')
+                self.segments.append(path)
+                self.segments.append(b'"}')
+        self.segments.append(b']}')
+
+    def __len__(self):
+        return sum(len(s) if isinstance(s, bytes) else 4 * -(-os.path.getsize(s) // 3) for s in self.segments)
+
+    def __iter__(self):
+        for segment in self.segments:
+            if isinstance(segment, bytes):
+                yield segment
+            else:
+                yield from iter_base64_file(segment)
+
+
 def send_email(subject, emails, body, attachments=None):
     """
-    attachments (optional):
-      - already prepared list of dicts (see formats above), OR
-      - list of file paths -> pass build_attachments_from_paths(paths)
+    attachments (optional): list of
+      - already prepared dicts (see build_attachments_from_paths) and/or
+      - file paths, which are streamed
     """
     if not os.getenv("DEPLOYMENT_ENVIRONMENT"):
         return
 
     url = f"https://{os.getenv('DOMAIN_BASE')}/api/send_email/"
-    headers = {
-        "Authorization": f"Api-Key {os.getenv('LEX_API_KEY')}",
-        "Content-Type": "application/json",
-    }
 
     data = {"subject": subject, "emails": emails, "body": body}
 
     if attachments:
-        data["attachments"] = attachments
-
-    response = requests.post(url, json=data, headers=headers, timeout=20)
+        response = get_session().post(url, data=StreamedEmailBody(data, attachments), headers=get_headers(),
+                                      timeout=TIMEOUT)
+    else:
+        response = get_session().post(url, json=data, headers=get_headers(), timeout=TIMEOUT)
 
     if response.status_code == 200:
         return response.json()
@@ -53,21 +140,36 @@ def send_email(subject, emails, body, attachments=None):
     print("Response:", response.text)
     raise Exception("Failed to send email")
 
-def get_client_roles():
+
+# (time of expiry, client roles)
+_client_roles_cache = None
+_client_roles_lock = threading.Lock()
+
+
+def get_client_roles(refresh=False):
+    """
+    The client roles are cached for ROLE_CACHE_SECONDS; concurrent callers wait for a single request instead of
+    requesting them simultaneously. Pass refresh=True to bypass the cache.
+    """
+    global _client_roles_cache
+    with _client_roles_lock:
+        if not refresh and _client_roles_cache is not None and _client_roles_cache[0] > time.monotonic():
+            return _client_roles_cache[1]
+        roles = request_client_roles()
+        _client_roles_cache = (time.monotonic() + ROLE_CACHE_SECONDS, roles)
+        return roles
+
+
+def request_client_roles():
     url = f"https://{os.getenv('DOMAIN_BASE')}/api/get_client_roles/"
-    headers = {
-        'Authorization': f"Api-Key {os.getenv('LEX_API_KEY')}",
-        'Content-Type': 'application/json'
-    }
     data = {
         'keycloak_client_id': os.getenv('KEYCLOAK_INTERNAL_CLIENT_ID')
     }
 
-    response = requests.get(url, params=data, headers=headers)
+    response = get_session().get(url, params=data, headers=get_headers(), timeout=TIMEOUT)
     if response.status_code == 200:
-        print(response.json())
         return response.json()
     else:
         print('Failed with status code:', response.status_code)
         print('Response:', response.text)
-        raise Exception("Failed to get client roles")
\ No newline at end of file
+        raise Exception("Failed to get client roles")
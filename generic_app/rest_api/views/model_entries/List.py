@@ -1,52 +1,109 @@
-import traceback
 from math import inf
 
-from django.db.models import FloatField, IntegerField, DateField, DateTimeField, TextField, AutoField
-from django_filters import FilterSet
+from django.core.paginator import InvalidPage
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, NotFound
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
-from generic_app.generic_models.upload_model import IsCalculatedField, CalculateField
+from generic_app.rest_api.instrumentation import InstrumentedViewMixin, AsyncInstrumentedViewMixin, measure
+from generic_app.rest_api.views.async_views import AsyncViewMixin, run_sync
 from generic_app.rest_api.views.model_entries.filter_backends import UserReadRestrictionFilterBackend
 from generic_app.rest_api.views.model_entries.mixins.ModelEntryProviderMixin import ModelEntryProviderMixin
+from generic_app.rest_api.views.pagination import KeysetPagination
 
-INTERVAL_REQUIRING_FIELDS = {FloatField, IntegerField, DateField, DateTimeField}
-CALCULATION_FIELDS = {IsCalculatedField, CalculateField}
+PAGINATION_MODE_PARAM = 'pagination'
+CURSOR_PAGINATION = 'cursor'
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_query_param = 'page'
     page_size_query_param = 'perPage'
     def paginate_queryset(self, queryset, request, view=None):
-        if request.query_params["perPage"] == -1:
-            self.page_size = queryset.count()  # Set the page size equal to the total number of objects in the queryset
+        if request.query_params.get("perPage") == "-1":
+            # Set the page size equal to the total number of objects in the queryset
+            self.page_size = max(queryset.count(), 1)
 
         return super().paginate_queryset(queryset, request, view)
 
-class ListModelEntries(ModelEntryProviderMixin, ListAPIView):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Same as paginate_queryset, with the queries run via the async ORM
+        """
+        self.request = request
+        count = await queryset.acount()
+        if request.query_params.get("perPage") == "-1":
+            self.page_size = max(count, 1)
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # the count is not queried again by the paginator
+        paginator.count = count
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        # 'async for' instead of aiterator, since the query plan may prefetch relations
+        self.page.object_list = [entry async for entry in self.page.object_list]
+        return list(self.page)
+
+class ListModelEntries(InstrumentedViewMixin, ModelEntryProviderMixin, ListAPIView):
     pagination_class = CustomPageNumberPagination
+    # used instead of pagination_class, if the request contains 'pagination=cursor'
+    keyset_pagination_class = KeysetPagination
     # see https://stackoverflow.com/a/40585846
     # We use the UserReadRestrictionFilterBackend for filtering out those instances that the user
     #   does not have access to
     filter_backends = [UserReadRestrictionFilterBackend, DjangoFilterBackend, OrderingFilter]
 
-    def get_lookup_expressions(self, field_type):
-        if field_type in INTERVAL_REQUIRING_FIELDS:
-            if field_type in [DateField, DateTimeField]:
-                return ['exact', 'lte', 'gte', 'year', 'month', 'day']
-            return ['exact', 'lte', 'gte']
-        if field_type in [TextField, AutoField]:
-            return ['exact', 'icontains']
-        return ['exact']
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get(PAGINATION_MODE_PARAM) == CURSOR_PAGINATION:
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def _get_filter_model_container(self):
+        model_container = self.kwargs['model_container']
+        if model_container.filterset_error is not None:
+            raise APIException({"error": f"Filter fields could not be generated!", "traceback": model_container.filterset_error})
+        return model_container
 
+    # filterset_fields and filterset_class are created once per model by the ModelContainer,
+    #   see generic_app.rest_api.filters.filter_sets
     @property
     def filterset_fields(self):
-        # we need to only take those fields where a django-filter exists
-        try:
-            return_fields = {f.name: self.get_lookup_expressions(type(f)) for f in
-                    self.kwargs['model_container'].model_class._meta.fields if (type(f) in FilterSet.FILTER_DEFAULTS or type(f) in CALCULATION_FIELDS)}
-            return return_fields
-        except Exception as e:
-            raise APIException({"error": f"Filter fields could not be generated!", "traceback": traceback.format_exc()})
\ No newline at end of file
+        return self._get_filter_model_container().filterset_fields
+
+    @property
+    def filterset_class(self):
+        return self._get_filter_model_container().filterset_class
+
+
+class AsyncListModelEntries(AsyncInstrumentedViewMixin, AsyncViewMixin, ListModelEntries):
+    """
+    ListModelEntries with the count and the page queried via the async ORM (see ASYNC_VIEWS)
+    """
+
+    async def get(self, request, *args, **kwargs):
+        # the read restriction of the model may evaluate the queryset
+        queryset = await run_sync(self.filter_queryset, self.get_queryset())
+
+        with measure('queryset_evaluation'):
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is None:
+            return Response(await run_sync(lambda: self.get_serializer(queryset, many=True).data))
+
+        # str() of the entries (short_description) may query related entries
+        data = await run_sync(lambda: self.get_serializer(page, many=True).data)
+        return self.get_paginated_response(data)
@@ -1,11 +1,12 @@
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 
+from generic_app.rest_api.instrumentation import InstrumentedViewMixin
 from generic_app.rest_api.views.model_entries.filter_backends import PrimaryKeyListFilterBackend
 from generic_app.rest_api.views.model_entries.mixins.ModelEntryProviderMixin import ModelEntryProviderMixin
 
 
-class ManyModelEntries(ModelEntryProviderMixin, GenericAPIView):
+class ManyModelEntries(InstrumentedViewMixin, ModelEntryProviderMixin, GenericAPIView):
     filter_backends = [PrimaryKeyListFilterBackend]
 
     def get_filtered_query_set(self):
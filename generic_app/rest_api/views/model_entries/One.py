@@ -8,6 +8,7 @@ from rest_framework.exceptions import APIException
 from rest_framework.generics import RetrieveUpdateDestroyAPIView, CreateAPIView
 from rest_framework.mixins import CreateModelMixin, UpdateModelMixin
 
+from generic_app.rest_api.instrumentation import InstrumentedViewMixin
 from generic_app.rest_api.views.model_entries.mixins.DestroyOneWithPayloadMixin import DestroyOneWithPayloadMixin
 from generic_app.rest_api.views.model_entries.mixins.ModelEntryProviderMixin import ModelEntryProviderMixin
 from generic_app.rest_api.views.utils import get_user_name, get_user_email
@@ -19,7 +20,7 @@ user_name = None
 user_email = None
 
 
-class OneModelEntry(ModelEntryProviderMixin, DestroyOneWithPayloadMixin, RetrieveUpdateDestroyAPIView, CreateAPIView):
+class OneModelEntry(InstrumentedViewMixin, ModelEntryProviderMixin, DestroyOneWithPayloadMixin, RetrieveUpdateDestroyAPIView, CreateAPIView):
 
     def create(self, request, *args, **kwargs):
         from generic_app.submodels.UserChangeLog import UserChangeLog
@@ -54,7 +55,7 @@ class OneModelEntry(ModelEntryProviderMixin, DestroyOneWithPayloadMixin, Retriev
 
     def update(self, request, *args, **kwargs):
         from generic_app.submodels.UserChangeLog import UserChangeLog
-        from generic_app.submodels.CalculationIDs import CalculationIDs
+        from generic_app.rest_api.calculation_ids import set_calculation_id
         from generic_app.models import update_handler
 
         model_container = self.kwargs['model_container']
@@ -65,9 +66,7 @@ class OneModelEntry(ModelEntryProviderMixin, DestroyOneWithPayloadMixin, Retriev
         with OperationContext() as context_id:
 
             if "calculate" in request.data and request.data["calculate"] == "true":
-                CalculationIDs.objects.update_or_create(calculation_record=f"{model_container.id}_{self.kwargs['pk']}",
-                                                        context_id=context_id,
-                                                        defaults={'calculation_id': calculationId})
+                set_calculation_id(f"{model_container.id}_{self.kwargs['pk']}", context_id, calculationId)
 
             if "edited_file" not in request.data:
                 user_change_log = UserChangeLog(calculationId=calculationId,
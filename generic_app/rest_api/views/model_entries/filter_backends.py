@@ -2,6 +2,8 @@ import base64
 from urllib.parse import parse_qs
 from rest_framework import filters
 
+from generic_app.generic_models.ModelModificationRestriction import ModelModificationRestriction
+
 
 class PrimaryKeyListFilterBackend(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
@@ -40,6 +42,11 @@ class UserReadRestrictionFilterBackend(filters.BaseFilterBackend):
 
         # Hint: we do not check the general read-permission here, as this is already done by the class UserPermission
 
+        # If the instance-wise read-restriction is not overwritten, every entry can be read and we do not have to
+        #   load the whole table for checking it
+        if type(modification_restriction).can_be_read is ModelModificationRestriction.can_be_read:
+            return queryset
+
         permitted_entry_ids = [entry.id for entry in queryset if
                                modification_restriction.can_be_read(entry, user, None)]
         return queryset.filter(id__in=permitted_entry_ids)
@@ -8,7 +8,7 @@ class ModelEntryProviderMixin:
     permission_classes = [HasAPIKey | IsAuthenticated, UserPermission]
 
     def get_queryset(self):
-        return self.kwargs['model_container'].model_class.objects.all()
+        return self.kwargs['model_container'].get_planned_queryset()
 
     def get_serializer_class(self):
         return self.kwargs['model_container'].obj_serializer
\ No newline at end of file
@@ -10,6 +10,7 @@ from generic_app.generic_models.fields.HTML_field import HTMLField
 from generic_app.generic_models.fields.PDF_field import PDFField
 from generic_app.generic_models.fields.XLSX_field import XLSXField
 from generic_app.generic_models.upload_model import CalculateField, IsCalculatedField
+from generic_app.rest_api.views.async_views import AsyncViewMixin, run_sync
 from generic_app.rest_api.views.permissions.UserPermission import UserPermission
 
 DJANGO_FIELD2TYPE_NAME = {
@@ -58,18 +59,31 @@ def create_field_info(field):
     }
 
 
+def get_field_info(model):
+    fields = model._meta.fields
+    return {'fields': [
+        create_field_info(field) for field in fields
+    ], 'id_field': model._meta.pk.name}
+
+
 class Fields(APIView):
     http_method_names = ['get']
     permission_classes = [HasAPIKey | IsAuthenticated, UserPermission]
 
     def get(self, *args, **kwargs):
-        model = kwargs['model_container'].model_class
-        fields = model._meta.fields
-        field_info = {'fields': [
-            create_field_info(field) for field in fields
-        ], 'id_field': model._meta.pk.name}
+        field_info = get_field_info(kwargs['model_container'].model_class)
         # TODO maybe: also send an array containing only those fields that should be presented in the table
         #   to the frontend. This is configured in the model-process-admin-class for the model (which can
         #   be accessed via the model_container) --> The idea is, that the table only shows the main fields
         #   but avoids unnecessary information
         return Response(field_info)
+
+
+class AsyncFields(AsyncViewMixin, Fields):
+    """
+    Fields as async view (see ASYNC_VIEWS)
+    """
+
+    async def get(self, *args, **kwargs):
+        # the defaults of the fields may be callables querying the database
+        return Response(await run_sync(get_field_info, kwargs['model_container'].model_class))
@@ -9,6 +9,7 @@ from rest_framework.views import APIView
 from rest_framework_api_key.permissions import HasAPIKey
 
 from generic_app.rest_api.model_collection.model_collection import ModelCollection
+from generic_app.rest_api.views.async_views import AsyncViewMixin, run_sync
 
 
 class ModelStructureObtainView(APIView):
@@ -31,10 +32,21 @@ class ModelStructureObtainView(APIView):
                 self.delete_restricted_nodes_from_model_structure(subTree['children'], user)
 
     def get(self, request, *args, **kwargs):
-        user = request.user
+        return Response(self.get_user_dependent_model_structure(request.user))
+
+    def get_user_dependent_model_structure(self, user):
         user_dependet_model_structure = copy.deepcopy(self.model_collection.model_structure_with_readable_names)
         self.delete_restricted_nodes_from_model_structure(user_dependet_model_structure, user)
-        return Response(user_dependet_model_structure)
+        return user_dependet_model_structure
+
+
+class AsyncModelStructureObtainView(AsyncViewMixin, ModelStructureObtainView):
+    """
+    ModelStructureObtainView as async view (see ASYNC_VIEWS); the read restrictions are checked in one run_sync
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return Response(await run_sync(self.get_user_dependent_model_structure, request.user))
 
 
 class ModelStylingObtainView(APIView):
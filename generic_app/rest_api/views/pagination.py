@@ -1,4 +1,21 @@
-from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination
+import base64
+import datetime
+import json
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination, BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+from generic_app.rest_api.explain import explain_queryset
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -8,3 +25,207 @@ class CustomPageNumberPagination(PageNumberPagination):
 class CustomLimitOffsetPagination(LimitOffsetPagination):
     limit_query_param = 'limit'
     offset_query_param = 'offset'
+
+
+def estimate_count(queryset):
+    """
+    Returns an estimation of the number of entries in the queryset without scanning the table.
+    On PostgreSQL, the statistics of the planner are used: for unfiltered querysets the tuple count of 'pg_class',
+    otherwise the row estimate of EXPLAIN. On all other databases, the exact count is returned.
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                           [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # reltuples is -1 if the table has never been analyzed
+        if row is not None and row[0] >= 0:
+            return row[0]
+        return queryset.count()
+
+    return explain_queryset(queryset)['Plan Rows']
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    Encodes the values of the cursors completely: DjangoJSONEncoder truncates datetimes and times to
+    milliseconds, with which entries of the same millisecond would be repeated (or never left) across pages
+    """
+
+    def default(self, o):
+        # datetime is a subclass of date
+        if isinstance(o, (datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, (Decimal, uuid.UUID)):
+            return str(o)
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the ordering field plus the primary key, i.e. the next page is selected
+    via 'WHERE (ordering_field, pk) > (last_value, last_pk)' instead of an OFFSET. Therefore, deep pages
+    are as fast as the first one, given that there is an index on the ordering field.
+    Only one ordering field is supported; the pagination only moves forward (the client keeps the
+    cursors of the visited pages). The total count is only computed if requested via 'count=exact'
+    or 'count=estimate'.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'perPage'
+    ordering_query_param = 'ordering'
+    count_query_param = 'count'
+    page_size = 100
+    max_page_size = 10000
+
+    EXACT_COUNT = 'exact'
+    ESTIMATED_COUNT = 'estimate'
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering_field(self, request, model):
+        ordering = request.query_params.get(self.ordering_query_param, '').split(',')[0].strip()
+        descending = ordering.startswith('-')
+        field_name = ordering.lstrip('-')
+        if not field_name:
+            return model._meta.pk, False
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return model._meta.pk, False
+        if not field.concrete or field.many_to_many:
+            return model._meta.pk, False
+        return field, descending
+
+    def encode_cursor(self, value, pk):
+        data = json.dumps([value, pk], cls=CursorJSONEncoder)
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, field, pk_field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            return (field.to_python(value) if value is not None else None), pk_field.to_python(pk)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_keyset_filter(self, field, descending, value, pk):
+        # NULL values are sorted last in ascending and first in descending order (see paginate_queryset)
+        attname = field.attname
+        pk_lookup = 'pk__lt' if descending else 'pk__gt'
+        if field.primary_key:
+            return Q(**{pk_lookup: pk})
+        if value is None:
+            if descending:
+                return Q(**{f'{attname}__isnull': False}) | Q(**{f'{attname}__isnull': True, pk_lookup: pk})
+            return Q(**{f'{attname}__isnull': True, pk_lookup: pk})
+        value_lookup = f'{attname}__lt' if descending else f'{attname}__gt'
+        keyset_filter = Q(**{value_lookup: value}) | Q(**{attname: value, pk_lookup: pk})
+        if not descending and field.null:
+            keyset_filter |= Q(**{f'{attname}__isnull': True})
+        return keyset_filter
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count_mode = self.initialize(request)
+        if count_mode == self.EXACT_COUNT:
+            self.count = queryset.count()
+        elif count_mode == self.ESTIMATED_COUNT:
+            self.count = estimate_count(queryset)
+            self.count_is_estimated = True
+
+        field, page_queryset = self.get_page_queryset(queryset, request)
+        return self.get_page_results(list(page_queryset), field)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Same as paginate_queryset, with the queries run via the async ORM
+        """
+        count_mode = self.initialize(request)
+        if count_mode == self.EXACT_COUNT:
+            self.count = await queryset.acount()
+        elif count_mode == self.ESTIMATED_COUNT:
+            self.count = await sync_to_async(estimate_count)(queryset)
+            self.count_is_estimated = True
+
+        field, page_queryset = self.get_page_queryset(queryset, request)
+        return self.get_page_results([entry async for entry in page_queryset], field)
+
+    def initialize(self, request):
+        """
+        :return: the requested count mode
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        self.count_is_estimated = False
+        return request.query_params.get(self.count_query_param)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        :return: (ordering field, queryset of the requested page)
+        """
+        model = queryset.model
+        pk_field = model._meta.pk
+        field, descending = self.get_ordering_field(request, model)
+        prefix = '-' if descending else ''
+
+        if field.primary_key:
+            ordering = [f'{prefix}pk']
+        elif descending:
+            ordering = [F(field.attname).desc(nulls_first=True), '-pk']
+        else:
+            ordering = [F(field.attname).asc(nulls_last=True), 'pk']
+        queryset = queryset.order_by(*ordering)
+
+        cursor = self.decode_cursor(request, field, pk_field)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(field, descending, *cursor))
+
+        # fetch one more entry than requested for knowing whether there is a next page
+        return field, queryset[:self.page_size + 1]
+
+    def get_page_results(self, results, field):
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        self.next_cursor = None
+        if self.has_next:
+            last = results[-1]
+            self.next_cursor = self.encode_cursor(getattr(last, field.attname), last.pk)
+        return results
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_previous_link(self):
+        return None
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_is_estimated', self.count_is_estimated),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('first', self.get_first_link()),
+            ('results', data),
+        ]))
@@ -3,6 +3,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_api_key.permissions import HasAPIKey
 
+from generic_app.rest_api.views.async_views import AsyncViewMixin, run_sync
+
+
 class ModelPermissions(APIView):
     http_method_names = ['get']
     permission_classes = [HasAPIKey | IsAuthenticated]
@@ -13,4 +16,15 @@ class ModelPermissions(APIView):
 
         model_restrictions = {model_container.id: model_container.get_general_modification_restrictions_for_user(user)}
 
-        return Response(model_restrictions)
\ No newline at end of file
+        return Response(model_restrictions)
+
+
+class AsyncModelPermissions(AsyncViewMixin, ModelPermissions):
+    """
+    ModelPermissions as async view (see ASYNC_VIEWS)
+    """
+
+    async def get(self, request, *args, **kwargs):
+        model_container = self.kwargs['model_container']
+        restrictions = await run_sync(model_container.get_general_modification_restrictions_for_user, request.user)
+        return Response({model_container.id: restrictions})
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+import traceback
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTaskRunner:
+    """
+    Collects the tasks that have to be done once after the startup (e.g. resetting aborted calculations or
+    loading the initial data) and runs them in a background thread, such that they do not delay the readiness
+    of the server. Tasks that must not overlap with requests (e.g. resetting aborted calculations, which would also
+    reset calculations started by the first requests) are registered with 'before_serving' and run directly on
+    start. The tasks are run in the order of their registration; a failing task does not stop the others.
+    Used as singleton (see startup_task_runner).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tasks = []
+        self.tasks_before_serving = []
+        self.models_with_aborted_calculations = []
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def register(self, task, name=None, before_serving=False):
+        with self._lock:
+            tasks = self.tasks_before_serving if before_serving else self.tasks
+            tasks.append((name or task.__name__, task))
+
+    def register_aborted_calculation_reset(self, model):
+        """
+        Registers a model with ConditionalUpdateMixin whose instances with 'calculate=True' have to be reset,
+        as their calculations were aborted by the restart. The resets of all models are done in one transaction,
+        before the server accepts requests.
+        """
+        with self._lock:
+            if not self.models_with_aborted_calculations:
+                self.tasks_before_serving.append(("reset_instances_with_aborted_calculations",
+                                                  self.reset_instances_with_aborted_calculations))
+            self.models_with_aborted_calculations.append(model)
+
+    def reset_instances_with_aborted_calculations(self):
+        with transaction.atomic():
+            for model in self.models_with_aborted_calculations:
+                model.objects.filter(calculate=True).update(calculate=False)
+
+    @staticmethod
+    def run_tasks(tasks):
+        for name, task in tasks:
+            start = time.perf_counter()
+            try:
+                task()
+                logger.info(f"Startup task {name} finished after {time.perf_counter() - start:.3f}s")
+            except Exception:
+                logger.error(f"Startup task {name} failed:\n{traceback.format_exc()}")
+
+    def run(self):
+        with self._lock:
+            tasks, self.tasks = self.tasks, []
+        try:
+            self.run_tasks(tasks)
+        finally:
+            # the connection of this thread is not closed by Django's request handling
+            connection.close()
+
+    def start(self):
+        """
+        Runs the tasks registered with 'before_serving', then the other registered tasks in a background thread
+        """
+        with self._lock:
+            tasks_before_serving, self.tasks_before_serving = self.tasks_before_serving, []
+        self.run_tasks(tasks_before_serving)
+
+        with self._lock:
+            if not self.tasks or self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name="startup-tasks", daemon=True)
+        self.thread.start()
+
+
+startup_task_runner = StartupTaskRunner()
@@ -1,3 +1,5 @@
+from django.db.models import Index, UniqueConstraint
+
 from generic_app.generic_models.ModificationRestrictedModelExample import AdminReportsModificationRestriction
 from generic_app import models
 
@@ -7,4 +9,12 @@ class CalculationIDs(models.Model):
     id = models.AutoField(primary_key=True)
     context_id = models.TextField(default='test_id')
     calculation_record = models.TextField()
-    calculation_id = models.TextField(default='test_id')
\ No newline at end of file
+    calculation_id = models.TextField(default='test_id')
+
+    class Meta:
+        # the lookups of generic_app/rest_api/calculation_ids.py; the constraint also serves the lookups by
+        #  calculation_record
+        constraints = [UniqueConstraint(fields=['calculation_record', 'context_id'],
+                                        name='calculation_ids_record_context_unique')]
+        indexes = [Index(fields=['context_id'], name='calculation_ids_context_idx'),
+                   Index(fields=['calculation_id'], name='calculation_ids_calc_idx')]
@@ -3,17 +3,15 @@ import threading
 import traceback
 from datetime import datetime
 
-from celery import current_task
+from django.db.models import Index
 
 from generic_app.generic_models.ModificationRestrictedModelExample import AdminReportsModificationRestriction
-from generic_app.rest_api.context import context_id
+from generic_app.rest_api.calculation_ids import get_or_create_calculation_id
 from generic_app import models
 import inspect
 from django.core.cache import cache
 from lex.lex_app import settings
 
-from generic_app.submodels.CalculationIDs import CalculationIDs
-
 #### Note: Messages shall be delivered in the following format: "Severity: Message" The colon and the whitespace after are required for the code to work correctly ####
 # Severity could be something like 'Error', 'Warning', 'Caution', etc. (See Static variables below!)
 
@@ -30,6 +28,10 @@ class CalculationLog(models.Model):
     method = models.TextField()
     is_notification = models.BooleanField(default=False)
 
+    class Meta:
+        # used by the log retention (see log_retention.py)
+        indexes = [Index(fields=['timestamp'], name='calculation_log_ts_idx')]
+
     # Severities, to be concatenated with message in create statement
     SUCCESS = 'Success: '
     WARNING = 'Warning: '
@@ -52,18 +54,7 @@ class CalculationLog(models.Model):
         trace_objects = cls.get_trace_objects()["trace_objects"]
         calculation_record = cls.get_trace_objects()["first_model_info"]
 
-        if current_task and os.getenv("CELERY_ACTIVE"):
-            obj, created = CalculationIDs.objects.get_or_create(calculation_record=calculation_record if calculation_record else "init_upload",
-                                                                calculation_id=str(current_task.request.id),
-                                                                defaults={
-                                                                    'context_id': getattr(CalculationIDs.objects.filter(calculation_id=str(current_task.request.id)).first(), "context_id", "test_id")})
-            calculation_id = getattr(obj, "calculation_id", "test_id")
-        else:
-            obj, created = CalculationIDs.objects.get_or_create(calculation_record=calculation_record if calculation_record else "init_upload",
-                                                                context_id=context_id.get() if context_id.get() else "test_id",
-                                                                defaults={
-                                                                    'calculation_id': getattr(CalculationIDs.objects.filter(context_id=context_id.get()).first(), "calculation_id", "test_id")})
-            calculation_id = getattr(obj, "calculation_id", "test_id")
+        calculation_id = get_or_create_calculation_id(calculation_record if calculation_record else "init_upload")
 
         calc_log = CalculationLog(timestamp=datetime.now(), method=str(trace_objects),
                                   calculation_record=calculation_record if calculation_record else "init_upload", message=message, calculationId=calculation_id,
@@ -0,0 +1,28 @@
+from django.db.models import Index
+
+from generic_app.generic_models.ModificationRestrictedModelExample import AdminReportsModificationRestriction
+from generic_app import models
+
+
+class CalculationLogArchive(models.Model):
+    """
+    CalculationLogs moved out of the CalculationLog table by the log retention (see log_retention.py), with
+    the id they had there
+    """
+    modification_restriction = AdminReportsModificationRestriction()
+    id = models.IntegerField(primary_key=True)
+    timestamp = models.DateTimeField()
+    trigger_name = models.TextField(null=True)
+    message_type = models.TextField(default="")
+    calculationId = models.TextField(default='test_id')
+    calculation_record = models.TextField(default="legacy")
+    message = models.TextField()
+    method = models.TextField()
+    is_notification = models.BooleanField(default=False)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            Index(fields=['timestamp'], name='calculation_log_archive_ts_idx'),
+            Index(fields=['calculation_record'], name='calculation_log_archive_rec_idx'),
+        ]
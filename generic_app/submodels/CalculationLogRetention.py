@@ -0,0 +1,17 @@
+from generic_app import models
+
+
+class CalculationLogRetention(models.Model):
+    """
+    Retention of the CalculationLogs of a calculation record (e.g. 'report_12') or, if ending with '*', of all
+    calculation records starting with the given prefix (e.g. 'report_*'). The most specific matching entry applies;
+    logs without any matching entry are kept for CALCULATION_LOG_RETENTION_DAYS days, if this is set.
+    """
+    id = models.AutoField(primary_key=True)
+    calculation_record = models.TextField(unique=True)
+    retention_days = models.IntegerField()
+    # whether the expired logs are moved to the CalculationLogArchive instead of being deleted
+    archive = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.calculation_record}: {self.retention_days} days"
@@ -0,0 +1,29 @@
+from django.db.models import Index, BigIntegerField
+
+from generic_app.generic_models.ModificationRestrictedModelExample import AdminReportsModificationRestriction
+from generic_app import models
+
+
+class CalculationProfile(models.Model):
+    """
+    Aggregated measurements of one stage of a calculation (see calculation_profiler.py): every execution of the
+    stage within the calculation is added to the same entry
+    """
+    modification_restriction = AdminReportsModificationRestriction()
+    id = models.AutoField(primary_key=True)
+    calculation_id = models.TextField()
+    calculation_record = models.TextField(default="legacy")
+    stage = models.TextField()
+    # nesting depth of the stage, 0 for the outermost stage
+    depth = models.IntegerField(default=0)
+    timestamp = models.DateTimeField()
+    executions = models.IntegerField(default=0)
+    wall_time = models.FloatField(default=0)
+    cpu_time = models.FloatField(default=0)
+    query_count = models.IntegerField(default=0)
+    query_time = models.FloatField(default=0)
+    # peak memory in bytes traced by tracemalloc; None if tracemalloc is not active
+    peak_memory = BigIntegerField(null=True)
+
+    class Meta:
+        indexes = [Index(fields=['calculation_id'], name='calculation_profile_id_idx')]
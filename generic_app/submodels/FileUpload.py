@@ -0,0 +1,37 @@
+from django.db.models import Index, BigIntegerField
+
+from generic_app.generic_models.ModificationRestrictedModelExample import AdminReportsModificationRestriction
+from generic_app import models
+
+
+class FileUpload(models.Model):
+    """
+    A resumable upload of a file into a file field (e.g. XLSXField, PDFField) of a record, sent in chunks
+    (see generic_app/rest_api/file_uploads.py)
+    """
+    modification_restriction = AdminReportsModificationRestriction()
+    id = models.AutoField(primary_key=True)
+    upload_id = models.TextField(unique=True)
+    model_name = models.TextField()
+    record_id = models.TextField()
+    field_name = models.TextField()
+    file_name = models.TextField()
+    size = BigIntegerField()
+    # sha256 of the whole file (hex), given by the client and verified on completion
+    checksum = models.TextField(null=True)
+    # number of bytes received so far, i.e. the offset of the next chunk
+    offset = BigIntegerField(default=0)
+    status = models.TextField(default='in_progress')
+    # name of the file in the storage of the field, once the upload is complete
+    stored_file = models.TextField(null=True)
+    user_name = models.TextField(null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    # Statuses
+    IN_PROGRESS = 'in_progress'
+    ASSEMBLING = 'assembling'
+    COMPLETE = 'complete'
+
+    class Meta:
+        indexes = [Index(fields=['status', 'updated_at'], name='file_upload_status_idx')]
@@ -17,8 +17,7 @@ from generic_app.generic_models.fields.XLSX_field import XLSXField
 from generic_app.rest_api.helpers import convert_dfs_in_excel
 from generic_app import models
 from generic_app.submodels.CalculationLog import CalculationLog
-from generic_app.rest_api.context import context_id
-from generic_app.submodels.CalculationIDs import CalculationIDs
+from generic_app.rest_api.calculation_ids import get_calculation_id_of_context, get_calculation_id_of_record
 
 
 class Log(models.CalculatedModelMixin, models.Model):
@@ -47,8 +46,7 @@ class Log(models.CalculatedModelMixin, models.Model):
                 if (hasattr(function, 'delay') and
                     os.getenv("DEPLOYMENT_ENVIRONMENT")
                         and os.getenv("ARCHITECTURE") == "MQ/Worker"):
-                    obj = CalculationIDs.objects.filter(context_id=context_id.get()).first()
-                    calculation_id = getattr(obj, "calculation_id", "test_id")
+                    calculation_id = get_calculation_id_of_context()
                     return_value = function.apply_async(args=args, kwargs=kwargs,
                                                         task_id=str(calculation_id))
                     self.celery_result = return_value
@@ -89,9 +87,7 @@ class Log(models.CalculatedModelMixin, models.Model):
             if current_task and os.getenv("CELERY_ACTIVE"):
                 calculation_id = str(current_task.request.id)
             else:
-                obj = CalculationIDs.objects.filter(
-                    calculation_record=f"{args[0]._meta.model_name}_{args[0].pk}").first()
-                calculation_id = getattr(obj, "calculation_id", "test_id")
+                calculation_id = get_calculation_id_of_record(f"{args[0]._meta.model_name}_{args[0].pk}")
             logs = pd.DataFrame.from_records(CalculationLog.objects.filter(calculationId=calculation_id, method__contains=element).values().order_by('timestamp'))
 
             if len(logs) > 0 and 'create' not in calculation_id:
@@ -259,4 +255,6 @@ class Log(models.CalculatedModelMixin, models.Model):
 
     @classmethod
     def delete_old_entries(cls):
-        CalculationLog.objects.all().delete()
\ No newline at end of file
+        # in chunks instead of one transaction over the whole table (see log_retention.py)
+        from generic_app.log_retention import delete_in_chunks
+        delete_in_chunks(CalculationLog.objects.all(), pause_seconds=0)
\ No newline at end of file
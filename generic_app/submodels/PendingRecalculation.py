@@ -0,0 +1,27 @@
+from django.db.models import UniqueConstraint
+
+from generic_app import models
+
+
+class PendingRecalculation(models.Model):
+    """
+    Entry of the queue of recalculations (see recalculation_queue.py); there is at most one entry per
+    calculated object, identified by the model and the values of its defining fields. An entry stays in the queue
+    until its recalculation succeeded; while being recalculated, it is leased to the claiming worker.
+    """
+    id = models.AutoField(primary_key=True)
+    model_label = models.TextField()
+    coalesce_key = models.TextField()
+    object_pk = models.TextField()
+    first_enqueued_at = models.DateTimeField()
+    due_at = models.DateTimeField(db_index=True)
+    # number of times the entry has been claimed for its recalculation
+    attempts = models.IntegerField(default=0)
+    # lease of the worker recalculating the entry; it can be claimed again once the lease has expired
+    claimed_at = models.DateTimeField(null=True)
+    claim_id = models.TextField(null=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['model_label', 'coalesce_key'], name='unique_pending_recalculation')
+        ]
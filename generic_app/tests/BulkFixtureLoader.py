@@ -0,0 +1,169 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import dateutil.parser
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, router
+from django.db.models import Model, FileField
+from django.db.models.signals import post_save, pre_save
+
+from generic_app.generic_models.calculated_model import CalculatedModelMixin
+from generic_app.generic_models.upload_model import UploadModelMixin, ConditionalUpdateMixin
+from generic_app.rest_api.transactions.transactions import deferred_recalculations
+
+TAG_PREFIX = "tag:"
+DATETIME_PREFIX = "datetime:"
+
+
+def get_tag_references(parameters):
+    return {value[len(TAG_PREFIX):] for value in parameters.values()
+            if isinstance(value, str) and value.startswith(TAG_PREFIX)}
+
+
+def can_be_bulk_created(klass):
+    """
+    Objects can only be inserted via bulk_create (i.e. without calling save and without pre_save signals)
+    if the class does not define any behaviour on saving: the default save method, no pre_save receivers,
+    no upload or calculation logic and no multi-table inheritance
+    """
+    return (klass.save is Model.save
+            and not issubclass(klass, (UploadModelMixin, ConditionalUpdateMixin, CalculatedModelMixin))
+            and not klass._meta.parents
+            and not pre_save.has_listeners(klass)
+            and connection.features.can_return_rows_from_bulk_insert)
+
+
+class BulkFixtureLoader:
+    """
+    Loads the JSON test data (list of 'create', 'update' and 'delete' actions) into the database:
+    - consecutive 'create' actions of the same class are inserted with a single bulk_create, if the class
+      allows it (see can_be_bulk_created); otherwise, the objects are saved one after another as before.
+      Afterwards, post_save is sent for the inserted objects, such that the receivers still get every object.
+    - 'tag:' references are resolved against the objects created so far; an object referencing a tag of
+      the current batch starts a new batch
+    - if 'upload_files' is set, the files of FileFields are streamed to the default storage by a pool of
+      'max_upload_workers' threads, i.e. the files of a batch are uploaded concurrently
+    - the recalculations of calculated models triggered by the saved objects are deferred until the whole data
+      is loaded, and every affected entry is recalculated once (see deferred_recalculations)
+    """
+
+    def __init__(self, generic_app_models, tagged_objects=None, upload_files=False, max_upload_workers=8,
+                 batch_size=500) -> None:
+        super().__init__()
+        self.generic_app_models = generic_app_models
+        self.tagged_objects = tagged_objects if tagged_objects is not None else {}
+        self.upload_files = upload_files
+        self.max_upload_workers = max_upload_workers
+        self.batch_size = batch_size
+        self.upload_pool = None
+
+    def replace_tagged_parameters(self, object_parameters):
+        for key in object_parameters:
+            value: str = object_parameters[key]
+            if isinstance(value, str):
+                parsed_value = value
+                if value.startswith(TAG_PREFIX):
+                    parsed_value = self.tagged_objects[value.replace(TAG_PREFIX, "")]
+                elif value.startswith(DATETIME_PREFIX):
+                    parsed_value = dateutil.parser.parse(value.replace(DATETIME_PREFIX, ""))
+                object_parameters[key] = parsed_value
+
+        return object_parameters
+
+    def upload_file(self, field, relative_path):
+        upload_to = field.upload_to
+        if upload_to and not upload_to.endswith('/'):
+            upload_to += "/"
+        file_name = os.path.basename(relative_path)
+        # the file is streamed to the storage instead of being read into memory
+        with open(f"{os.getcwd()}/{relative_path}", "rb") as f:
+            return default_storage.save(f"{upload_to}{file_name}", content=File(f, name=file_name))
+
+    def submit_uploads(self, klass, parameters):
+        """
+        :return: dict of the names of the file fields in the parameters to the futures of their uploads
+        """
+        if not self.upload_files:
+            return {}
+        futures = {}
+        for key, value in parameters.items():
+            if isinstance(klass._meta.get_field(key), FileField) and value:
+                futures[key] = self.upload_pool.submit(self.upload_file, klass._meta.get_field(key), value)
+        return futures
+
+    def load(self, test_data):
+        with ThreadPoolExecutor(max_workers=self.max_upload_workers) as self.upload_pool:
+            with deferred_recalculations():
+                batch = []
+                for object in test_data:
+                    klass = self.generic_app_models[object['class']]
+                    if object['action'] == 'create' and can_be_bulk_created(klass):
+                        batch_tags = {o.get('tag', 'instance') for o in batch}
+                        if batch and (batch[0]['class'] != object['class']
+                                      or len(batch) >= self.batch_size
+                                      or get_tag_references(object['parameters']) & batch_tags):
+                            self.bulk_create(batch)
+                            batch = []
+                        batch.append(object)
+                        continue
+
+                    if batch:
+                        self.bulk_create(batch)
+                        batch = []
+                    self.load_object(object)
+                if batch:
+                    self.bulk_create(batch)
+        self.upload_pool = None
+        return self.tagged_objects
+
+    def bulk_create(self, batch):
+        klass = self.generic_app_models[batch[0]['class']]
+        instances = []
+        uploads = []
+        for object in batch:
+            object['parameters'] = self.replace_tagged_parameters(object['parameters'])
+            instances.append(klass(**object['parameters']))
+            uploads.append(self.submit_uploads(klass, object['parameters']))
+        for instance, futures in zip(instances, uploads):
+            for key, future in futures.items():
+                instance.__dict__[key] = future.result()
+
+        cache.set(threading.get_ident(), str(batch[0]['class']) + "_create")
+        klass.objects.bulk_create(instances)
+
+        using = router.db_for_write(klass)
+        for object, instance in zip(batch, instances):
+            self.tagged_objects[object.get('tag', 'instance')] = instance
+            post_save.send(sender=klass, instance=instance, created=True, update_fields=None, raw=False,
+                           using=using)
+
+    def load_object(self, object):
+        klass = self.generic_app_models[object['class']]
+        action = object['action']
+        tag = object['tag'] if 'tag' in object else 'instance'
+        if action == 'create':
+            object['parameters'] = self.replace_tagged_parameters(object['parameters'])
+            self.tagged_objects[tag] = klass(**object['parameters'])
+            for key, future in self.submit_uploads(klass, object['parameters']).items():
+                self.tagged_objects[tag].__dict__[key] = future.result()
+            cache.set(threading.get_ident(), str(object['class']) + "_" + action)
+            self.tagged_objects[tag].save()
+        elif action == 'update':
+            object['filter_parameters'] = self.replace_tagged_parameters(object['filter_parameters'])
+            self.tagged_objects[tag] = klass.objects.filter(**object['filter_parameters']).first()
+            if self.tagged_objects[tag] is not None:
+                uploads = self.submit_uploads(klass, object['parameters'])
+                for key in object['parameters']:
+                    if key in uploads:
+                        setattr(self.tagged_objects[tag], key, uploads[key].result())
+                    else:
+                        setattr(self.tagged_objects[tag], key, object['parameters'][key])
+
+                cache.set(threading.get_ident(),
+                          str(object['class']) + "_" + action + "_" + str(self.tagged_objects[tag].pk))
+                self.tagged_objects[tag].save()
+        elif action == 'delete':
+            klass.objects.filter(**object['filter_parameters']).delete()
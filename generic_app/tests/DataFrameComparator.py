@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+from generic_app.tests.SubmodelTestCase import TestType, get_dtypes_in_column, parse_test_definition
+
+NUMBER_OF_RANDOM_CHECKS = 5
+
+
+class ColumnCheck:
+    """
+    Result of one test of one column. 'mismatches' contains the differing (or duplicated) rows as DataFrame.
+    """
+
+    def __init__(self, column, test_type, successful, message, grouped_by=None, mismatches=None) -> None:
+        super().__init__()
+        self.column = column
+        self.test_type = test_type
+        self.successful = successful
+        self.message = message
+        self.grouped_by = grouped_by
+        self.mismatches = mismatches if mismatches is not None else pd.DataFrame()
+
+    def __str__(self):
+        grouping = f' (grouped by {self.grouped_by})' if self.grouped_by else ''
+        return f'{self.column} - {self.test_type.value}{grouping}: {self.message}'
+
+
+class DiffReport:
+    """
+    Structured result of DataFrameComparator.compare
+    """
+
+    def __init__(self, rows_df1, rows_df2) -> None:
+        super().__init__()
+        self.rows_df1 = rows_df1
+        self.rows_df2 = rows_df2
+        self.checks = []
+        # columns of the test definitions that are missing in one of the DataFrames
+        self.missing_columns = []
+        self.columns_only_in_df1 = []
+        self.columns_only_in_df2 = []
+        # column -> (type in DataFrame 1, type in DataFrame 2)
+        self.format_differences = {}
+
+    @property
+    def failed_checks(self):
+        return [check for check in self.checks if not check.successful]
+
+    @property
+    def successful(self):
+        return (self.rows_df1 == self.rows_df2 and not self.failed_checks and not self.missing_columns
+                and not self.columns_only_in_df1 and not self.columns_only_in_df2 and not self.format_differences)
+
+    def to_dataframe(self):
+        """
+        :return: one row per check with column, test, grouping, result, message and number of mismatches
+        """
+        return pd.DataFrame.from_records([{
+            'column': check.column,
+            'test': check.test_type.value,
+            'grouped_by': check.grouped_by,
+            'successful': check.successful,
+            'message': check.message,
+            'mismatches': len(check.mismatches),
+        } for check in self.checks], columns=['column', 'test', 'grouped_by', 'successful', 'message', 'mismatches'])
+
+    def __str__(self):
+        lines = []
+        if self.rows_df1 == self.rows_df2:
+            lines.append(f'Both DataFrames have the same number of entries ({self.rows_df1}).')
+        else:
+            lines.append(f'The DataFrames have a different number of entries! {self.rows_df1} in DataFrame 1 and '
+                         f'{self.rows_df2} in DataFrame 2.')
+        lines.extend(str(check) for check in self.checks)
+        lines.extend(f'Can not compare the values in column {column} because it is missing in one of the two '
+                     f'DataFrames.' for column in self.missing_columns)
+        lines.extend(f'WARNING: {column}, which is in DataFrame 1 is not in DataFrame 2!'
+                     for column in self.columns_only_in_df1)
+        lines.extend(f'WARNING: {column}, which is in DataFrame 2 is not in DataFrame 1!'
+                     for column in self.columns_only_in_df2)
+        lines.extend(f'Data type different for {column}! {type_df1} in DataFrame 1 and {type_df2} in DataFrame 2.'
+                     for column, (type_df1, type_df2) in self.format_differences.items())
+        return '\n'.join(lines)
+
+
+def values_equal(values_df1, values_df2, accuracy=None, tolerance=None):
+    """
+    Element-wise comparison of two aligned Series. Numeric values are rounded to 'accuracy' decimal places
+    and compared with the absolute 'tolerance', if given; missing values are equal to each other.
+    :return: boolean numpy array
+    """
+    if pd.api.types.is_numeric_dtype(values_df1) and pd.api.types.is_numeric_dtype(values_df2) \
+            and not pd.api.types.is_bool_dtype(values_df1) and not pd.api.types.is_bool_dtype(values_df2):
+        array_df1 = values_df1.to_numpy(dtype=float)
+        array_df2 = values_df2.to_numpy(dtype=float)
+        if accuracy is not None:
+            array_df1 = np.round(array_df1, accuracy)
+            array_df2 = np.round(array_df2, accuracy)
+        return np.isclose(array_df1, array_df2, rtol=0, atol=tolerance or 0, equal_nan=True)
+    both_missing = (values_df1.isna() & values_df2.isna()).to_numpy()
+    return (values_df1 == values_df2).to_numpy() | both_missing
+
+
+class DataFrameComparator:
+    """
+    Vectorised counterpart of compare_dfs: the DataFrames are aligned on their index once and all values are
+    compared at once instead of row by row. Groupings ('grouped_by') are evaluated with one groupby per DataFrame.
+    As in compare_dfs, only groups with more than one entry in both DataFrames are checked, and an entry of
+    DataFrame 1 only counts as present in DataFrame 2, if it belongs to the same group there.
+    The index of DataFrame 2 is expected to be unique; for duplicated index values, the first entry is used.
+    """
+
+    def __init__(self, df1, df2) -> None:
+        super().__init__()
+        self.df1 = df1
+        self.df2 = df2[~df2.index.duplicated(keep='first')]
+
+    def compare(self, dic, column_names_check=False, format_check=False):
+        """
+        :param dic: test definitions per column, as for compare_dfs
+        :return: DiffReport
+        """
+        report = DiffReport(len(self.df1.index), len(self.df2.index))
+        for col_name, test_definition in dic.items():
+            if col_name not in self.df1.columns or col_name not in self.df2.columns:
+                report.missing_columns.append(col_name)
+                continue
+            for test_type, accuracy, grouped_by, tolerance in parse_test_definition(test_definition):
+                if test_type is not None:
+                    report.checks.append(self.check(col_name, test_type, accuracy, grouped_by, tolerance))
+
+        if column_names_check:
+            report.columns_only_in_df1 = [c for c in self.df1.columns if c not in self.df2.columns]
+            report.columns_only_in_df2 = [c for c in self.df2.columns if c not in self.df1.columns]
+
+        if format_check:
+            for column in self.df1.columns.intersection(self.df2.columns):
+                type_df1 = get_dtypes_in_column(self.df1[column])
+                type_df2 = get_dtypes_in_column(self.df2[column])
+                if type_df1 != type_df2:
+                    report.format_differences[column] = (type_df1, type_df2)
+        return report
+
+    def check(self, col_name, test_type, accuracy=None, grouped_by=None, tolerance=None):
+        df1, df2 = self.df1, self.df2
+        if grouped_by:
+            df1, df2 = self.get_comparable_groups(grouped_by)
+
+        if test_type == TestType.EXACT:
+            return self.check_exact(col_name, df1, df2, accuracy, grouped_by, tolerance)
+        if test_type == TestType.SUM:
+            return self.check_sum(col_name, df1, df2, accuracy, grouped_by, tolerance)
+        if test_type == TestType.RANDOM:
+            return self.check_random(col_name, df1, df2, accuracy, grouped_by, tolerance)
+        if test_type == TestType.DUPLICATE:
+            return self.check_duplicates(col_name, df1, df2, grouped_by)
+        raise ValueError(f'Unknown test type {test_type}')
+
+    def get_comparable_groups(self, grouped_by):
+        """
+        :return: the entries of both DataFrames belonging to groups with more than one entry in both DataFrames
+        """
+        sizes_df1 = self.df1.groupby(grouped_by, sort=False).size()
+        sizes_df2 = self.df2.groupby(grouped_by, sort=False).size().reindex(sizes_df1.index, fill_value=0)
+        comparable_groups = sizes_df1.index[(sizes_df1 > 1) & (sizes_df2 > 1)]
+        return (self.df1[self.df1[grouped_by].isin(comparable_groups)],
+                self.df2[self.df2[grouped_by].isin(comparable_groups)])
+
+    @staticmethod
+    def align(col_name, df1, df2, grouped_by=None):
+        """
+        :return: DataFrame with the index of df1 and the columns value_df1, value_df2 and in_df2
+        (and group, if grouped)
+        """
+        aligned = pd.DataFrame({'value_df1': df1[col_name],
+                                'value_df2': df2[col_name].reindex(df1.index)}, index=df1.index)
+        in_df2 = df1.index.isin(df2.index)
+        if grouped_by:
+            aligned.insert(0, 'group', df1[grouped_by])
+            in_df2 = in_df2 & (df2[grouped_by].reindex(df1.index) == df1[grouped_by]).to_numpy()
+        aligned['in_df2'] = in_df2
+        return aligned
+
+    def get_mismatches(self, col_name, df1, df2, accuracy, grouped_by, tolerance):
+        aligned = self.align(col_name, df1, df2, grouped_by)
+        equal = values_equal(aligned['value_df1'], aligned['value_df2'], accuracy, tolerance)
+        return aligned[~(equal & aligned['in_df2'].to_numpy())]
+
+    def check_exact(self, col_name, df1, df2, accuracy, grouped_by, tolerance):
+        mismatches = self.get_mismatches(col_name, df1, df2, accuracy, grouped_by, tolerance)
+        if mismatches.empty:
+            message = 'Exact Test was successful.'
+        else:
+            missing = int((~mismatches['in_df2']).sum())
+            message = (f'Exact Test failed. {len(mismatches) - missing} of {len(df1.index)} values are not equal, '
+                       f'{missing} indices do not exist in DataFrame 2.')
+        return ColumnCheck(col_name, TestType.EXACT, mismatches.empty, message, grouped_by, mismatches)
+
+    def check_sum(self, col_name, df1, df2, accuracy, grouped_by, tolerance):
+        dtype_df1 = get_dtypes_in_column(df1[col_name])
+        dtype_df2 = get_dtypes_in_column(df2[col_name])
+        if dtype_df1 != 'Float' or dtype_df2 != 'Float':
+            return ColumnCheck(col_name, TestType.SUM, False,
+                               f'WARNING: You can not sum up a column of {dtype_df1} values.', grouped_by)
+        if grouped_by:
+            sums_df1 = df1.groupby(grouped_by, sort=False)[col_name].sum()
+            sums_df2 = df2.groupby(grouped_by, sort=False)[col_name].sum().reindex(sums_df1.index)
+        else:
+            sums_df1 = pd.Series([df1[col_name].sum()])
+            sums_df2 = pd.Series([df2[col_name].sum()])
+        equal = values_equal(sums_df1, sums_df2, accuracy, tolerance)
+        mismatches = pd.DataFrame({'value_df1': sums_df1, 'value_df2': sums_df2})[~equal]
+        if mismatches.empty:
+            message = 'Checksum correct!' if grouped_by else f'Checksum correct! - {sums_df1.iloc[0]}'
+        elif grouped_by:
+            message = f'Checksum not correct for {len(mismatches)} of {len(sums_df1)} groups!'
+        else:
+            message = f'Checksum not correct! - DF1: {sums_df1.iloc[0]}; DF2: {sums_df2.iloc[0]}'
+        return ColumnCheck(col_name, TestType.SUM, mismatches.empty, message, grouped_by, mismatches)
+
+    def check_random(self, col_name, df1, df2, accuracy, grouped_by, tolerance):
+        if df1.empty:
+            return ColumnCheck(col_name, TestType.RANDOM, True, 'No entries to check.', grouped_by)
+        # as in compare_dfs, the entries are drawn with replacement (per group, if grouped)
+        if grouped_by:
+            sample = df1.groupby(grouped_by, sort=False).sample(n=NUMBER_OF_RANDOM_CHECKS, replace=True)
+        else:
+            sample = df1.sample(n=NUMBER_OF_RANDOM_CHECKS, replace=True)
+        mismatches = self.get_mismatches(col_name, sample, df2, accuracy, grouped_by, tolerance)
+        message = (f'{len(sample.index) - len(mismatches)} of {len(sample.index)} random value checks '
+                   f'completed with equal values.')
+        return ColumnCheck(col_name, TestType.RANDOM, mismatches.empty, message, grouped_by, mismatches)
+
+    def check_duplicates(self, col_name, df1, df2, grouped_by):
+        subset = [grouped_by, col_name] if grouped_by else [col_name]
+        duplicates_df1 = df1.loc[df1.duplicated(subset=subset, keep=False), subset]
+        duplicates_df2 = df2.loc[df2.duplicated(subset=subset, keep=False), subset]
+        mismatches = pd.concat([duplicates_df1, duplicates_df2], keys=['DF1', 'DF2'], names=['dataframe', None])
+        if mismatches.empty:
+            message = 'No duplicates.'
+        else:
+            message = (f'{len(duplicates_df1.index)} duplicated values in DataFrame 1, '
+                       f'{len(duplicates_df2.index)} in DataFrame 2.')
+        return ColumnCheck(col_name, TestType.DUPLICATE, mismatches.empty, message, grouped_by, mismatches)
+
+
+def compare_dfs_vectorised(df_list, dic, column_names_check=False, format_check=False):
+    # Same parameters as compare_dfs, but returns a DiffReport instead of printing the result of every row
+    return DataFrameComparator(df_list[0], df_list[1]).compare(dic, column_names_check, format_check)
@@ -1,34 +1,42 @@
-import io
 import os
 import inspect
 import pathlib
-import threading
-import dateutil.parser
-from django.core.cache import cache
-from django.core.files import File
-from django.core.files.storage import default_storage
+from django.db import connection
 from django.test import TestCase
 from unittest import TestCase
-import json
 from generic_app.models import *
 from pathlib import Path
 from lex.lex_app import settings
 from django.apps import apps
+from generic_app.rest_api.views.pagination import estimate_count
+from generic_app.tests.BulkFixtureLoader import BulkFixtureLoader
+from generic_app.tests.TestDataLoader import test_data_loader
+
+
+def get_non_empty_models(models):
+    """
+    Checks with a single query which of the models contain at least one object: the query is the UNION of
+    'SELECT 1 ... LIMIT 1' per model, i.e. no table is scanned completely as with 'COUNT(*)'
+    """
+    models = list(models)
+    if not models:
+        return []
+    selects = []
+    params = []
+    for index, model in enumerate(models):
+        sql, model_params = model.objects.values('pk')[:1].query.sql_with_params()
+        selects.append(f'SELECT {index} AS model_index FROM ({sql}) AS model_{index}')
+        params.extend(model_params)
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(selects), params)
+        return [models[row[0]] for row in cursor.fetchall()]
+
 
 class ProcessAdminTestCase(TestCase):
 
     def replace_tagged_parameters(self, object_parameters):
-        for key in object_parameters:
-            value: str = object_parameters[key]
-            if isinstance(value, str):
-                parsed_value = value
-                if value.startswith("tag:"):
-                    parsed_value = self.tagged_objects[value.replace("tag:", "")]
-                elif value.startswith("datetime:"):
-                    parsed_value = dateutil.parser.parse(value.replace("datetime:", ""))
-                object_parameters[key] = parsed_value
-
-        return object_parameters
+        loader = BulkFixtureLoader({}, self.tagged_objects)
+        return loader.replace_tagged_parameters(object_parameters)
 
     test_path = None
 
@@ -36,53 +44,7 @@ class ProcessAdminTestCase(TestCase):
         from datetime import datetime
         self.t0 = datetime.now()
         self.tagged_objects = {}
-        test_data = self.get_test_data()
-        for object in test_data:
-            klass = generic_app_models[object['class']]
-            action = object['action']
-            tag = object['tag'] if 'tag' in object else 'instance'
-            if action == 'create':
-                object['parameters'] = self.replace_tagged_parameters(object['parameters'])
-                self.tagged_objects[tag] = klass(**object['parameters'])
-                for parameter in object['parameters'].keys():
-                    if (isinstance(self.tagged_objects[tag]._meta.get_field(parameter), (FileField))):
-                        upload_to = self.tagged_objects[tag]._meta.get_field(parameter).upload_to
-                        if upload_to and not upload_to.endswith('/'):
-                            upload_to += "/"
-                        path = f"{upload_to}{os.path.basename(self.tagged_objects[tag].__dict__[parameter])}"
-                        file_name = os.path.basename(self.tagged_objects[tag].__dict__[parameter])
-                        f = open(f"{os.getcwd()}/{self.tagged_objects[tag].__dict__[parameter]}", "rb")
-                        file_content = f.read()
-                        new_file_name = default_storage.save(path, content=File(io.BytesIO(file_content),
-                                                                                name=f"{file_name}"))
-                        self.tagged_objects[tag].__dict__[parameter] = new_file_name
-
-                cache.set(threading.get_ident(), str(object['class']) + "_" + action)
-                self.tagged_objects[tag].save()
-            elif action == 'update':
-                object['filter_parameters'] = self.replace_tagged_parameters(object['filter_parameters'])
-                self.tagged_objects[tag] = klass.objects.filter(**object['filter_parameters']).first()
-                if self.tagged_objects[tag] is not None:
-                    for key in object['parameters']:
-                        if isinstance(self.tagged_objects[tag]._meta.get_field(key), (FileField)):
-                            upload_to = self.tagged_objects[tag]._meta.get_field(key).upload_to
-                            if upload_to and not upload_to.endswith('/'):
-                                upload_to += "/"
-                            path = f"{upload_to}{os.path.basename(object['parameters'][key])}"
-                            file_name = os.path.basename(object['parameters'][key])
-                            f = open(f"{os.getcwd()}/{object['parameters'][key]}", "rb")
-                            file_content = f.read()
-                            new_file_name = default_storage.save(path, content=File(io.BytesIO(file_content),
-                                                                                    name=f"{file_name}"))
-                            setattr(self.tagged_objects[tag], key, new_file_name)
-                        else:
-                            setattr(self.tagged_objects[tag], key, object['parameters'][key])
-
-                    cache.set(threading.get_ident(),
-                              str(object['class']) + "_" + action + "_" + str(self.tagged_objects[tag].pk))
-                    self.tagged_objects[tag].save()
-            elif action == 'delete':
-                klass.objects.filter(**object['filter_parameters']).delete()
+        BulkFixtureLoader(generic_app_models, self.tagged_objects, upload_files=True).load(self.iter_test_data())
 
     def setUp(self) -> None:
         from datetime import datetime
@@ -92,28 +54,7 @@ class ProcessAdminTestCase(TestCase):
 
         self.t0 = datetime.now()
         self.tagged_objects = {}
-        test_data = self.get_test_data()
-        for object in test_data:
-            klass = generic_app_models[object['class']]
-            action = object['action']
-            tag = object['tag'] if 'tag' in object else 'instance'
-            if action == 'create':
-                object['parameters'] = self.replace_tagged_parameters(object['parameters'])
-                self.tagged_objects[tag] = klass(**object['parameters'])
-                cache.set(threading.get_ident(), str(object['class']) + "_" + action)
-                self.tagged_objects[tag].save()
-            elif action == 'update':
-                object['filter_parameters'] = self.replace_tagged_parameters(object['filter_parameters'])
-                self.tagged_objects[tag] = klass.objects.filter(**object['filter_parameters']).first()
-                if self.tagged_objects[tag] is not None:
-                    for key in object['parameters']:
-                        setattr(self.tagged_objects[tag], key, object['parameters'][key])
-
-                    cache.set(threading.get_ident(),
-                              str(object['class']) + "_" + action + "_" + str(self.tagged_objects[tag].pk))
-                    self.tagged_objects[tag].save()
-            elif action == 'delete':
-                klass.objects.filter(**object['filter_parameters']).delete()
+        BulkFixtureLoader(generic_app_models, self.tagged_objects).load(self.iter_test_data())
 
     def tearDown(self) -> None:
         import pandas as pd
@@ -130,7 +71,7 @@ class ProcessAdminTestCase(TestCase):
         #
         # super().tearDown()
 
-    def get_test_data(self):
+    def get_test_data_path(self):
         if self.test_path is None:
             file = inspect.getfile(self.__class__)
             path = Path(file).parent
@@ -138,42 +79,39 @@ class ProcessAdminTestCase(TestCase):
         else:
             clean_test_path = self.test_path.replace('/', os.sep)
             clean_test_path = os.getenv("PROJECT_ROOT") + os.sep + clean_test_path
-        test_data = self.get_test_data_from_path(clean_test_path)
+        return clean_test_path
+
+    def get_test_data(self):
+        test_data = self.get_test_data_from_path(self.get_test_data_path())
         return test_data
 
+    def iter_test_data(self):
+        """
+        Streams the objects of the test data (including those of the referenced subprocesses), such that they
+        are never held in memory completely
+        """
+        return test_data_loader.iter_objects(self.get_test_data_path())
 
     def get_test_data_from_path(self, path):
-        with open(str(path), 'r') as f:
-            test_data = json.loads(f.read())
-            for index, object in enumerate(test_data):
-                if "subprocess" in object:
-                    subprocess_path = object['subprocess'].replace('/', os.sep)
-                    subprocess_path = os.getenv("PROJECT_ROOT") + os.sep + subprocess_path
-                    sublist = self.get_test_data_from_path(subprocess_path)
-                    test_data[index] = sublist
-        flat_list = []
-        for sublist in test_data:
-            if type(sublist) == list:
-                flat_list.extend(sublist)
-            else:
-                flat_list.append(sublist)
-        return flat_list
+        return list(test_data_loader.iter_objects(path))
 
+    def get_cached_test_data(self):
+        """
+        Same as get_test_data, but the parsed test data is cached as long as none of the read files changes.
+        Hint: the returned objects must not be modified (setUp modifies the parameters, so it uses iter_test_data)
+        """
+        return test_data_loader.get_objects(self.get_test_data_path())
 
     def get_classes(self, generic_app_models):
-        test_data = self.get_test_data()
-        return set([generic_app_models[object['class']] for object in test_data])
+        return set([generic_app_models[class_name]
+                    for class_name in test_data_loader.get_class_names(self.get_test_data_path())])
 
     def check_if_all_models_are_empty(self, generic_app_models):
-        for klass in self.get_classes(generic_app_models):
-            if klass.objects.all().count() > 0:
-                return False
-        return True
+        return not get_non_empty_models(self.get_classes(generic_app_models))
 
     def get_list_of_non_empty_models(self, generic_app_models):
+        # the number of objects is estimated (see estimate_count), as it is only informative
         count_of_objects_in_non_empty_models = {}
-        for klass in self.get_classes(generic_app_models):
-            c = klass.objects.all().count()
-            if c > 0:
-                count_of_objects_in_non_empty_models[str(klass)]=c
+        for klass in get_non_empty_models(self.get_classes(generic_app_models)):
+            count_of_objects_in_non_empty_models[str(klass)] = estimate_count(klass.objects.all())
         return count_of_objects_in_non_empty_models
\ No newline at end of file
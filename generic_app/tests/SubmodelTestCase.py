@@ -27,53 +27,9 @@ def compare_dfs(df_list, dic, column_names_check=False, format_check=False):
 
     # Step 3: Compare values according to dic
     for col_name in dic:
-        test_definition = dic[col_name]
         if col_name in df1.columns and col_name in df2.columns:
-            accuracy = None
-            grouped_by = None
-
-            # String passed
-            if isinstance(test_definition, TestType):
-                test_type = test_definition
-                check_values(col_name, df1, df2, test_type, accuracy, grouped_by)
-
-            # Dictionary passed
-            if isinstance(test_definition, dict):
-                if "accuracy" in test_definition:
-                    accuracy = test_definition['accuracy']
-                    accuracy = len(accuracy.split(",")[1])
-                else:
-                    accuracy = None
-                if "grouped_by" in test_definition:
-                    grouped_by = test_definition['grouped_by']
-                else:
-                    grouped_by = None
-                test_type = test_definition['method']
+            for test_type, accuracy, grouped_by, _ in parse_test_definition(dic[col_name]):
                 check_values(col_name, df1, df2, test_type, accuracy, grouped_by)
-
-            # List passed
-            if isinstance(test_definition, list):
-                list_test_definitions = test_definition
-                for test_definition in list_test_definitions:
-                    accuracy = None
-                    grouped_by = None
-                    test_type = None
-                    # String in List
-                    if isinstance(test_definition, TestType):
-                        test_type = test_definition
-                    # Dictionary in List
-                    if isinstance(test_definition, dict):
-                        if "accuracy" in test_definition:
-                            accuracy = test_definition['accuracy']
-                            accuracy = len(accuracy.split(",")[1])
-                        else:
-                            accuracy = None
-                        if "grouped_by" in test_definition:
-                            grouped_by = test_definition['grouped_by']
-                        else:
-                            grouped_by = None
-                        test_type = test_definition['method']
-                    check_values(col_name, df1, df2, test_type, accuracy, grouped_by)
         else:
             print(
                 f'Can not compare the values in column {col_name} because it is missing in one of the two DataFrames.')
@@ -92,6 +48,22 @@ def compare_dfs(df_list, dic, column_names_check=False, format_check=False):
         check_format(df1, df2)
 
 
+def parse_test_definition(test_definition):
+    # test_definition can be a TestType, a dictionary with the keys 'method' and optionally 'accuracy' (e.g. '0,00'
+    # for two decimal places), 'tolerance' (absolute, only used by the DataFrameComparator) and 'grouped_by',
+    # or a list of those
+    # Returns a list of tuples (test_type, accuracy, grouped_by, tolerance)
+    if isinstance(test_definition, list):
+        return [definition for element in test_definition for definition in parse_test_definition(element)]
+    if isinstance(test_definition, dict):
+        accuracy = len(test_definition['accuracy'].split(",")[1]) if "accuracy" in test_definition else None
+        return [(test_definition['method'], accuracy, test_definition.get('grouped_by'),
+                 test_definition.get('tolerance'))]
+    if isinstance(test_definition, TestType):
+        return [(test_definition, None, None, None)]
+    return [(None, None, None, None)]
+
+
 def check_number_of_lines(df1, df2):
     rows_df1 = len(df1.axes[0])
     rows_df2 = len(df2.axes[0])
@@ -101,22 +73,20 @@ def check_number_of_lines(df1, df2):
         print('The DataFrames have a different number of entries!')
 
 
+# Result of pandas.api.types.infer_dtype -> type name used in the checks
+INFERRED_TYPES = {
+    'floating': 'Float',
+    'string': 'String',
+    'datetime': 'Date',
+    'datetime64': 'Date',
+    'integer': 'Integer',
+    'boolean': 'Integer',
+}
+
+
 def get_dtypes_in_column(series):
-    dtypes_list = []
-    for entry in series:
-        if isinstance(entry, float):
-            dtypes_list.append('Float')
-        elif isinstance(entry, str):
-            dtypes_list.append('String')
-        elif isinstance(entry, datetime):
-            dtypes_list.append('Date')
-        elif isinstance(entry, int):
-            dtypes_list.append('Integer')
-    are_identical = all(element == dtypes_list[0] for element in dtypes_list)
-    if are_identical:
-        return dtypes_list[0]
-    else:
-        return 'inconsistent typed'
+    # Missing values are ignored; mixed types result in 'inconsistent typed'
+    return INFERRED_TYPES.get(pd.api.types.infer_dtype(series, skipna=True), 'inconsistent typed')
 
 
 def check_values_test(df1, df2, col_name, accuracy, action):
@@ -130,7 +100,7 @@ def check_values_test(df1, df2, col_name, accuracy, action):
         for ent in series_df1.items():
             index = ent[0]
             val_df1 = ent[1]
-            if index in list(df2.index):
+            if index in df2.index:
                 val_df2 = series_df2[index]
                 if accuracy is not None and isinstance(val_df1, float) and isinstance(val_df2, float):
                     val_df1 = round(val_df1, accuracy)
@@ -168,7 +138,7 @@ def check_values_test(df1, df2, col_name, accuracy, action):
             index = df1.index[row_number]
             val_df1 = df1.loc[index][col_name]
 
-            if index in list(df2.index):
+            if index in df2.index:
                 val_df2 = df2.loc[index][col_name]
                 if accuracy is not None and isinstance(val_df1, float) and isinstance(val_df2, float):
                     val_df1 = round(val_df1, accuracy)
@@ -199,10 +169,10 @@ def check_values_test(df1, df2, col_name, accuracy, action):
 
 def check_values(col_name, df1, df2, action, accuracy=None, grouped_by=None):
     if grouped_by:
-        distinct_values = df1[grouped_by].unique()
-        for val in distinct_values:
-            df1_new = df1[df1[grouped_by] == val]
-            df2_new = df2[df2[grouped_by] == val]
+        # one pass over each DataFrame instead of one boolean mask per group
+        groups_df2 = dict(iter(df2.groupby(grouped_by, sort=False)))
+        for val, df1_new in df1.groupby(grouped_by, sort=False):
+            df2_new = groups_df2.get(val, df2.iloc[0:0])
             if len(df1_new) > 1 and len(df2_new) > 1:
                 check_values_test(df1_new, df2_new, col_name, accuracy, action)
             else:
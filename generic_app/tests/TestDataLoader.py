@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def resolve_subprocess_path(subprocess):
+    return os.getenv("PROJECT_ROOT") + os.sep + subprocess.replace('/', os.sep)
+
+
+def parse_objects(file):
+    """
+    Yields the objects of the JSON array in the file. With ijson installed, the file is parsed incrementally,
+    otherwise it is parsed at once.
+    """
+    if ijson is not None:
+        # use_float: floats as in json.loads instead of Decimal
+        yield from ijson.items(file, 'item', use_float=True)
+    else:
+        yield from json.load(file)
+
+
+class TestDataLoader:
+    """
+    Reads test data: a JSON array of objects, where an object with the key 'subprocess' stands for all objects
+    of the referenced file (relative to PROJECT_ROOT), which can again reference further files.
+    - iter_objects streams the objects, such that huge initial data is never held in memory completely
+    - get_objects returns the objects as list; every referenced file is parsed only once, even if referenced
+      multiple times, and the result is cached as long as none of the read files changes
+    - get_class_names returns the classes of all objects, cached in the same way
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # path -> (modification times of all read files, result)
+        self._objects_cache = {}
+        self._class_names_cache = {}
+        self._lock = threading.Lock()
+
+    def iter_objects(self, path, read_files=None, _including_paths=()):
+        path = str(path)
+        if path in _including_paths:
+            raise ValueError(f"The test data {path} references itself via {' -> '.join(_including_paths)}")
+        if read_files is not None:
+            read_files.append(path)
+        with open(path, 'rb') as f:
+            for object in parse_objects(f):
+                if "subprocess" in object:
+                    yield from self.iter_objects(resolve_subprocess_path(object['subprocess']), read_files,
+                                                 _including_paths + (path,))
+                else:
+                    yield object
+
+    def _read_objects(self, path, read_files, expanded_files, _including_paths=()):
+        if path in expanded_files:
+            return expanded_files[path]
+        if path in _including_paths:
+            raise ValueError(f"The test data {path} references itself via {' -> '.join(_including_paths)}")
+        read_files.append(path)
+        objects = []
+        with open(path, 'rb') as f:
+            for object in parse_objects(f):
+                if "subprocess" in object:
+                    objects.extend(self._read_objects(resolve_subprocess_path(object['subprocess']), read_files,
+                                                      expanded_files, _including_paths + (path,)))
+                else:
+                    objects.append(object)
+        expanded_files[path] = objects
+        return objects
+
+    def _get_cached(self, cache, path, compute):
+        path = str(path)
+        with self._lock:
+            cached = cache.get(path)
+        if cached is not None:
+            modification_times, result = cached
+            if all(os.path.getmtime(p) == mtime for p, mtime in modification_times.items()):
+                return result
+        read_files = []
+        result = compute(path, read_files)
+        with self._lock:
+            cache[path] = ({p: os.path.getmtime(p) for p in read_files}, result)
+        return result
+
+    def get_objects(self, path):
+        """
+        Hint: the returned objects are shared between the callers and must not be modified
+        """
+        return self._get_cached(self._objects_cache, path,
+                                lambda p, read_files: self._read_objects(p, read_files, {}))
+
+    def get_class_names(self, path):
+        return self._get_cached(self._class_names_cache, path,
+                                lambda p, read_files: frozenset(o['class'] for o in self.iter_objects(p, read_files)))
+
+
+test_data_loader = TestDataLoader()
@@ -0,0 +1,160 @@
+import os
+import tempfile
+from copy import deepcopy
+
+from django.core.files.storage import default_storage
+from django.db import connection, models
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import isolate_apps, override_settings
+
+from generic_app.generic_models.calculated_model import CalculatedModelMixin
+from generic_app.generic_models.process_admin_model import DependencyAnalysisMixin
+from generic_app.management.commands.run_benchmarks import get_storage_settings
+from generic_app.rest_api.signals import do_post_save
+from generic_app.tests.BulkFixtureLoader import BulkFixtureLoader
+
+TEST_DATA = [
+    {"class": "LoaderGroup", "action": "create", "tag": "north", "parameters": {"name": "North"}},
+    {"class": "LoaderGroup", "action": "create", "tag": "south", "parameters": {"name": "South"}},
+    {"class": "LoaderInput", "action": "create", "parameters": {"group": "tag:north", "bucket": "a", "value": 1}},
+    {"class": "LoaderInput", "action": "create", "parameters": {"group": "tag:north", "bucket": "a", "value": 2}},
+    {"class": "LoaderInput", "action": "create", "tag": "changed",
+     "parameters": {"group": "tag:north", "bucket": "b", "value": 3}},
+    {"class": "LoaderInput", "action": "create", "parameters": {"group": "tag:south", "bucket": "a", "value": 4}},
+    {"class": "LoaderInput", "action": "update", "tag": "changed",
+     "filter_parameters": {"group": "tag:north", "bucket": "b"}, "parameters": {"value": 30}},
+    {"class": "LoaderInput", "action": "create", "parameters": {"group": "tag:south", "bucket": "a", "value": 5}},
+    {"class": "LoaderGroup", "action": "delete", "filter_parameters": {"name": "Unused"}},
+]
+
+
+class BulkFixtureLoaderTestCase(TestCase):
+    """
+    Loading test data with the BulkFixtureLoader (bulk_create, post_save of the inserted objects, deferred
+    recalculations, upload pool) results in the same entries as saving the objects one after another
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.isolated_apps = isolate_apps('generic_app')
+        cls.isolated_apps.enable()
+
+        class LoaderGroup(models.Model):
+            name = models.TextField()
+            document = models.FileField(upload_to='loader_documents', max_length=300, null=True)
+
+            class Meta:
+                app_label = 'generic_app'
+
+        class LoaderAggregate(DependencyAnalysisMixin, CalculatedModelMixin):
+            defining_fields = ['group', 'bucket']
+            group = models.ForeignKey(LoaderGroup, on_delete=models.CASCADE)
+            bucket = models.TextField()
+            total = models.FloatField(default=0)
+            calculations = 0
+
+            class Meta:
+                app_label = 'generic_app'
+
+            def calculate(self):
+                type(self).calculations += 1
+                self.total = sum(LoaderInput.objects.filter(group=self.group, bucket=self.bucket)
+                                 .values_list('value', flat=True))
+
+        class LoaderInput(DependencyAnalysisMixin):
+            group = models.ForeignKey(LoaderGroup, on_delete=models.CASCADE)
+            bucket = models.TextField()
+            value = models.FloatField()
+
+            class Meta:
+                app_label = 'generic_app'
+
+            def directly_dependent_entries(self):
+                return {LoaderAggregate.objects.get_or_create(group=self.group, bucket=self.bucket)[0]}
+
+        cls.Group, cls.Aggregate, cls.Input = LoaderGroup, LoaderAggregate, LoaderInput
+        cls.generic_app_models = {'LoaderGroup': LoaderGroup, 'LoaderAggregate': LoaderAggregate,
+                                  'LoaderInput': LoaderInput}
+        with connection.schema_editor() as editor:
+            for model in [cls.Group, cls.Aggregate, cls.Input]:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in [cls.Input, cls.Aggregate, cls.Group]:
+                editor.delete_model(model)
+        cls.isolated_apps.disable()
+
+    def setUp(self) -> None:
+        post_save.connect(do_post_save, sender=self.Input)
+        self.addCleanup(post_save.disconnect, do_post_save, sender=self.Input)
+        self.Aggregate.calculations = 0
+
+    def load_per_object(self, test_data):
+        """
+        Loading as before the BulkFixtureLoader: every object is saved on its own and recalculates its
+        dependent entries directly
+        """
+        loader = BulkFixtureLoader(self.generic_app_models)
+        for object in test_data:
+            loader.load_object(object)
+        return loader.tagged_objects
+
+    def get_rows(self):
+        return {
+            'groups': sorted(self.Group.objects.values_list('name', flat=True)),
+            'inputs': sorted(self.Input.objects.values_list('group__name', 'bucket', 'value')),
+            'aggregates': sorted(self.Aggregate.objects.values_list('group__name', 'bucket', 'total')),
+        }
+
+    def delete_rows(self):
+        for model in [self.Input, self.Aggregate, self.Group]:
+            model.objects.all().delete()
+
+    def test_same_rows_as_per_object_loading(self):
+        self.load_per_object(deepcopy(TEST_DATA))
+        expected_rows = self.get_rows()
+        per_object_calculations = self.Aggregate.calculations
+        self.delete_rows()
+        self.Aggregate.calculations = 0
+
+        tagged_objects = BulkFixtureLoader(self.generic_app_models, batch_size=2).load(deepcopy(TEST_DATA))
+
+        self.assertEqual(self.get_rows(), expected_rows)
+        self.assertEqual(expected_rows['aggregates'], [('North', 'a', 3), ('North', 'b', 30), ('South', 'a', 9)])
+        # the inserted objects are tagged with their primary keys
+        self.assertEqual(tagged_objects['south'].pk, self.Group.objects.get(name='South').pk)
+        self.assertEqual(tagged_objects['changed'].value, 30)
+        # every aggregate is recalculated once, after all objects are loaded
+        self.assertEqual(self.Aggregate.calculations, 3)
+        self.assertGreater(per_object_calculations, self.Aggregate.calculations)
+
+    def test_upload_files(self):
+        storage_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_directory.cleanup)
+        storage_settings = override_settings(MEDIA_ROOT=storage_directory.name,
+                                             **get_storage_settings(storage_directory.name))
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+        # the paths of the files in the test data are relative to the working directory
+        file_directory = tempfile.TemporaryDirectory(dir=os.getcwd())
+        self.addCleanup(file_directory.cleanup)
+        test_data = []
+        for i in range(3):
+            with open(os.path.join(file_directory.name, f'document_{i}.txt'), 'w') as f:
+                f.write(f'Document {i}')
+            test_data.append({"class": "LoaderGroup", "action": "create", "parameters": {
+                "name": f"Group {i}",
+                "document": os.path.relpath(os.path.join(file_directory.name, f'document_{i}.txt'))
+            }})
+
+        BulkFixtureLoader(self.generic_app_models, upload_files=True, max_upload_workers=2).load(test_data)
+
+        for i, group in enumerate(self.Group.objects.order_by('name')):
+            self.assertEqual(group.document.name, f'loader_documents/document_{i}.txt')
+            with default_storage.open(group.document.name) as f:
+                self.assertEqual(f.read(), f'Document {i}'.encode())
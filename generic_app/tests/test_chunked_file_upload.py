@@ -0,0 +1,180 @@
+import hashlib
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import connection, models
+from django.test import TestCase
+from django.test.utils import isolate_apps, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from generic_app.generic_models.model_process_admin import ModelProcessAdmin
+from generic_app.management.commands.run_benchmarks import get_storage_settings
+from generic_app.rest_api.file_uploads import get_part_name
+from generic_app.rest_api.model_collection.model_collection import ModelContainer
+from generic_app.rest_api.views.file_operations.ChunkedFileUpload import FileUploadView, FileUploadChunkView, \
+    FileUploadCompleteView
+from generic_app.submodels.FileUpload import FileUpload
+from generic_app.submodels.UserChangeLog import UserChangeLog
+
+DATA = bytes(range(256)) * 4
+CHUNK_SIZE = 300
+
+
+class SingleModelCollection:
+    def __init__(self, model_container) -> None:
+        super().__init__()
+        self.model_container = model_container
+
+    def get_container(self, model_id):
+        return self.model_container
+
+
+class ChunkedFileUploadTestCase(TestCase):
+    """
+    Upload of a file in chunks via the views of ChunkedFileUpload: start, chunks, resumption, conflicts and
+    completion
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.isolated_apps = isolate_apps('generic_app')
+        cls.isolated_apps.enable()
+
+        class ChunkedUploadDocument(models.Model):
+            file = models.FileField(upload_to='documents', max_length=300, null=True)
+
+            class Meta:
+                app_label = 'generic_app'
+
+        cls.Document = ChunkedUploadDocument
+        with connection.schema_editor() as editor:
+            editor.create_model(cls.Document)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.Document)
+        cls.isolated_apps.disable()
+
+    def setUp(self) -> None:
+        storage_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_directory.cleanup)
+        storage_settings = override_settings(MEDIA_ROOT=storage_directory.name,
+                                             **get_storage_settings(storage_directory.name))
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create(username='upload_user')
+        self.model_container = ModelContainer(self.Document, ModelProcessAdmin(), {})
+        self.document = self.Document.objects.create()
+
+    def send(self, view, request, **kwargs):
+        force_authenticate(request, user=self.user, token={'name': 'Upload User', 'sub': 'upload_user'})
+        return view(request, **kwargs)
+
+    def start(self, data=DATA, checksum=None):
+        request = self.factory.post('/api/document/file-upload', {
+            'pk': self.document.pk, 'field': 'file', 'file_name': 'data.bin', 'size': len(data),
+            'checksum': checksum or hashlib.sha256(data).hexdigest()
+        }, format='json')
+        response = self.send(FileUploadView.as_view(), request, model_container=self.model_container)
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['upload_id']
+
+    def put_chunk(self, upload_id, offset, chunk):
+        request = self.factory.put(f'/api/file-upload/{upload_id}?offset={offset}', chunk,
+                                   content_type='application/octet-stream')
+        return self.send(FileUploadChunkView.as_view(), request, upload_id=upload_id)
+
+    def get_offset(self, upload_id):
+        request = self.factory.get(f'/api/file-upload/{upload_id}')
+        return self.send(FileUploadChunkView.as_view(), request, upload_id=upload_id).data['offset']
+
+    def complete(self, upload_id):
+        request = self.factory.post(f'/api/file-upload/{upload_id}/complete')
+        view = FileUploadCompleteView.as_view(model_collection=SingleModelCollection(self.model_container))
+        return self.send(view, request, upload_id=upload_id)
+
+    def upload_chunks(self, upload_id, data=DATA, start=0):
+        for offset in range(start, len(data), CHUNK_SIZE):
+            response = self.put_chunk(upload_id, offset, data[offset:offset + CHUNK_SIZE])
+            self.assertEqual(response.status_code, 200, response.data)
+
+    def read_document_file(self):
+        self.document.refresh_from_db()
+        with self.document.file.open('rb') as f:
+            return f.read()
+
+    def test_upload_in_chunks(self):
+        upload_id = self.start()
+        self.upload_chunks(upload_id)
+        self.assertEqual(self.get_offset(upload_id), len(DATA))
+
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['status'], FileUpload.COMPLETE)
+        self.assertEqual(self.read_document_file(), DATA)
+        self.assertFalse(default_storage.exists(get_part_name(FileUpload.objects.get(upload_id=upload_id), 0)))
+        self.assertTrue(UserChangeLog.objects.filter(calculation_record=f'{self.model_container.id}_'
+                                                                        f'{self.document.pk}').exists())
+        # completing again returns the completed upload
+        self.assertEqual(self.complete(upload_id).status_code, 200)
+
+    def test_resume_after_repeated_chunk(self):
+        upload_id = self.start()
+        self.assertEqual(self.put_chunk(upload_id, 0, DATA[:CHUNK_SIZE]).status_code, 200)
+        # the repeated chunk (e.g. its response got lost) is rejected with the offset to resume at
+        response = self.put_chunk(upload_id, 0, DATA[:CHUNK_SIZE])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], CHUNK_SIZE)
+
+        self.upload_chunks(upload_id, start=self.get_offset(upload_id))
+        self.assertEqual(self.complete(upload_id).status_code, 200)
+        self.assertEqual(self.read_document_file(), DATA)
+
+    def test_conflicts(self):
+        upload_id = self.start()
+        # chunk not starting at the offset of the upload
+        self.assertEqual(self.put_chunk(upload_id, CHUNK_SIZE, DATA[CHUNK_SIZE:2 * CHUNK_SIZE]).status_code, 409)
+        # chunk exceeding the size of the file
+        self.assertEqual(self.put_chunk(upload_id, 0, DATA + b'x').status_code, 400)
+        # part stored under another name by a concurrent request
+        with mock.patch('generic_app.rest_api.file_uploads.default_storage') as storage:
+            storage.exists.return_value = False
+            storage.save.return_value = 'file_uploads/other.part'
+            self.assertEqual(self.put_chunk(upload_id, 0, DATA[:CHUNK_SIZE]).status_code, 409)
+            storage.delete.assert_called_once_with('file_uploads/other.part')
+        self.assertEqual(self.get_offset(upload_id), 0)
+        # incomplete upload
+        self.assertEqual(self.put_chunk(upload_id, 0, DATA[:CHUNK_SIZE]).status_code, 200)
+        self.assertEqual(self.complete(upload_id).status_code, 409)
+
+    def test_checksum_mismatch(self):
+        upload_id = self.start(checksum=hashlib.sha256(b'other').hexdigest())
+        self.upload_chunks(upload_id)
+
+        self.assertEqual(self.complete(upload_id).status_code, 400)
+        upload = FileUpload.objects.get(upload_id=upload_id)
+        self.assertEqual(upload.status, FileUpload.IN_PROGRESS)
+        self.assertEqual(upload.offset, 0)
+        self.document.refresh_from_db()
+        self.assertFalse(self.document.file)
+
+    def test_failed_recalculation_keeps_the_committed_file(self):
+        upload_id = self.start()
+        self.upload_chunks(upload_id)
+
+        with mock.patch('generic_app.rest_api.calculated_model_updates.objects_to_recalculate_store.'
+                        'ObjectsToRecalculateStore.recalculate', side_effect=RuntimeError('recalculation failed')):
+            self.assertEqual(self.complete(upload_id).status_code, 500)
+
+        # the record references the stored file, which therefore has to be kept
+        upload = FileUpload.objects.get(upload_id=upload_id)
+        self.assertEqual(upload.status, FileUpload.COMPLETE)
+        self.assertEqual(self.read_document_file(), DATA)
+        self.assertEqual(self.document.file.name, upload.stored_file)
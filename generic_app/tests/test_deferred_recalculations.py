@@ -0,0 +1,90 @@
+from django.db import connection, models
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import isolate_apps
+
+from generic_app.generic_models.calculated_model import CalculatedModelMixin
+from generic_app.generic_models.process_admin_model import DependencyAnalysisMixin
+from generic_app.rest_api.calculated_model_updates.objects_to_recalculate_store import ObjectsToRecalculateStore
+from generic_app.rest_api.signals import do_post_save
+from generic_app.rest_api.transactions.transactions import deferred_recalculations
+
+
+class DeferredRecalculationsTestCase(TestCase):
+    """
+    Saves inside deferred_recalculations collect the dependent calculated entries, identified by the values of
+    their defining fields (given by name, as in all models), and recalculate each of them once
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.isolated_apps = isolate_apps('generic_app')
+        cls.isolated_apps.enable()
+
+        class DeferredGroup(models.Model):
+            name = models.TextField()
+
+            class Meta:
+                app_label = 'generic_app'
+
+        class DeferredAggregate(DependencyAnalysisMixin, CalculatedModelMixin):
+            defining_fields = ['group', 'bucket']
+            group = models.ForeignKey(DeferredGroup, on_delete=models.CASCADE)
+            bucket = models.TextField()
+            total = models.FloatField(default=0)
+            calculations = 0
+
+            class Meta:
+                app_label = 'generic_app'
+
+            def calculate(self):
+                type(self).calculations += 1
+                self.total = sum(DeferredInput.objects.filter(group=self.group, bucket=self.bucket)
+                                 .values_list('value', flat=True))
+
+        class DeferredInput(DependencyAnalysisMixin):
+            group = models.ForeignKey(DeferredGroup, on_delete=models.CASCADE)
+            bucket = models.TextField()
+            value = models.FloatField()
+
+            class Meta:
+                app_label = 'generic_app'
+
+            def directly_dependent_entries(self):
+                return {DeferredAggregate.objects.get_or_create(group=self.group, bucket=self.bucket)[0]}
+
+        cls.Group, cls.Aggregate, cls.Input = DeferredGroup, DeferredAggregate, DeferredInput
+        with connection.schema_editor() as editor:
+            for model in [cls.Group, cls.Aggregate, cls.Input]:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in [cls.Input, cls.Aggregate, cls.Group]:
+                editor.delete_model(model)
+        cls.isolated_apps.disable()
+
+    def setUp(self) -> None:
+        post_save.connect(do_post_save, sender=self.Input)
+        self.addCleanup(post_save.disconnect, do_post_save, sender=self.Input)
+        self.Aggregate.calculations = 0
+        self.group = self.Group.objects.create(name='Group')
+
+    def test_get_key_of_string_defining_fields(self):
+        aggregate = self.Aggregate(group=self.group, bucket='a')
+        self.assertEqual(ObjectsToRecalculateStore.get_key(aggregate), (self.group.pk, 'a'))
+
+    def test_save_inside_deferred_recalculations(self):
+        with deferred_recalculations():
+            self.Input.objects.create(group=self.group, bucket='a', value=1)
+            self.Input.objects.create(group=self.group, bucket='a', value=2)
+            self.Input.objects.create(group=self.group, bucket='b', value=5)
+            # nothing is recalculated inside the block
+            self.assertEqual(self.Aggregate.calculations, 0)
+
+        self.assertEqual(sorted(self.Aggregate.objects.values_list('bucket', 'total')), [('a', 3), ('b', 5)])
+        # the entries of the same bucket (loaded by every save) are collected once
+        self.assertEqual(self.Aggregate.calculations, 2)
@@ -0,0 +1,105 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.db import connection, models
+from django.test import TestCase
+from django.test.utils import isolate_apps
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from generic_app.rest_api.views.pagination import KeysetPagination
+
+START = datetime.datetime(2024, 1, 1, 1, 1, 1, 123456, tzinfo=datetime.timezone.utc)
+
+
+class KeysetPaginationTestCase(TestCase):
+    """
+    The cursors of the KeysetPagination keep the full values of the ordering field, such that walking through
+    the pages returns every entry exactly once, even for microsecond values and duplicate ordering keys
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.isolated_apps = isolate_apps('generic_app')
+        cls.isolated_apps.enable()
+
+        class KeysetEntry(models.Model):
+            created = models.DateTimeField()
+            at = models.TimeField()
+            amount = models.DecimalField(max_digits=20, decimal_places=10)
+
+            class Meta:
+                app_label = 'generic_app'
+
+        cls.Entry = KeysetEntry
+        with connection.schema_editor() as editor:
+            editor.create_model(cls.Entry)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.Entry)
+        cls.isolated_apps.disable()
+
+    @classmethod
+    def setUpTestData(cls):
+        # several entries in the same millisecond, some of them with the same value
+        for microseconds in [0, 1, 1, 2, 500, 500, 999, 1000]:
+            created = START + datetime.timedelta(microseconds=microseconds)
+            cls.Entry.objects.create(created=created, at=created.time(),
+                                     amount=Decimal('1.0000000001') + microseconds)
+
+    def get_request(self, **params):
+        return Request(APIRequestFactory().get('/api/keysetentry/model', params))
+
+    def walk(self, ordering, page_size=1):
+        pagination = KeysetPagination()
+        params = {'ordering': ordering, 'perPage': page_size}
+        pks = []
+        for _ in range(self.Entry.objects.count() + 1):
+            pks.extend(entry.pk for entry in pagination.paginate_queryset(self.Entry.objects.all(),
+                                                                          self.get_request(**params)))
+            if pagination.next_cursor is None:
+                return pks
+            params['cursor'] = pagination.next_cursor
+        self.fail(f'The pagination ordered by {ordering} does not advance')
+
+    def test_cursor_round_trip(self):
+        pagination = KeysetPagination()
+        pk_field = self.Entry._meta.pk
+        values = {
+            'created': START,
+            'at': datetime.time(1, 1, 1, 123456),
+            'amount': Decimal('12345.0000000001'),
+        }
+        for field_name, value in values.items():
+            field = self.Entry._meta.get_field(field_name)
+            cursor = pagination.encode_cursor(value, 7)
+            self.assertEqual(pagination.decode_cursor(self.get_request(cursor=cursor), field, pk_field), (value, 7))
+
+        uuid_field = models.UUIDField()
+        value = uuid.uuid4()
+        cursor = pagination.encode_cursor(value, value)
+        self.assertEqual(pagination.decode_cursor(self.get_request(cursor=cursor), uuid_field, uuid_field),
+                         (value, value))
+
+    def test_walk_through_pages(self):
+        for ordering in ['created', '-created', 'at', '-at', 'amount', '-amount']:
+            field_name = ordering.lstrip('-')
+            expected = list(self.Entry.objects.order_by(ordering, '-pk' if ordering.startswith('-') else 'pk')
+                            .values_list('pk', flat=True))
+            self.assertEqual(self.walk(ordering), expected, field_name)
+            self.assertEqual(self.walk(ordering, page_size=3), expected, field_name)
+
+    def test_local_datetime(self):
+        entry = self.Entry.objects.order_by('pk').first()
+        local = timezone.localtime(entry.created, datetime.timezone(datetime.timedelta(hours=2)))
+        pagination = KeysetPagination()
+        cursor = pagination.encode_cursor(local, entry.pk)
+        value, pk = pagination.decode_cursor(self.get_request(cursor=cursor), self.Entry._meta.get_field('created'),
+                                             self.Entry._meta.pk)
+        self.assertEqual(value, entry.created)
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from generic_app import log_retention
+from generic_app.log_retention import get_expired_logs
+from generic_app.submodels.CalculationLog import CalculationLog
+from generic_app.submodels.CalculationLogRetention import CalculationLogRetention
+
+RECORDS = ['report_12', 'report_13', 'report_2', 'other']
+AGES = [15, 25, 35]
+
+
+class LogRetentionTestCase(TestCase):
+    """
+    Every CalculationLog expires by the most specific retention matching its calculation record: exact record
+    before longest prefix before the default retention
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        CalculationLog.objects.bulk_create([
+            CalculationLog(timestamp=cls.now - timedelta(days=age, hours=1), calculation_record=record,
+                           message=f'{record} {age}', method='')
+            for record in RECORDS for age in AGES
+        ])
+        cls.retentions = [
+            CalculationLogRetention.objects.create(calculation_record='report_*', retention_days=20),
+            CalculationLogRetention.objects.create(calculation_record='report_12', retention_days=10),
+            CalculationLogRetention.objects.create(calculation_record='report_1*', retention_days=30, archive=False),
+        ]
+
+    def get_expired(self):
+        return [(retention.calculation_record if retention is not None else None,
+                 sorted(queryset.values_list('calculation_record', 'message')), archive)
+                for retention, queryset, archive in get_expired_logs(self.retentions, self.now)]
+
+    def test_resolution_order(self):
+        with mock.patch.object(log_retention, 'DEFAULT_RETENTION_DAYS', '5'):
+            expired = self.get_expired()
+
+        self.assertEqual(expired, [
+            # exact record, although also matching both prefixes
+            ('report_12', [('report_12', 'report_12 15'), ('report_12', 'report_12 25'),
+                           ('report_12', 'report_12 35')], True),
+            # longest prefix, before the shorter one
+            ('report_1*', [('report_13', 'report_13 35')], False),
+            ('report_*', [('report_2', 'report_2 25'), ('report_2', 'report_2 35')], True),
+            # default for the logs without matching retention
+            (None, [('other', 'other 15'), ('other', 'other 25'), ('other', 'other 35')],
+             log_retention.DEFAULT_ARCHIVE),
+        ])
+
+    def test_without_default_retention(self):
+        with mock.patch.object(log_retention, 'DEFAULT_RETENTION_DAYS', None):
+            expired = self.get_expired()
+
+        self.assertEqual([retention for retention, logs, archive in expired], ['report_12', 'report_1*', 'report_*'])
@@ -0,0 +1,93 @@
+from django.db import connection, models
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, isolate_apps
+
+from generic_app.generic_models.model_process_admin import ModelProcessAdmin
+from generic_app.rest_api.model_collection.model_collection import ModelContainer
+
+
+class QueryPlanTestCase(TestCase):
+    """
+    Rendering a page of entries for the list view (queryset of the model container and its serializer) has to
+    cost the same number of queries, independent of the number of entries on the page
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.isolated_apps = isolate_apps('generic_app')
+        cls.isolated_apps.enable()
+
+        class QueryPlanCategory(models.Model):
+            name = models.TextField()
+
+            class Meta:
+                app_label = 'generic_app'
+
+        class QueryPlanTag(models.Model):
+            name = models.TextField()
+
+            class Meta:
+                app_label = 'generic_app'
+
+        class QueryPlanEntry(models.Model):
+            name = models.TextField()
+            description = models.TextField(default='')
+            category = models.ForeignKey(QueryPlanCategory, on_delete=models.CASCADE)
+            tags = models.ManyToManyField(QueryPlanTag)
+
+            class Meta:
+                app_label = 'generic_app'
+
+            def __str__(self):
+                # touches the foreign key, as the short_description of many models does
+                return f"{self.name} ({self.category.name})"
+
+        cls.Category, cls.Tag, cls.Entry = QueryPlanCategory, QueryPlanTag, QueryPlanEntry
+        # the tables are created outside of the transaction of the test case
+        with connection.schema_editor() as editor:
+            for model in [cls.Category, cls.Tag, cls.Entry]:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in [cls.Entry, cls.Tag, cls.Category]:
+                editor.delete_model(model)
+        cls.isolated_apps.disable()
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [cls.Category.objects.create(name=f"Category {i}") for i in range(3)]
+        tags = [cls.Tag.objects.create(name=f"Tag {i}") for i in range(3)]
+        for i in range(20):
+            entry = cls.Entry.objects.create(name=f"Entry {i}", category=categories[i % 3])
+            entry.tags.set(tags[:i % 3 + 1])
+
+    def render_page(self, model_container, page_size):
+        page = list(model_container.get_planned_queryset().order_by('pk')[:page_size])
+        return model_container.obj_serializer(page, many=True).data
+
+    def count_queries(self, model_container, page_size):
+        with CaptureQueriesContext(connection) as context:
+            self.render_page(model_container, page_size)
+        return len(context.captured_queries)
+
+    def test_constant_number_of_queries_per_page(self):
+        model_container = ModelContainer(self.Entry, ModelProcessAdmin(), {})
+        # the page joined with the categories, and the prefetched tags
+        with self.assertNumQueries(2):
+            data = self.render_page(model_container, 20)
+        self.assertEqual(len(data), 20)
+        self.assertEqual(data[1]['short_description'], "Entry 1 (Category 1)")
+        self.assertEqual(len(data[2]['tags']), 3)
+        self.assertEqual(self.count_queries(model_container, 1), self.count_queries(model_container, 20))
+
+    def test_constant_number_of_queries_per_page_with_restricted_queries(self):
+        model_container = ModelContainer(self.Entry, ModelProcessAdmin(
+            fields_not_in_table_view=['description'], restrict_queries_to_table_view=True), {})
+        self.assertNotIn('description', model_container.query_plan.only_fields)
+        with self.assertNumQueries(2):
+            self.render_page(model_container, 20)
+        self.assertEqual(self.count_queries(model_container, 1), self.count_queries(model_container, 20))
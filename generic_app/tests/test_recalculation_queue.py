@@ -0,0 +1,151 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, models
+from django.test import TestCase
+from django.test.utils import isolate_apps
+from django.utils import timezone
+
+from generic_app.generic_models.calculated_model import CalculatedModelMixin
+from generic_app.rest_api.calculated_model_updates import recalculation_queue
+from generic_app.rest_api.calculated_model_updates.recalculation_queue import enqueue, process_due_recalculations, \
+    claim_due_recalculations, complete, get_seconds_until_next_due, DEBOUNCE_SECONDS, MAX_DELAY_SECONDS, \
+    MAX_ATTEMPTS, LEASE_SECONDS
+from generic_app.submodels.PendingRecalculation import PendingRecalculation
+
+
+class RecalculationQueueTestCase(TestCase):
+    """
+    Coalescing, debouncing, retries and leases of the recalculation queue
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.isolated_apps = isolate_apps('generic_app')
+        cls.apps = cls.isolated_apps.enable()
+
+        class QueuedAggregate(CalculatedModelMixin):
+            defining_fields = ['bucket']
+            bucket = models.TextField()
+            calculations = 0
+            failing = False
+
+            class Meta:
+                app_label = 'generic_app'
+
+            def calculate(self):
+                type(self).calculations += 1
+                if type(self).failing:
+                    raise ValueError('Calculation failed')
+
+        cls.Aggregate = QueuedAggregate
+        with connection.schema_editor() as editor:
+            editor.create_model(cls.Aggregate)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.Aggregate)
+        cls.isolated_apps.disable()
+
+    def setUp(self) -> None:
+        # the queue looks up the models of its entries in the registry of the isolated models
+        apps_patch = mock.patch.object(recalculation_queue, 'apps', self.apps)
+        apps_patch.start()
+        self.addCleanup(apps_patch.stop)
+        self.Aggregate.calculations = 0
+        self.Aggregate.failing = False
+        self.first = self.Aggregate.objects.create(bucket='first')
+        self.second = self.Aggregate.objects.create(bucket='second')
+
+    def make_due(self):
+        PendingRecalculation.objects.update(due_at=timezone.now() - timedelta(seconds=1))
+
+    def test_coalescing(self):
+        enqueue([self.first, self.second])
+        enqueue([self.Aggregate.objects.get(pk=self.first.pk)])
+        self.assertEqual(PendingRecalculation.objects.count(), 2)
+
+        self.make_due()
+        self.assertEqual(process_due_recalculations(), 2)
+        self.assertEqual(self.Aggregate.calculations, 2)
+        self.assertFalse(PendingRecalculation.objects.exists())
+
+    def test_debounce(self):
+        start = timezone.now()
+        enqueue([self.first])
+        entry = PendingRecalculation.objects.get()
+        self.assertGreaterEqual(entry.due_at, start + timedelta(seconds=DEBOUNCE_SECONDS))
+        # not due yet
+        self.assertEqual(process_due_recalculations(), 0)
+        self.assertAlmostEqual(get_seconds_until_next_due(), DEBOUNCE_SECONDS, delta=1)
+
+        # further requests delay the recalculation, but not beyond MAX_DELAY_SECONDS after the first request
+        first_enqueued_at = timezone.now() - timedelta(seconds=MAX_DELAY_SECONDS)
+        PendingRecalculation.objects.update(first_enqueued_at=first_enqueued_at)
+        enqueue([self.first])
+        entry.refresh_from_db()
+        self.assertEqual(entry.due_at, first_enqueued_at + timedelta(seconds=MAX_DELAY_SECONDS))
+        self.assertEqual(process_due_recalculations(), 1)
+        self.assertEqual(self.Aggregate.calculations, 1)
+
+    def test_retry(self):
+        self.Aggregate.failing = True
+        enqueue([self.first])
+        for attempt in range(1, MAX_ATTEMPTS):
+            self.make_due()
+            with self.assertLogs(recalculation_queue.logger, 'ERROR'):
+                self.assertEqual(process_due_recalculations(), 1)
+            entry = PendingRecalculation.objects.get()
+            self.assertEqual(entry.attempts, attempt)
+            self.assertIsNone(entry.claimed_at)
+            self.assertGreater(entry.due_at, timezone.now())
+
+        # given up after the last attempt
+        self.make_due()
+        with self.assertLogs(recalculation_queue.logger, 'ERROR') as logs:
+            self.assertEqual(process_due_recalculations(), 1)
+        self.assertIn('given up', logs.output[-1])
+        self.assertFalse(PendingRecalculation.objects.exists())
+        self.assertEqual(self.Aggregate.calculations, MAX_ATTEMPTS)
+
+    def test_lease_of_died_worker_expires(self):
+        enqueue([self.first])
+        self.make_due()
+        # a worker claims the entry and dies
+        self.assertEqual(len(claim_due_recalculations()), 1)
+        self.assertEqual(process_due_recalculations(), 0)
+        self.assertEqual(PendingRecalculation.objects.count(), 1)
+        self.assertAlmostEqual(get_seconds_until_next_due(), LEASE_SECONDS, delta=1)
+
+        PendingRecalculation.objects.update(claimed_at=timezone.now() - timedelta(seconds=LEASE_SECONDS + 1))
+        self.assertEqual(process_due_recalculations(), 1)
+        self.assertEqual(self.Aggregate.calculations, 1)
+        self.assertFalse(PendingRecalculation.objects.exists())
+
+    def test_request_during_recalculation_is_kept(self):
+        enqueue([self.first])
+        self.make_due()
+        [claimed] = claim_due_recalculations()
+        # requested again while being recalculated: the running recalculation may miss the new changes
+        enqueue([self.first])
+        complete(claimed)
+
+        entry = PendingRecalculation.objects.get()
+        self.assertIsNone(entry.claimed_at)
+        self.assertEqual(entry.attempts, 0)
+
+    def test_task_is_rescheduled_instead_of_waiting(self):
+        enqueue([self.first])
+        with mock.patch.object(recalculation_queue.process_recalculation_queue_task, 'apply_async') as apply_async:
+            recalculation_queue.process_recalculation_queue_task()
+        self.assertEqual(self.Aggregate.calculations, 0)
+        self.assertAlmostEqual(apply_async.call_args.kwargs['countdown'], DEBOUNCE_SECONDS, delta=1)
+
+        self.make_due()
+        with mock.patch.object(recalculation_queue.process_recalculation_queue_task, 'apply_async') as apply_async:
+            recalculation_queue.process_recalculation_queue_task()
+        self.assertEqual(self.Aggregate.calculations, 1)
+        apply_async.assert_not_called()
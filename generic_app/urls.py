@@ -3,5 +3,6 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path('health', views.HealthCheck.as_view(), name='health_view')
+    path('health', views.HealthCheck.as_view(), name='health_view'),
+    path('metrics', views.Metrics.as_view(), name='metrics_view'),
 ]
\ No newline at end of file
@@ -1,4 +1,9 @@
-from django.http import JsonResponse
+import hmac
+import os
+
+from django.http import JsonResponse, HttpResponse
+
+from generic_app.rest_api.instrumentation import registry
 
 from django.views import View
 class HealthCheck(View):
@@ -6,3 +11,19 @@ class HealthCheck(View):
 
     def get(self, request):
         return JsonResponse({"status": "Healthy :)"})
+
+
+class Metrics(View):
+    """
+    Timings, query and row counts of the instrumented views in the text format of Prometheus. Only available if
+    the environment variable METRICS_TOKEN is set; the request has to contain the header
+    'Authorization: Bearer <METRICS_TOKEN>'.
+    """
+
+    def get(self, request):
+        token = os.getenv("METRICS_TOKEN")
+        if not token:
+            return HttpResponse(status=404)
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()):
+            return HttpResponse(status=401)
+        return HttpResponse(registry.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")